@@ -0,0 +1,39 @@
+"""
+PaymentLinkViewSet.create against a test database, with the Razorpay client
+stubbed by the in-memory fake so that only the plugin's own work is timed.
+"""
+
+from types import SimpleNamespace
+from unittest import mock
+
+from model_bakery import baker
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from benchmarks.fixtures import make_invoice
+from benchmarks.harness import requires_db
+from care_razorpay.api.viewsets.payment_link import PaymentLinkViewSet
+from care_razorpay.testing.fake_razorpay import FakeRazorpay
+
+
+@requires_db
+def bench_payment_link_create(benchmark):
+    user = baker.make("users.User", is_superuser=True)
+    invoice = make_invoice()
+    view = PaymentLinkViewSet.as_view({"post": "create"})
+    factory = APIRequestFactory()
+
+    fake = FakeRazorpay()
+    client = SimpleNamespace(
+        payment_link=SimpleNamespace(create=fake.create_payment_link)
+    )
+
+    def create():
+        request = factory.post(
+            "/payment_link/", {"invoice_id": str(invoice.external_id)}, format="json"
+        )
+        force_authenticate(request, user=user)
+        return view(request)
+
+    with mock.patch("care_razorpay.api.viewsets.payment_link.razorpay_client", client):
+        response = benchmark(create)
+    assert response.status_code == 201
@@ -0,0 +1,93 @@
+"""
+Micro-benchmark of the webhook signature verification.
+
+Compares the per-request cost of the native verifier with the previous
+implementation (decode the body, then the Razorpay SDK's
+verify_webhook_signature) for growing payload sizes.
+
+    python -m benchmarks.bench_signature [--number N]
+
+The bench_* functions time RazorpayWebhookAuthentication as part of the
+benchmark suite.
+"""
+
+import argparse
+import json
+import timeit
+from types import SimpleNamespace
+
+from django.utils.encoding import force_str
+from razorpay.utility.utility import Utility
+
+from benchmarks.fixtures import sign
+from care_razorpay.utils.signature import WebhookSignatureVerifier
+
+SECRET = "whsec_current"
+PREVIOUS_SECRET = "whsec_previous"
+PAYLOAD_SIZES = (1024, 64 * 1024, 1024 * 1024)
+
+
+def build_body(size: int) -> bytes:
+    filler = "x" * max(size - 64, 0)
+    return json.dumps({"event": "payment_link.paid", "filler": filler}).encode()
+
+
+def run_webhook_authentication(benchmark, size: int) -> None:
+    from care_razorpay.api.authentication import RazorpayWebhookAuthentication
+    from care_razorpay.settings import plugin_settings
+
+    body = build_body(size)
+    request = SimpleNamespace(
+        body=body,
+        META={
+            "HTTP_X_RAZORPAY_SIGNATURE": sign(
+                body, plugin_settings.RAZORPAY_WEBHOOK_SECRET
+            )
+        },
+    )
+    result = benchmark(RazorpayWebhookAuthentication().authenticate, request)
+    assert result[1]["verified"]
+
+
+def bench_webhook_authentication_1kb(benchmark):
+    run_webhook_authentication(benchmark, 1024)
+
+
+def bench_webhook_authentication_1mb(benchmark):
+    run_webhook_authentication(benchmark, 1024 * 1024)
+
+
+def run(number: int) -> None:
+    sdk = Utility(None)
+    verifier = WebhookSignatureVerifier([SECRET])
+    # Worst case during a rotation: the delivery is signed with the last secret
+    rotating_verifier = WebhookSignatureVerifier([PREVIOUS_SECRET, SECRET])
+
+    print(f"{'payload':>10} {'sdk':>12} {'native':>12} {'rotating':>12}")
+    for size in PAYLOAD_SIZES:
+        body = build_body(size)
+        signature = sign(body, SECRET)
+
+        assert verifier.verify(body, signature)
+        assert rotating_verifier.verify(body, signature)
+
+        timings = [
+            timeit.timeit(func, number=number) / number
+            for func in (
+                lambda: sdk.verify_webhook_signature(
+                    force_str(body), signature, SECRET
+                ),
+                lambda: verifier.verify(body, signature),
+                lambda: rotating_verifier.verify(body, signature),
+            )
+        ]
+        print(
+            f"{size // 1024:>8}kB"
+            + "".join(f"{timing * 1e6:>10.1f}us" for timing in timings)
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000)
+    run(parser.parse_args().number)
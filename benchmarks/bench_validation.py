@@ -0,0 +1,31 @@
+"""
+Throughput of validating Razorpay entities into the response models.
+"""
+
+from care_razorpay.api.serializers.payment_link import PaymentLink
+from care_razorpay.api.serializers.qr_code import QRCode
+from care_razorpay.testing.fake_razorpay import FakeRazorpay
+
+BATCH_SIZE = 1000
+
+
+def bench_payment_link_validation(benchmark):
+    fake = FakeRazorpay()
+    entities = [
+        fake.create_payment_link({"amount": 1000 + i, "expire_by": 1900000000})
+        for i in range(BATCH_SIZE)
+    ]
+    payment_links = benchmark(
+        lambda: [PaymentLink.model_validate(entity) for entity in entities]
+    )
+    assert len(payment_links) == BATCH_SIZE
+
+
+def bench_qr_code_validation(benchmark):
+    fake = FakeRazorpay()
+    entities = [
+        fake.create_qr_code({"usage": "single_use", "payment_amount": 1000 + i})
+        for i in range(BATCH_SIZE)
+    ]
+    qr_codes = benchmark(lambda: [QRCode.model_validate(entity) for entity in entities])
+    assert len(qr_codes) == BATCH_SIZE
@@ -0,0 +1,72 @@
+"""
+End-to-end handling of a webhook delivery: authentication, storing it in
+the inbox and applying it, against a test database.
+"""
+
+import json
+
+from rest_framework.test import APIRequestFactory
+
+from benchmarks.fixtures import make_invoice, sign
+from benchmarks.harness import requires_db
+from care_razorpay.api.viewsets.webhook import WebhookViewSet
+from care_razorpay.settings import plugin_settings
+from care_razorpay.testing.fake_razorpay import FakeRazorpay, generate_id
+from care_razorpay.utils.payloads import get_invoice_notes
+from care_razorpay.utils.webhook import drain_webhook_events
+
+ROUNDS = 200
+
+
+def run_webhook(benchmark, kind: str, create, pay) -> None:
+    invoice = make_invoice()
+    notes = get_invoice_notes(invoice)
+    view = WebhookViewSet.as_view({"post": kind})
+    factory = APIRequestFactory()
+
+    def setup():
+        # Every delivery is a new payment, redeliveries are deduplicated
+        event = pay(create(notes)["id"])
+        body = json.dumps(event).encode()
+        request = factory.post(
+            f"/webhook/{kind}/",
+            data=body,
+            content_type="application/json",
+            HTTP_X_RAZORPAY_SIGNATURE=sign(
+                body, plugin_settings.RAZORPAY_WEBHOOK_SECRET
+            ),
+            HTTP_X_RAZORPAY_EVENT_ID=generate_id("evt"),
+        )
+        return (request,), {}
+
+    def handle(request):
+        response = view(request)
+        drain_webhook_events()
+        return response
+
+    response = benchmark.pedantic(handle, setup=setup, rounds=ROUNDS)
+    assert response.status_code == 200
+
+
+@requires_db
+def bench_payment_link_webhook(benchmark):
+    fake = FakeRazorpay()
+    run_webhook(
+        benchmark,
+        "payment_link",
+        lambda notes: fake.create_payment_link({"amount": 10000, "notes": notes}),
+        fake.pay_payment_link,
+    )
+
+
+@requires_db
+def bench_qr_code_webhook(benchmark):
+    fake = FakeRazorpay()
+    run_webhook(
+        benchmark,
+        "qr_code",
+        lambda notes: fake.create_qr_code(
+            {"usage": "single_use", "payment_amount": 10000, "notes": notes}
+        ),
+        fake.pay_qr_code,
+    )
@@ -0,0 +1,11 @@
+import pytest
+
+from benchmarks.harness import Benchmark
+
+try:
+    import pytest_benchmark  # noqa F401
+except ImportError:
+
+    @pytest.fixture
+    def benchmark(request):
+        return Benchmark(request.node.name)
@@ -0,0 +1,19 @@
+import hashlib
+import hmac
+
+
+def sign(body: bytes, secret: str) -> str:
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def make_invoice():
+    """
+    Creates an invoice whose facility has a Razorpay account.
+    """
+    from model_bakery import baker
+
+    from care_razorpay.models.razorpay_account import RazorpayAccount
+
+    invoice = baker.make("emr.Invoice", total_gross=100)
+    baker.make(RazorpayAccount, facility=invoice.facility, account_id="acc_benchmark")
+    return invoice
@@ -0,0 +1,160 @@
+"""
+A small stand-in for the pytest-benchmark fixture, so that the benchmarks
+run the same way under pytest (with or without pytest-benchmark installed)
+and from the standalone runner.
+
+Results are written in the layout of pytest-benchmark's --benchmark-json,
+so a baseline recorded by either can be compared against the other.
+"""
+
+import json
+import platform
+import statistics
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+try:
+    import pytest
+except ImportError:  # pragma: no cover
+    pytest = None
+
+# Keep calling a benchmark until it ran for this long or this many rounds
+MIN_TIME = 1.0
+MAX_ROUNDS = 10_000
+WARMUP_ROUNDS = 3
+
+
+def requires_db(func: Callable) -> Callable:
+    """
+    Marks a benchmark that needs a test database. Each run is rolled back.
+    """
+    func.requires_db = True
+    if pytest is not None:
+        func = pytest.mark.django_db(transaction=False)(func)
+    return func
+
+
+class Benchmark:
+    """
+    Times a callable over many rounds, with the interface of the
+    pytest-benchmark fixture (`benchmark(func, *args)` and `pedantic`).
+    """
+
+    def __init__(self, name: str, rounds: int | None = None) -> None:
+        self.name = name
+        self.rounds = rounds
+        self.timings = []
+
+    def __call__(self, func: Callable, *args, **kwargs):
+        for _ in range(WARMUP_ROUNDS):
+            func(*args, **kwargs)
+
+        started_at = time.perf_counter()
+        while True:
+            call_started_at = time.perf_counter()
+            result = func(*args, **kwargs)
+            self.timings.append(time.perf_counter() - call_started_at)
+
+            if self.rounds:
+                if len(self.timings) >= self.rounds:
+                    break
+            elif (
+                time.perf_counter() - started_at >= MIN_TIME
+                or len(self.timings) >= MAX_ROUNDS
+            ):
+                break
+        return result
+
+    def pedantic(
+        self,
+        target: Callable,
+        args: tuple = (),
+        kwargs: dict | None = None,
+        setup: Callable | None = None,
+        rounds: int = 1,
+        iterations: int = 1,
+        warmup_rounds: int = 0,
+    ):
+        """
+        Times `target` over exactly `rounds` rounds. `setup` runs untimed
+        before every round and may return the `(args, kwargs)` to call with.
+        """
+        rounds = self.rounds or rounds
+        result = None
+        for round_number in range(warmup_rounds + rounds):
+            call_args, call_kwargs = args, kwargs or {}
+            if setup:
+                prepared = setup()
+                if prepared is not None:
+                    call_args, call_kwargs = prepared
+
+            started_at = time.perf_counter()
+            for _ in range(iterations):
+                result = target(*call_args, **call_kwargs)
+            if round_number >= warmup_rounds:
+                self.timings.append((time.perf_counter() - started_at) / iterations)
+        return result
+
+    @property
+    def stats(self) -> dict:
+        timings = self.timings
+        mean = statistics.fmean(timings)
+        return {
+            "rounds": len(timings),
+            "min": min(timings),
+            "max": max(timings),
+            "mean": mean,
+            "median": statistics.median(timings),
+            "stddev": statistics.stdev(timings) if len(timings) > 1 else 0,
+            "ops": 1 / mean if mean else 0,
+        }
+
+
+def build_report(benchmarks: list[Benchmark]) -> dict:
+    return {
+        "machine_info": {
+            "node": platform.node(),
+            "python_version": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "datetime": datetime.now(UTC).isoformat(),
+        "benchmarks": [
+            {"name": benchmark.name, "stats": benchmark.stats}
+            for benchmark in benchmarks
+        ],
+    }
+
+
+def load_report(path: str) -> dict[str, dict]:
+    """
+    Returns the stats of every benchmark in a report, by name.
+    """
+    with open(path) as report_file:
+        report = json.load(report_file)
+    return {benchmark["name"]: benchmark["stats"] for benchmark in report["benchmarks"]}
+
+
+def compare_reports(
+    current: dict[str, dict], baseline: dict[str, dict], threshold: float
+) -> list[dict]:
+    """
+    Compares the median timings of the benchmarks found in both reports. A
+    benchmark regressed when it got slower than the baseline by more than
+    `threshold` (a fraction).
+    """
+    comparisons = []
+    for name, stats in current.items():
+        if name not in baseline:
+            continue
+        change = stats["median"] / baseline[name]["median"] - 1
+        comparisons.append(
+            {
+                "name": name,
+                "baseline": baseline[name]["median"],
+                "current": stats["median"],
+                "change": change,
+                "regressed": change > threshold,
+            }
+        )
+    return comparisons
@@ -0,0 +1,117 @@
+"""
+Standalone runner of the benchmark suite. Runs inside a configured care
+environment, creating (and destroying) a test database for the benchmarks
+that need one:
+
+    DJANGO_SETTINGS_MODULE=config.settings.test python -m benchmarks.run \\
+        [-k NAME] [--rounds N] [--output results.json] \\
+        [--baseline baseline.json] [--threshold 0.1]
+
+Exits with status 1 when a benchmark regressed against the baseline. The
+suite also runs under pytest (`pytest benchmarks`), with pytest-benchmark
+when installed.
+"""
+
+import argparse
+import importlib
+import json
+import sys
+
+import django
+
+from benchmarks.harness import Benchmark, build_report, compare_reports, load_report
+
+MODULES = (
+    "benchmarks.bench_signature",
+    "benchmarks.bench_validation",
+    "benchmarks.bench_webhook",
+    "benchmarks.bench_payment_link",
+)
+
+
+def collect(pattern: str | None):
+    for module_name in MODULES:
+        module = importlib.import_module(module_name)
+        for name, func in vars(module).items():
+            if name.startswith("bench_") and callable(func):
+                if not pattern or pattern in name:
+                    yield name, func
+
+
+def run_benchmark(name: str, func, rounds: int | None) -> Benchmark:
+    from django.db import transaction
+
+    benchmark = Benchmark(name, rounds)
+    if getattr(func, "requires_db", False):
+        with transaction.atomic():
+            func(benchmark)
+            transaction.set_rollback(True)
+    else:
+        func(benchmark)
+    return benchmark
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the care_razorpay benchmarks")
+    parser.add_argument("-k", dest="pattern", help="Only run matching benchmarks")
+    parser.add_argument("--rounds", type=int, help="Rounds per benchmark")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against this JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Slowdown of the median, as a fraction, that counts as a regression",
+    )
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    django.setup()
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    benchmarks = list(collect(args.pattern))
+    needs_db = any(getattr(func, "requires_db", False) for _, func in benchmarks)
+
+    if needs_db:
+        setup_test_environment()
+        database_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=args.keepdb
+        )
+
+    results = []
+    try:
+        for name, func in benchmarks:
+            results.append(run_benchmark(name, func, args.rounds))
+            stats = results[-1].stats
+            print(
+                f"{name:<45} {stats['median'] * 1e6:>12.1f}us median "
+                f"{stats['ops']:>12.1f} ops/s ({stats['rounds']} rounds)"
+            )
+    finally:
+        if needs_db:
+            connection.creation.destroy_test_db(
+                database_name, verbosity=0, keepdb=args.keepdb
+            )
+
+    report = build_report(results)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+
+    if not args.baseline:
+        return 0
+
+    current = {item["name"]: item["stats"] for item in report["benchmarks"]}
+    comparisons = compare_reports(current, load_report(args.baseline), args.threshold)
+    for comparison in comparisons:
+        print(
+            f"{comparison['name']:<45} {comparison['change']:>+8.1%}"
+            + ("  REGRESSED" if comparison["regressed"] else "")
+        )
+    return 1 if any(comparison["regressed"] for comparison in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,46 @@
-from django.utils.encoding import force_str
+from functools import lru_cache
+
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
 from care_razorpay.settings import plugin_settings
-from care_razorpay.utils.razorpay import razorpay_client
+from care_razorpay.utils.signature import WebhookSignatureVerifier
+from care_razorpay.utils.tracing import span
+
+
+@lru_cache(maxsize=4)
+def build_webhook_signature_verifier(
+    secrets: tuple[str, ...],
+) -> WebhookSignatureVerifier:
+    return WebhookSignatureVerifier(secrets)
+
+
+def get_webhook_secrets() -> tuple[str, ...]:
+    """
+    Returns the active webhook secrets, the primary one first. The secrets
+    being rotated out may be configured as a list or as a comma separated
+    string; blank entries are dropped.
+    """
+    secrets = plugin_settings.RAZORPAY_WEBHOOK_SECRETS
+    if isinstance(secrets, str):
+        secrets = secrets.split(",")
+    secrets = [plugin_settings.RAZORPAY_WEBHOOK_SECRET, *secrets]
+    return tuple(secret.strip() for secret in secrets if secret and secret.strip())
+
+
+def get_webhook_signature_verifier() -> WebhookSignatureVerifier:
+    """
+    Returns the verifier for the currently active webhook secrets; the
+    primary secret is tried first, then the ones still being rotated out.
+    """
+    return build_webhook_signature_verifier(get_webhook_secrets())
 
 
 class RazorpayWebhookAuthentication(BaseAuthentication):
     """
     Authenticates Razorpay webhook requests by verifying the
     X-Razorpay-Signature header against the raw request body using the
-    configured webhook secret.
+    configured webhook secrets.
 
     On success, returns (None, {"source": "razorpay", "verified": True}).
     We intentionally do not associate a Django user with the request.
@@ -23,14 +53,9 @@ class RazorpayWebhookAuthentication(BaseAuthentication):
         if not signature:
             raise AuthenticationFailed("Missing X-Razorpay-Signature header")
 
-        try:
-            # request.body is bytes; SDK expects str
-            body_str = force_str(request.body)
-            webhook_secret = plugin_settings.RAZORPAY_WEBHOOK_SECRET
-            razorpay_client.utility.verify_webhook_signature(
-                body_str, signature, webhook_secret
-            )
-        except Exception as e:
-            raise AuthenticationFailed("Invalid webhook signature") from e
+        with span("signature_verification"):
+            verified = get_webhook_signature_verifier().verify(request.body, signature)
+        if not verified:
+            raise AuthenticationFailed("Invalid webhook signature")
 
         return None, {"source": "razorpay", "verified": True}
@@ -0,0 +1,14 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class RazorpayUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Razorpay is currently unavailable, please try again later."
+    default_code = "razorpay_unavailable"
+
+
+class RazorpayRateLimited(APIException):
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    default_detail = "Too many Razorpay requests, please try again later."
+    default_code = "razorpay_rate_limited"
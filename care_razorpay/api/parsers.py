@@ -0,0 +1,19 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from care_razorpay.utils.events import RazorpayEvent
+
+
+class RazorpayWebhookParser(BaseParser):
+    """
+    Decodes a Razorpay webhook body straight into a RazorpayEvent, in a
+    single pass over the raw bytes the signature was verified against.
+    """
+
+    media_type = "application/json"
+
+    def parse(self, stream, media_type=None, parser_context=None) -> RazorpayEvent:
+        try:
+            return RazorpayEvent.from_bytes(stream.read())
+        except ValueError as e:
+            raise ParseError(f"Invalid webhook event: {e}") from e
@@ -1,5 +1,9 @@
+import hmac
+
 from rest_framework.permissions import BasePermission
 
+from care_razorpay.settings import plugin_settings
+
 
 class IsSuperUserOrReadOnly(BasePermission):
     """
@@ -16,3 +20,21 @@ class IsSuperUserOrReadOnly(BasePermission):
         return (
             request.user and request.user.is_authenticated and request.user.is_superuser
         )
+
+
+class HasMetricsToken(BasePermission):
+    """
+    Allows requests bearing the configured RAZORPAY_METRICS_TOKEN, such as a
+    Prometheus scraper's. Denies everything while no token is configured.
+    """
+
+    def has_permission(self, request, view):
+        token = plugin_settings.RAZORPAY_METRICS_TOKEN
+        scheme, _, credentials = request.META.get("HTTP_AUTHORIZATION", "").partition(
+            " "
+        )
+        return bool(
+            token
+            and scheme.lower() == "bearer"
+            and hmac.compare_digest(credentials.encode(), token.encode())
+        )
@@ -0,0 +1,20 @@
+from pydantic import UUID4, BaseModel, field_validator
+
+from care_razorpay.settings import plugin_settings
+
+
+class BulkInvoiceRequest(BaseModel):
+    invoice_ids: list[UUID4]
+
+    @field_validator("invoice_ids")
+    @classmethod
+    def validate_invoice_ids(cls, value):
+        value = list(dict.fromkeys(value))
+        if not value:
+            raise ValueError("At least one invoice is required")
+        if len(value) > plugin_settings.RAZORPAY_BULK_MAX_SIZE:
+            raise ValueError(
+                f"At most {plugin_settings.RAZORPAY_BULK_MAX_SIZE} invoices can be "
+                "processed at once"
+            )
+        return value
@@ -0,0 +1,33 @@
+from pydantic import UUID4, BaseModel, PrivateAttr, ValidationError, model_validator
+
+from care.emr.models.invoice import Invoice
+from care_razorpay.utils.invoice import get_invoice
+
+
+class InvoiceRequest(BaseModel):
+    invoice_id: UUID4
+
+    _invoice: Invoice | None = PrivateAttr(default=None)
+
+    @model_validator(mode="after")
+    def validate_invoice_id(self):
+        # Loaded once along with its related objects and reused by the viewset
+        self._invoice = get_invoice(self.invoice_id)
+        if not self._invoice:
+            # Reported against the field, as clients expect
+            raise ValidationError.from_exception_data(
+                type(self).__name__,
+                [
+                    {
+                        "type": "value_error",
+                        "loc": ("invoice_id",),
+                        "input": str(self.invoice_id),
+                        "ctx": {"error": ValueError("Invoice not found")},
+                    }
+                ],
+            )
+        return self
+
+    @property
+    def invoice(self) -> Invoice:
+        return self._invoice
@@ -2,27 +2,40 @@ from datetime import UTC, datetime
 from enum import Enum
 
 from django.core.validators import validate_email
-from pydantic import UUID4, BaseModel, field_validator, model_validator
+from pydantic import BaseModel, field_validator, model_validator
 
-from care.emr.models.invoice import Invoice
 from care.utils.models.validators import mobile_validator
+from care_razorpay.api.serializers.bulk import BulkInvoiceRequest
+from care_razorpay.api.serializers.invoice import InvoiceRequest
 
 
-class CreatePaymentLinkRequest(BaseModel):
-    invoice_id: UUID4
-    email: str | None = None
-    phone_number: str | None = None
+class PaymentLinkOptions(BaseModel):
     is_partial_payment_allowed: bool = False
     minimum_down_payment: float | None = None
     expires_at: datetime | None = None
 
-    @field_validator("invoice_id")
+    @field_validator("expires_at")
     @classmethod
-    def validate_invoice_id(cls, value):
-        if value and not Invoice.objects.filter(external_id=value).exists():
-            raise ValueError("Invoice not found")
+    def validate_expires_at(cls, value):
+        if value:
+            now = datetime.now(UTC)
+            if value <= now:
+                raise ValueError("Expiration date must be in the future")
         return value
 
+    @model_validator(mode="after")
+    def validate_minimum_down_payment(self):
+        if self.is_partial_payment_allowed and not self.minimum_down_payment:
+            raise ValueError(
+                "Minimum down payment is required when partial payment is allowed"
+            )
+        return self
+
+
+class CreatePaymentLinkRequest(InvoiceRequest, PaymentLinkOptions):
+    email: str | None = None
+    phone_number: str | None = None
+
     @field_validator("phone_number")
     @classmethod
     def validate_phone_number(cls, value):
@@ -41,22 +54,9 @@ class CreatePaymentLinkRequest(BaseModel):
             raise ValueError("Invalid email") from e
         return value
 
-    @field_validator("expires_at")
-    @classmethod
-    def validate_expires_at(cls, value):
-        if value:
-            now = datetime.now(UTC)
-            if value <= now:
-                raise ValueError("Expiration date must be in the future")
-        return value
 
-    @model_validator(mode="after")
-    def validate_minimum_down_payment(self):
-        if self.is_partial_payment_allowed and not self.minimum_down_payment:
-            raise ValueError(
-                "Minimum down payment is required when partial payment is allowed"
-            )
-        return self
+class BulkCreatePaymentLinkRequest(BulkInvoiceRequest, PaymentLinkOptions):
+    pass
 
 
 class PaymentLinkStatus(str, Enum):
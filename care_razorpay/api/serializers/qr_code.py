@@ -1,9 +1,10 @@
 from datetime import UTC, datetime
 from enum import Enum
 
-from pydantic import UUID4, BaseModel, field_validator, model_validator
+from pydantic import BaseModel, field_validator, model_validator
 
-from care.emr.models.invoice import Invoice
+from care_razorpay.api.serializers.bulk import BulkInvoiceRequest
+from care_razorpay.api.serializers.invoice import InvoiceRequest
 
 
 class QRCodeUsage(str, Enum):
@@ -11,19 +12,11 @@ class QRCodeUsage(str, Enum):
     MULTIPLE_USE = "multiple_use"
 
 
-class CreateQRCodeRequest(BaseModel):
-    invoice_id: UUID4
+class QRCodeOptions(BaseModel):
     usage: QRCodeUsage
     is_amount_fixed: bool
     closes_at: datetime | None = None
 
-    @field_validator("invoice_id")
-    @classmethod
-    def validate_invoice_id(cls, value):
-        if value and not Invoice.objects.filter(external_id=value).exists():
-            raise ValueError("Invoice not found")
-        return value
-
     @field_validator("closes_at")
     @classmethod
     def validate_expires_at(cls, value):
@@ -40,6 +33,14 @@ class CreateQRCodeRequest(BaseModel):
         return self
 
 
+class CreateQRCodeRequest(InvoiceRequest, QRCodeOptions):
+    pass
+
+
+class BulkCreateQRCodeRequest(BulkInvoiceRequest, QRCodeOptions):
+    pass
+
+
 class QRCodeStatus(str, Enum):
     ACTIVE = "active"
     CLOSED = "closed"
@@ -20,8 +20,9 @@ class RazorpayAccountSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         data = super().to_representation(instance)
 
-        if instance.facility:
-            data["facility_id"] = instance.facility.external_id
+        # The foreign key targets the facility external id, no need to load it
+        if instance.facility_id:
+            data["facility_id"] = instance.facility_id
         return data
 
     def validate_facility_id(self, value):
@@ -2,8 +2,20 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
+from care_razorpay.tasks.rebalance import get_rebalance_metrics
+from care_razorpay.utils.circuit_breaker import get_circuit_breaker
+
 
 class HealthCheckViewSet(ViewSet):
     @action(detail=False, methods=["GET"])
     def ping(self, request):
         return Response({"status": "ok"})
+
+    @action(detail=False, methods=["GET"])
+    def rebalance(self, request):
+        return Response(get_rebalance_metrics())
+
+    @action(detail=False, methods=["GET"])
+    def circuit_breaker(self, request):
+        # The breaker is kept per process, this reports the serving worker's
+        return Response(get_circuit_breaker().get_status())
@@ -0,0 +1,22 @@
+from django.http import Http404, HttpResponse
+from rest_framework.viewsets import ViewSet
+
+from care_razorpay.api.permissions import HasMetricsToken
+from care_razorpay.utils.metrics import get_metrics, is_metrics_enabled
+
+
+class MetricsViewSet(ViewSet):
+    # Scrapers authenticate with the metrics token rather than a user
+    authentication_classes = ()
+    permission_classes = (HasMetricsToken,)
+
+    def list(self, request):
+        """
+        Exports the plugin's metrics in the Prometheus text format.
+        """
+        if not is_metrics_enabled():
+            raise Http404
+
+        from prometheus_client import CONTENT_TYPE_LATEST
+
+        return HttpResponse(get_metrics().export(), content_type=CONTENT_TYPE_LATEST)
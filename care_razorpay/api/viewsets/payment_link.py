@@ -1,41 +1,86 @@
+from django_filters import rest_framework as filters
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
 from care.emr.api.viewsets.base import emr_exception_handler
-from care.emr.models.invoice import Invoice
 from care_razorpay.api.serializers.payment_link import (
+    BulkCreatePaymentLinkRequest,
     CreatePaymentLinkRequest,
     PaymentLink,
 )
+from care_razorpay.models.payment_link import RazorpayPaymentLink
+from care_razorpay.utils.bulk import run_razorpay_concurrently
+from care_razorpay.utils.cache import cache_payment_link, get_payment_link
+from care_razorpay.utils.circuit_breaker import CircuitOpen
+from care_razorpay.utils.facility import filter_accessible_facilities
+from care_razorpay.utils.invoice import get_invoices
+from care_razorpay.utils.mirror import bulk_upsert_payment_links, upsert_payment_link
+from care_razorpay.utils.payloads import build_payment_link_payload
+from care_razorpay.utils.rate_limit import RateLimitExceeded
 from care_razorpay.utils.razorpay import razorpay_client
+from care_razorpay.utils.tracing import TracedViewSetMixin, span
 
 
-class PaymentLinkViewSet(GenericViewSet):
+class PaymentLinkFilters(filters.FilterSet):
+    invoice = filters.UUIDFilter(field_name="invoice_external_id")
+    facility = filters.UUIDFilter(field_name="facility_id")
+    status = filters.CharFilter(field_name="status")
+    expire_by = filters.IsoDateTimeFromToRangeFilter(field_name="expire_by")
+
+
+class PaymentLinkViewSet(TracedViewSetMixin, GenericViewSet):
     permission_classes = (IsAuthenticated,)
+    queryset = RazorpayPaymentLink.objects.all()
+    filter_backends = (filters.DjangoFilterBackend,)
+    filterset_class = PaymentLinkFilters
 
     def get_exception_handler(self):
         return emr_exception_handler
 
+    def get_queryset(self):
+        queryset = filter_accessible_facilities(self.queryset, self.request.user)
+        return queryset.order_by("-created_date")
+
+    @extend_schema(
+        description="List the Razorpay payment links created for accessible facilities",
+        responses={200: PaymentLink},
+    )
+    def list(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        data = [PaymentLink.model_validate(obj.metadata).model_dump() for obj in page]
+        return self.get_paginated_response(data)
+
     @extend_schema(
         description="Retrieve a Razorpay payment link",
         responses={200: PaymentLink},
     )
     def retrieve(self, request, pk):
         try:
-            payment_link = razorpay_client.payment_link.fetch(pk)
+            payment_link = get_payment_link(
+                pk, refresh=request.query_params.get("refresh") == "true"
+            )
+        except CircuitOpen as e:
+            return Response(
+                {"detail": str(e)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        except RateLimitExceeded as e:
+            return Response(
+                {"detail": str(e)},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
         except Exception as e:
             return Response(
                 {"detail": str(e)},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        return Response(
-            PaymentLink.model_validate(payment_link).model_dump(),
-            status=status.HTTP_200_OK,
-        )
+        return Response(payment_link, status=status.HTTP_200_OK)
 
     @extend_schema(
         description="Create a Razorpay payment link",
@@ -43,69 +88,32 @@ class PaymentLinkViewSet(GenericViewSet):
         responses={200: PaymentLink},
     )
     def create(self, request):
-        data = CreatePaymentLinkRequest.model_validate(request.data)
-
-        invoice = Invoice.objects.get(external_id=data.invoice_id)
+        with span("validation"):
+            data = CreatePaymentLinkRequest.model_validate(request.data)
+        invoice = data.invoice
 
-        if not hasattr(invoice.facility, "razorpayaccount"):
-            return Response(
-                {"detail": "Razorpay account not found for facility"},
-                status=status.HTTP_400_BAD_REQUEST,
+        # Covers any related objects the payload loads lazily
+        with span("build_payload"):
+            if not hasattr(invoice.facility, "razorpayaccount"):
+                return Response(
+                    {"detail": "Razorpay account not found for facility"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            payload = build_payment_link_payload(
+                invoice, data, email=data.email, phone_number=data.phone_number
             )
 
         try:
-            payment_link = razorpay_client.payment_link.create(
-                {
-                    "amount": float(invoice.total_gross) * 100,
-                    "currency": "INR",
-                    "accept_partial": data.is_partial_payment_allowed,
-                    "first_min_partial_amount": data.minimum_down_payment,
-                    "description": invoice.title,
-                    "customer": {
-                        "name": invoice.patient.name,
-                        "email": data.email,
-                        "contact": data.phone_number,
-                    },
-                    "notify": {
-                        "sms": data.phone_number is not None,
-                        "email": data.email is not None,
-                    },
-                    "reminder_enable": True,
-                    "expire_by": int((data.expires_at).timestamp())
-                    if data.expires_at
-                    else None,
-                    "notes": {
-                        "invoice_id": str(invoice.external_id),
-                        "account_id": str(invoice.account.external_id),
-                        "patient_id": str(invoice.patient.external_id),
-                        "facility_id": str(invoice.facility.external_id),
-                    },
-                    "options": {
-                        "checkout": {
-                            "method": {
-                                "netbanking": True,
-                                "card": True,
-                            }
-                        },
-                        "order": {
-                            "transfers": [
-                                {
-                                    "account": invoice.facility.razorpayaccount.account_id,
-                                    "amount": float(invoice.total_gross) * 100,
-                                    "currency": "INR",
-                                    "notes": {
-                                        "invoice_id": str(invoice.external_id),
-                                        "account_id": str(invoice.account.external_id),
-                                        "patient_id": str(invoice.patient.external_id),
-                                        "facility_id": str(
-                                            invoice.facility.external_id
-                                        ),
-                                    },
-                                }
-                            ]
-                        },
-                    },
-                }
+            payment_link = razorpay_client.payment_link.create(payload)
+        except CircuitOpen as e:
+            return Response(
+                {"detail": str(e)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        except RateLimitExceeded as e:
+            return Response(
+                {"detail": str(e)},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
             )
         except Exception as e:
             return Response(
@@ -113,7 +121,69 @@ class PaymentLinkViewSet(GenericViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        with span("mirror_upsert"):
+            upsert_payment_link(payment_link)
+
         return Response(
-            PaymentLink.model_validate(payment_link).model_dump(),
+            cache_payment_link(payment_link),
             status=status.HTTP_201_CREATED,
         )
+
+    @extend_schema(
+        description=(
+            "Create Razorpay payment links for many invoices at once. "
+            "The outcome is reported per invoice."
+        ),
+        request=BulkCreatePaymentLinkRequest,
+    )
+    @action(detail=False, methods=["POST"])
+    def bulk_create(self, request):
+        data = BulkCreatePaymentLinkRequest.model_validate(request.data)
+
+        invoices = get_invoices(data.invoice_ids)
+
+        results = {}
+        payloads = {}
+        for invoice_id in data.invoice_ids:
+            invoice = invoices.get(invoice_id)
+            if not invoice:
+                results[invoice_id] = {"detail": "Invoice not found"}
+            elif not hasattr(invoice.facility, "razorpayaccount"):
+                results[invoice_id] = {
+                    "detail": "Razorpay account not found for facility"
+                }
+            else:
+                payloads[invoice_id] = build_payment_link_payload(invoice, data)
+
+        payment_links = []
+        with span("razorpay.payment_link.bulk_create", count=len(payloads)):
+            for invoice_id, payment_link, error in run_razorpay_concurrently(
+                lambda client, invoice_id: client.payment_link.create(
+                    payloads[invoice_id]
+                ),
+                payloads,
+            ):
+                if error:
+                    results[invoice_id] = {"detail": str(error)}
+                    continue
+                payment_links.append(payment_link)
+                results[invoice_id] = {"payment_link": cache_payment_link(payment_link)}
+
+        with span("mirror_upsert"):
+            bulk_upsert_payment_links(payment_links)
+
+        return Response(
+            {
+                "results": [
+                    {
+                        "invoice_id": invoice_id,
+                        "status": (
+                            "failed" if "detail" in results[invoice_id] else "success"
+                        ),
+                        **results[invoice_id],
+                    }
+                    for invoice_id in data.invoice_ids
+                ]
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -1,38 +1,99 @@
+import json
+import logging
+from itertools import chain
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django_filters import rest_framework as filters
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
 from care.emr.api.viewsets.base import emr_exception_handler
-from care.emr.models.invoice import Invoice
-from care_razorpay.api.serializers.qr_code import CreateQRCodeRequest, QRCode
+from care_razorpay.api.serializers.qr_code import (
+    BulkCreateQRCodeRequest,
+    CreateQRCodeRequest,
+    QRCode,
+)
+from care_razorpay.models.qr_code import RazorpayQRCode
+from care_razorpay.utils.bulk import (
+    get_streaming_content,
+    run_razorpay_concurrently,
+)
+from care_razorpay.utils.cache import cache_qr_code, get_qr_code
+from care_razorpay.utils.circuit_breaker import CircuitOpen
+from care_razorpay.utils.facility import filter_accessible_facilities
+from care_razorpay.utils.invoice import get_invoices
+from care_razorpay.utils.mirror import bulk_upsert_qr_codes, upsert_qr_code
+from care_razorpay.utils.payloads import build_qr_code_payload
+from care_razorpay.utils.rate_limit import RateLimitExceeded, get_bulk_rate_limiter
 from care_razorpay.utils.razorpay import razorpay_client
+from care_razorpay.utils.tracing import TracedViewSetMixin, span
+
+logger = logging.getLogger(__name__)
+
+MIRROR_FLUSH_SIZE = 50
 
 
-class QRCodeViewSet(GenericViewSet):
+class QRCodeFilters(filters.FilterSet):
+    invoice = filters.UUIDFilter(field_name="invoice_external_id")
+    facility = filters.UUIDFilter(field_name="facility_id")
+    status = filters.CharFilter(field_name="status")
+    close_by = filters.IsoDateTimeFromToRangeFilter(field_name="close_by")
+
+
+class QRCodeViewSet(TracedViewSetMixin, GenericViewSet):
     permission_classes = (IsAuthenticated,)
+    queryset = RazorpayQRCode.objects.all()
+    filter_backends = (filters.DjangoFilterBackend,)
+    filterset_class = QRCodeFilters
 
     def get_exception_handler(self):
         return emr_exception_handler
 
+    def get_queryset(self):
+        queryset = filter_accessible_facilities(self.queryset, self.request.user)
+        return queryset.order_by("-created_date")
+
+    @extend_schema(
+        description="List the Razorpay QR codes created for accessible facilities",
+        responses={200: QRCode},
+    )
+    def list(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        data = [QRCode.model_validate(obj.metadata).model_dump() for obj in page]
+        return self.get_paginated_response(data)
+
     @extend_schema(
         description="Retrieve a Razorpay QR code",
         responses={200: QRCode},
     )
     def retrieve(self, request, pk):
         try:
-            qr_code = razorpay_client.qrcode.fetch(pk)
+            qr_code = get_qr_code(
+                pk, refresh=request.query_params.get("refresh") == "true"
+            )
+        except CircuitOpen as e:
+            return Response(
+                {"detail": str(e)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        except RateLimitExceeded as e:
+            return Response(
+                {"detail": str(e)},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
         except Exception as e:
             return Response(
                 {"detail": str(e)},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        return Response(
-            QRCode.model_validate(qr_code).model_dump(),
-            status=status.HTTP_200_OK,
-        )
+        return Response(qr_code, status=status.HTTP_200_OK)
 
     @extend_schema(
         description="Create a Razorpay QR code",
@@ -40,39 +101,30 @@ class QRCodeViewSet(GenericViewSet):
         responses={200: QRCode},
     )
     def create(self, request):
-        data = CreateQRCodeRequest.model_validate(request.data)
+        with span("validation"):
+            data = CreateQRCodeRequest.model_validate(request.data)
+        invoice = data.invoice
 
-        invoice = Invoice.objects.get(external_id=data.invoice_id)
+        # Covers any related objects the payload loads lazily
+        with span("build_payload"):
+            if not hasattr(invoice.facility, "razorpayaccount"):
+                return Response(
+                    {"detail": "Razorpay account not found for facility"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            payload = build_qr_code_payload(invoice, data)
 
-        if not hasattr(invoice.facility, "razorpayaccount"):
+        try:
+            qr_code = razorpay_client.qrcode.create(payload)
+        except CircuitOpen as e:
             return Response(
-                {"detail": "Razorpay account not found for facility"},
-                status=status.HTTP_400_BAD_REQUEST,
+                {"detail": str(e)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
             )
-
-        # TODO: handle account transfer for QR code
-
-        try:
-            qr_code = razorpay_client.qrcode.create(
-                {
-                    "type": "upi_qr",
-                    "name": invoice.title or f"Invoice {invoice.external_id}",
-                    "usage": data.usage.value,
-                    "fixed_amount": data.is_amount_fixed,
-                    "payment_amount": float(invoice.total_gross) * 100
-                    if data.is_amount_fixed
-                    else None,
-                    "description": invoice.title,
-                    "close_by": int((data.closes_at).timestamp())
-                    if data.closes_at
-                    else None,
-                    "notes": {
-                        "invoice_id": str(invoice.external_id),
-                        "account_id": str(invoice.account.external_id),
-                        "patient_id": str(invoice.patient.external_id),
-                        "facility_id": str(invoice.facility.external_id),
-                    },
-                }
+        except RateLimitExceeded as e:
+            return Response(
+                {"detail": str(e)},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
             )
         except Exception as e:
             return Response(
@@ -80,7 +132,89 @@ class QRCodeViewSet(GenericViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        with span("mirror_upsert"):
+            upsert_qr_code(qr_code)
+
         return Response(
-            QRCode.model_validate(qr_code).model_dump(),
+            cache_qr_code(qr_code),
             status=status.HTTP_201_CREATED,
         )
+
+    def stream_bulk_create(self, payloads: dict):
+        """
+        Creates the QR codes and yields the outcome per invoice as they
+        complete. The created QR codes are mirrored in batches; the mirror is
+        refreshed on read anyway, so a failed write does not cut the stream.
+        """
+        qr_codes = []
+
+        def flush_mirror():
+            try:
+                bulk_upsert_qr_codes(qr_codes)
+            except Exception:
+                logger.exception("Failed to mirror %s Razorpay QR codes", len(qr_codes))
+            qr_codes.clear()
+
+        try:
+            for invoice_id, qr_code, error in run_razorpay_concurrently(
+                lambda client, invoice_id: client.qrcode.create(payloads[invoice_id]),
+                payloads,
+                rate_limiter=get_bulk_rate_limiter(),
+            ):
+                if error:
+                    yield {"invoice_id": invoice_id, "detail": str(error)}
+                    continue
+
+                qr_codes.append(qr_code)
+                if len(qr_codes) >= MIRROR_FLUSH_SIZE:
+                    flush_mirror()
+                yield {"invoice_id": invoice_id, "qr_code": cache_qr_code(qr_code)}
+        finally:
+            # Also runs when the client goes away mid-stream
+            flush_mirror()
+
+    @extend_schema(
+        description=(
+            "Create Razorpay QR codes for many invoices at once. The outcome is "
+            "streamed back per invoice as newline delimited JSON, in completion "
+            "order."
+        ),
+        request=BulkCreateQRCodeRequest,
+    )
+    @action(detail=False, methods=["POST"])
+    def bulk_create(self, request):
+        data = BulkCreateQRCodeRequest.model_validate(request.data)
+
+        # Everything that can fail outright happens before the response starts
+        invoices = get_invoices(data.invoice_ids)
+        failures = []
+        payloads = {}
+        with span("build_payload"):
+            for invoice_id in data.invoice_ids:
+                invoice = invoices.get(invoice_id)
+                if not invoice:
+                    failures.append(
+                        {"invoice_id": invoice_id, "detail": "Invoice not found"}
+                    )
+                elif not hasattr(invoice.facility, "razorpayaccount"):
+                    failures.append(
+                        {
+                            "invoice_id": invoice_id,
+                            "detail": "Razorpay account not found for facility",
+                        }
+                    )
+                else:
+                    payloads[invoice_id] = build_qr_code_payload(invoice, data)
+
+        lines = (
+            json.dumps(
+                {"status": "failed" if "detail" in result else "success", **result},
+                cls=DjangoJSONEncoder,
+            )
+            + "\n"
+            for result in chain(failures, self.stream_bulk_create(payloads))
+        )
+        return StreamingHttpResponse(
+            get_streaming_content(request._request, lines),
+            content_type="application/x-ndjson",
+        )
@@ -1,21 +1,50 @@
-from django.db.models import Q
+from django_filters import rest_framework as filters
 from rest_framework import serializers, status
 from rest_framework.decorators import action
-from rest_framework.mixins import CreateModelMixin, RetrieveModelMixin, UpdateModelMixin
+from rest_framework.mixins import (
+    CreateModelMixin,
+    ListModelMixin,
+    RetrieveModelMixin,
+    UpdateModelMixin,
+)
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from care.emr.models.organization import FacilityOrganizationUser, OrganizationUser
-from care.facility.models import Facility
+from care_razorpay.api.exceptions import RazorpayRateLimited, RazorpayUnavailable
 from care_razorpay.api.permissions import IsSuperUserOrReadOnly
 from care_razorpay.api.serializers.razorpay_account import RazorpayAccountSerializer
 from care_razorpay.models.razorpay_account import RazorpayAccount
-from care_razorpay.utils.razorpay import razorpay_client
+from care_razorpay.tasks.razorpay_account import schedule_razorpay_account_sync
+from care_razorpay.utils.circuit_breaker import CircuitOpen
+from care_razorpay.utils.facility import filter_accessible_facilities
+from care_razorpay.utils.rate_limit import RateLimitExceeded
+from care_razorpay.utils.razorpay_account import (
+    is_razorpay_account_stale,
+    sync_razorpay_account,
+)
+from care_razorpay.utils.tracing import TracedViewSetMixin, span
+
+
+class RazorpayAccountFilters(filters.FilterSet):
+    facility = filters.UUIDFilter(field_name="facility_id")
+    is_enabled = filters.BooleanFilter(field_name="is_enabled")
+    modified_date = filters.IsoDateTimeFromToRangeFilter(field_name="modified_date")
+
+
+class RazorpayAccountPagination(CursorPagination):
+    # Keyed on immutable fields; syncs move modified_date while clients page
+    ordering = ("-created_date", "-id")
+    page_size = 50
+    page_size_query_param = "limit"
+    max_page_size = 500
 
 
 class RazorpayAccountViewSet(
+    TracedViewSetMixin,
     GenericViewSet,
     CreateModelMixin,
+    ListModelMixin,
     RetrieveModelMixin,
     UpdateModelMixin,
 ):
@@ -23,51 +52,26 @@ class RazorpayAccountViewSet(
     queryset = RazorpayAccount.objects.all()
     serializer_class = RazorpayAccountSerializer
     lookup_field = "facility__external_id"
-
-    def get_facility_queryset(self):
-        qs = Facility.objects.all()
-        if self.request.user.is_superuser:
-            return qs
-
-        organization_ids = list(
-            OrganizationUser.objects.filter(user=self.request.user).values_list(
-                "organization_id", flat=True
-            )
-        )
-        return qs.filter(
-            Q(
-                id__in=FacilityOrganizationUser.objects.filter(
-                    user=self.request.user
-                ).values_list("organization__facility_id")
-            )
-            | Q(geo_organization_cache__overlap=organization_ids)
-        )
+    filter_backends = (filters.DjangoFilterBackend,)
+    filterset_class = RazorpayAccountFilters
+    pagination_class = RazorpayAccountPagination
 
     def get_queryset(self):
-        queryset = self.queryset
-        facilities = self.get_facility_queryset()
-        return queryset.filter(facility__in=facilities)
+        return filter_accessible_facilities(self.queryset, self.request.user)
 
     def sync_razorpay_account(
         self, razorpay_account: RazorpayAccount
     ) -> RazorpayAccount:
         try:
-            razorpay_account_details = razorpay_client.account.fetch(
-                razorpay_account.account_id
-            )
+            with span("razorpay_account_sync"):
+                return sync_razorpay_account(razorpay_account)
+        except CircuitOpen as e:
+            raise RazorpayUnavailable(str(e)) from e
+        except RateLimitExceeded as e:
+            raise RazorpayRateLimited(str(e)) from e
         except Exception as e:
             raise serializers.ValidationError({"detail": str(e)}) from e
 
-        if not razorpay_account_details:
-            raise serializers.ValidationError(
-                {"detail": "Razorpay account details not found on Razorpay"}
-            )
-
-        razorpay_account.metadata = razorpay_account_details
-        razorpay_account.save()
-
-        return razorpay_account
-
     def perform_create(self, serializer):
         razorpay_account = serializer.save()
         self.sync_razorpay_account(razorpay_account)
@@ -82,7 +86,12 @@ class RazorpayAccountViewSet(
     def details(self, request, facility__external_id):
         razorpay_account = self.get_object()
 
-        self.sync_razorpay_account(razorpay_account)
+        # Serve the stored metadata and refresh it in the background once it
+        # is stale, unless the caller explicitly asks for a synchronous sync
+        if request.query_params.get("refresh") == "true":
+            self.sync_razorpay_account(razorpay_account)
+        elif is_razorpay_account_stale(razorpay_account):
+            schedule_razorpay_account_sync(razorpay_account)
 
         return Response(
             RazorpayAccountSerializer(razorpay_account).data, status=status.HTTP_200_OK
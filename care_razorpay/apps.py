@@ -7,3 +7,7 @@ PLUGIN_NAME = "care_razorpay"
 class CareRazorpayConfig(AppConfig):
     name = PLUGIN_NAME
     verbose_name = _("Care Razorpay")
+
+    def ready(self):
+        import care_razorpay.signals  # noqa F401
+        import care_razorpay.tasks  # noqa F401
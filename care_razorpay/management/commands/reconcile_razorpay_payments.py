@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from care_razorpay.utils.reconciliation import reconcile_missed_payments
+
+
+class Command(BaseCommand):
+    help = (
+        "Record captured Razorpay payments within a time window that have no "
+        "payment reconciliation yet"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=float,
+            default=24,
+            help="Look back this many hours from now (default: 24)",
+        )
+        parser.add_argument("--from", dest="start", help="Window start (ISO 8601)")
+        parser.add_argument("--to", dest="end", help="Window end (ISO 8601)")
+
+    def parse_datetime(self, value):
+        parsed = parse_datetime(value)
+        if not parsed:
+            raise CommandError(f"Invalid datetime: {value}")
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def handle(self, *args, **options):
+        end = self.parse_datetime(options["end"]) if options["end"] else timezone.now()
+        if options["start"]:
+            start = self.parse_datetime(options["start"])
+        else:
+            start = end - timedelta(hours=options["hours"])
+
+        if start >= end:
+            raise CommandError("The window start must be before its end")
+
+        stats = reconcile_missed_payments(start, end)
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Saw {seen} payments: {recorded} recorded, {skipped} already "
+                "recorded, {unmatched} without a matching invoice".format(**stats)
+            )
+        )
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from care_razorpay.tasks.webhook import replay_dead_webhook_events
+
+
+class Command(BaseCommand):
+    help = "Return dead-lettered Razorpay webhook events to the inbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "external_ids",
+            nargs="*",
+            help="External ids of the events to replay (default: all dead events)",
+        )
+
+    def handle(self, *args, **options):
+        replayed = replay_dead_webhook_events(options["external_ids"] or None)
+        self.stdout.write(self.style.SUCCESS(f"Replayed {replayed} webhook events"))
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+
+from care_razorpay.settings import plugin_settings
+from care_razorpay.testing.fake_razorpay import FakeRazorpayConfig, FakeRazorpayServer
+
+
+class Command(BaseCommand):
+    help = "Serve an offline stand-in for the Razorpay API"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--latency", type=float, default=0, help="Seconds added to every response"
+        )
+        parser.add_argument(
+            "--latency-jitter",
+            type=float,
+            default=0,
+            help="Maximum random seconds added on top of the latency",
+        )
+        parser.add_argument(
+            "--error-rate",
+            type=float,
+            default=0,
+            help="Share of requests answered with a 500",
+        )
+        parser.add_argument(
+            "--rate-limit",
+            type=float,
+            default=0,
+            help="Requests per second before answering with a 429",
+        )
+        parser.add_argument(
+            "--webhook-url",
+            default="",
+            help="URL of the webhook endpoint, e.g. "
+            "http://localhost:9000/api/care_razorpay/webhook",
+        )
+
+    def handle(self, *args, **options):
+        server = FakeRazorpayServer(
+            (options["host"], options["port"]),
+            FakeRazorpayConfig(
+                latency=options["latency"],
+                latency_jitter=options["latency_jitter"],
+                error_rate=options["error_rate"],
+                rate_limit=options["rate_limit"],
+                webhook_url=options["webhook_url"],
+                webhook_secret=plugin_settings.RAZORPAY_WEBHOOK_SECRET,
+            ),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Serving a fake Razorpay API at {server.base_url}")
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
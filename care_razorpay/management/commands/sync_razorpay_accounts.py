@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from care_razorpay.utils.razorpay_account import sync_all_razorpay_accounts
+
+
+class Command(BaseCommand):
+    help = "Refresh the stored details of all Razorpay accounts from Razorpay"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Number of accounts loaded and fetched per chunk",
+        )
+
+    def handle(self, *args, **options):
+        stats = sync_all_razorpay_accounts(chunk_size=options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Synced {synced} accounts ({changed} changed, {errors} errors) "
+                "in {duration}s, {per_second} accounts/s".format(**stats)
+            )
+        )
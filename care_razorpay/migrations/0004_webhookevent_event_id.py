@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("care_razorpay", "0003_webhookevent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="webhookevent",
+            name="event_id",
+            field=models.CharField(max_length=255, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,142 @@
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("facility", "0478_facility_discount_codes_and_more"),
+        ("care_razorpay", "0004_webhookevent_event_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RazorpayPaymentLink",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "external_id",
+                    models.UUIDField(db_index=True, default=uuid.uuid4, unique=True),
+                ),
+                (
+                    "created_date",
+                    models.DateTimeField(auto_now_add=True, db_index=True, null=True),
+                ),
+                (
+                    "modified_date",
+                    models.DateTimeField(auto_now=True, db_index=True, null=True),
+                ),
+                ("deleted", models.BooleanField(db_index=True, default=False)),
+                ("razorpay_id", models.CharField(max_length=255, unique=True)),
+                ("invoice_external_id", models.UUIDField(db_index=True)),
+                ("status", models.CharField(max_length=32)),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=12)),
+                (
+                    "amount_paid",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("expire_by", models.DateTimeField(blank=True, null=True)),
+                ("metadata", models.JSONField(blank=True, default=dict)),
+                (
+                    "facility",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        to="facility.facility",
+                        to_field="external_id",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["invoice_external_id", "status"],
+                        name="razorpay_link_invoice_idx",
+                    ),
+                    models.Index(
+                        fields=["facility", "status"],
+                        name="razorpay_link_facility_idx",
+                    ),
+                    models.Index(
+                        fields=["status", "expire_by"],
+                        name="razorpay_link_expiry_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="RazorpayQRCode",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "external_id",
+                    models.UUIDField(db_index=True, default=uuid.uuid4, unique=True),
+                ),
+                (
+                    "created_date",
+                    models.DateTimeField(auto_now_add=True, db_index=True, null=True),
+                ),
+                (
+                    "modified_date",
+                    models.DateTimeField(auto_now=True, db_index=True, null=True),
+                ),
+                ("deleted", models.BooleanField(db_index=True, default=False)),
+                ("razorpay_id", models.CharField(max_length=255, unique=True)),
+                ("invoice_external_id", models.UUIDField(db_index=True)),
+                ("status", models.CharField(max_length=32)),
+                (
+                    "payment_amount",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=12, null=True
+                    ),
+                ),
+                (
+                    "payments_amount_received",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("close_by", models.DateTimeField(blank=True, null=True)),
+                ("metadata", models.JSONField(blank=True, default=dict)),
+                (
+                    "facility",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        to="facility.facility",
+                        to_field="external_id",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["invoice_external_id", "status"],
+                        name="razorpay_qr_invoice_idx",
+                    ),
+                    models.Index(
+                        fields=["facility", "status"],
+                        name="razorpay_qr_facility_idx",
+                    ),
+                    models.Index(
+                        fields=["status", "close_by"],
+                        name="razorpay_qr_expiry_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("care_razorpay", "0005_razorpaypaymentlink_razorpayqrcode"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="razorpayaccount",
+            name="metadata_synced_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
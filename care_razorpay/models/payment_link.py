@@ -0,0 +1,38 @@
+from django.db import models
+
+from care.utils.models.base import BaseModel
+
+
+class RazorpayPaymentLink(BaseModel):
+    """
+    Local mirror of a Razorpay payment link created through the plugin.
+    `metadata` holds the latest entity received from Razorpay.
+    """
+
+    razorpay_id = models.CharField(max_length=255, unique=True)
+    # External id of the invoice, as sent to Razorpay in the notes
+    invoice_external_id = models.UUIDField(db_index=True)
+    facility = models.ForeignKey(
+        "facility.Facility",
+        on_delete=models.PROTECT,
+        to_field="external_id",
+    )
+    status = models.CharField(max_length=32)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    amount_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    expire_by = models.DateTimeField(null=True, blank=True)
+    metadata = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["invoice_external_id", "status"],
+                name="razorpay_link_invoice_idx",
+            ),
+            models.Index(
+                fields=["facility", "status"], name="razorpay_link_facility_idx"
+            ),
+            models.Index(
+                fields=["status", "expire_by"], name="razorpay_link_expiry_idx"
+            ),
+        ]
@@ -0,0 +1,40 @@
+from django.db import models
+
+from care.utils.models.base import BaseModel
+
+
+class RazorpayQRCode(BaseModel):
+    """
+    Local mirror of a Razorpay QR code created through the plugin.
+    `metadata` holds the latest entity received from Razorpay.
+    """
+
+    razorpay_id = models.CharField(max_length=255, unique=True)
+    # External id of the invoice, as sent to Razorpay in the notes
+    invoice_external_id = models.UUIDField(db_index=True)
+    facility = models.ForeignKey(
+        "facility.Facility",
+        on_delete=models.PROTECT,
+        to_field="external_id",
+    )
+    status = models.CharField(max_length=32)
+    payment_amount = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True
+    )
+    payments_amount_received = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0
+    )
+    close_by = models.DateTimeField(null=True, blank=True)
+    metadata = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["invoice_external_id", "status"],
+                name="razorpay_qr_invoice_idx",
+            ),
+            models.Index(
+                fields=["facility", "status"], name="razorpay_qr_facility_idx"
+            ),
+            models.Index(fields=["status", "close_by"], name="razorpay_qr_expiry_idx"),
+        ]
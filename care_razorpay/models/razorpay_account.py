@@ -12,3 +12,4 @@ class RazorpayAccount(BaseModel):
     account_id = models.CharField(max_length=255, null=False, blank=False)
     is_enabled = models.BooleanField(default=True)
     metadata = models.JSONField(default=dict, blank=True)
+    metadata_synced_at = models.DateTimeField(null=True, blank=True)
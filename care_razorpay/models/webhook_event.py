@@ -0,0 +1,50 @@
+from enum import Enum
+
+from django.db import models
+from django.utils import timezone
+
+from care.utils.models.base import BaseModel
+
+
+class WebhookEventStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSED = "processed"
+    DEAD = "dead"
+
+
+class WebhookEvent(BaseModel):
+    """
+    Inbox of Razorpay webhook deliveries.
+
+    The webhook endpoint only verifies the signature and stores the raw event
+    here; the events are applied asynchronously by the webhook consumer tasks,
+    one task per lane.
+    """
+
+    # X-Razorpay-Event-Id, or a digest of the body when the header is absent
+    event_id = models.CharField(max_length=255, unique=True, null=True)
+    event = models.CharField(max_length=255)
+    # Events of the same partition (invoice or account) are applied in order,
+    # within a lane shared by the partitions that hash to it
+    partition_key = models.CharField(max_length=255, blank=True, default="")
+    lane = models.PositiveSmallIntegerField(default=0)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=16, default=WebhookEventStatus.PENDING.value, db_index=True
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="razorpay_webhook_pending_idx",
+            ),
+            models.Index(
+                fields=["lane", "status", "id"],
+                name="razorpay_webhook_lane_idx",
+            ),
+        ]
@@ -107,10 +107,62 @@ DEFAULTS = {
     "RAZORPAY_KEY_ID": "",
     "RAZORPAY_KEY_SECRET": "",
     "RAZORPAY_WEBHOOK_SECRET": "",
+    "RAZORPAY_WEBHOOK_SECRETS": [],
+    "RAZORPAY_WEBHOOK_BATCH_SIZE": 100,
+    "RAZORPAY_WEBHOOK_LANES": 16,
+    "RAZORPAY_WEBHOOK_MAX_ATTEMPTS": 5,
+    "RAZORPAY_WEBHOOK_RETRY_DELAY": 60,
+    "RAZORPAY_DEDUP_TTL": 24 * 60 * 60,
+    "RAZORPAY_REBALANCE_WINDOW": 10,
+    "RAZORPAY_BASE_URL": "https://api.razorpay.com",
+    "RAZORPAY_CLIENT_FACTORY": "care_razorpay.utils.razorpay.build_razorpay_client",
+    "RAZORPAY_HTTP_POOL_SIZE": 10,
+    "RAZORPAY_HTTP_CONNECT_TIMEOUT": 3.05,
+    "RAZORPAY_HTTP_READ_TIMEOUT": 10.0,
+    "RAZORPAY_HTTP_MAX_RETRIES": 2,
+    "RAZORPAY_HTTP_BACKOFF_FACTOR": 0.5,
+    "RAZORPAY_HTTP_BACKOFF_JITTER": 0.25,
+    "RAZORPAY_CACHE_ACTIVE_TTL": 15,
+    "RAZORPAY_CACHE_FINAL_TTL": 24 * 60 * 60,
+    "RAZORPAY_MIRROR_MAX_AGE": 5 * 60,
+    "RAZORPAY_BULK_MAX_SIZE": 500,
+    "RAZORPAY_BULK_MAX_WORKERS": 8,
+    "RAZORPAY_BULK_RATE_LIMIT": 10.0,
+    "RAZORPAY_RATE_LIMIT_MAX_WAIT": 5.0,
+    "RAZORPAY_ASYNC_CLIENT": False,
+    "RAZORPAY_ASYNC_MAX_CONNECTIONS": 50,
+    "RAZORPAY_PAYMENT_LINK_RATE_LIMIT": 20.0,
+    "RAZORPAY_QR_CODE_RATE_LIMIT": 20.0,
+    "RAZORPAY_ACCOUNT_RATE_LIMIT": 10.0,
+    "RAZORPAY_DEFAULT_RATE_LIMIT": 20.0,
+    "RAZORPAY_CIRCUIT_WINDOW": 60,
+    "RAZORPAY_CIRCUIT_MIN_CALLS": 10,
+    "RAZORPAY_CIRCUIT_FAILURE_RATE": 0.5,
+    "RAZORPAY_CIRCUIT_SLOW_CALL_THRESHOLD": 5.0,
+    "RAZORPAY_CIRCUIT_SLOW_CALL_RATE": 0.5,
+    "RAZORPAY_CIRCUIT_OPEN_DURATION": 30,
+    "RAZORPAY_ACCOUNT_FRESHNESS": 5 * 60,
+    "RAZORPAY_ACCOUNT_SYNC_INTERVAL": 6 * 60 * 60,
+    "RAZORPAY_ACCOUNT_SYNC_CHUNK_SIZE": 200,
+    "RAZORPAY_FACILITY_ACCESS_TTL": 10 * 60,
+    "RAZORPAY_METRICS_ENABLED": False,
+    "RAZORPAY_METRICS_TOKEN": "",
+    "RAZORPAY_TRACING_ENABLED": False,
+    "RAZORPAY_SLOW_CALL_LOG_THRESHOLD": 0.0,
+    "RAZORPAY_SWEEP_INTERVAL": 60 * 60,
+    "RAZORPAY_SWEEP_WINDOW": 2 * 60 * 60,
+    "RAZORPAY_SWEEP_BATCH_SIZE": 500,
+}
+
+IMPORT_STRINGS = {
+    "RAZORPAY_CLIENT_FACTORY",
 }
 
 plugin_settings = PluginSettings(
-    PLUGIN_NAME, defaults=DEFAULTS, required_settings=REQUIRED_SETTINGS
+    PLUGIN_NAME,
+    defaults=DEFAULTS,
+    import_strings=IMPORT_STRINGS,
+    required_settings=REQUIRED_SETTINGS,
 )
 
 
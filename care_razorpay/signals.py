@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from care.emr.models.organization import FacilityOrganizationUser, OrganizationUser
+from care.facility.models import Facility
+from care_razorpay.utils.facility import (
+    invalidate_accessible_facilities,
+    invalidate_all_accessible_facilities,
+)
+
+
+@receiver(post_save, sender=OrganizationUser)
+@receiver(post_delete, sender=OrganizationUser)
+@receiver(post_save, sender=FacilityOrganizationUser)
+@receiver(post_delete, sender=FacilityOrganizationUser)
+def invalidate_user_accessible_facilities(sender, instance, **kwargs):
+    invalidate_accessible_facilities(instance.user_id)
+
+
+@receiver(post_save, sender=Facility)
+@receiver(post_delete, sender=Facility)
+def invalidate_facility_access(sender, instance, **kwargs):
+    # The geo organizations of the facility may have changed
+    invalidate_all_accessible_facilities()
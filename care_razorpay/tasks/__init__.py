@@ -0,0 +1,26 @@
+from celery import current_app
+
+from care_razorpay.settings import plugin_settings
+from care_razorpay.tasks.razorpay_account import sync_razorpay_accounts_task
+from care_razorpay.tasks.reconciliation import reconcile_missed_payments_task
+from care_razorpay.tasks.webhook import process_webhook_events_task
+
+
+@current_app.on_after_finalize.connect
+def setup_periodic_tasks(sender, **kwargs):
+    # Picks up retries and anything left behind by a lost dispatch
+    sender.add_periodic_task(
+        60.0,
+        process_webhook_events_task.s(),
+        name="razorpay_process_webhook_events",
+    )
+    sender.add_periodic_task(
+        float(plugin_settings.RAZORPAY_ACCOUNT_SYNC_INTERVAL),
+        sync_razorpay_accounts_task.s(),
+        name="razorpay_sync_accounts",
+    )
+    sender.add_periodic_task(
+        float(plugin_settings.RAZORPAY_SWEEP_INTERVAL),
+        reconcile_missed_payments_task.s(),
+        name="razorpay_reconcile_missed_payments",
+    )
@@ -0,0 +1,36 @@
+from celery import shared_task
+from django.core.cache import cache
+
+from care_razorpay.models.razorpay_account import RazorpayAccount
+from care_razorpay.settings import plugin_settings
+from care_razorpay.utils.razorpay_account import (
+    sync_all_razorpay_accounts,
+    sync_razorpay_account,
+)
+
+ACCOUNT_SYNC_SCHEDULED_KEY = "care_razorpay:account_sync:{id}"
+
+
+def schedule_razorpay_account_sync(razorpay_account: RazorpayAccount) -> None:
+    """
+    Queues a background sync of the account, at most once per freshness
+    window no matter how many readers notice the account is stale.
+    """
+    if cache.add(
+        ACCOUNT_SYNC_SCHEDULED_KEY.format(id=razorpay_account.id),
+        1,
+        timeout=plugin_settings.RAZORPAY_ACCOUNT_FRESHNESS,
+    ):
+        sync_razorpay_account_task.delay(razorpay_account.id)
+
+
+@shared_task
+def sync_razorpay_account_task(razorpay_account_id: int):
+    razorpay_account = RazorpayAccount.objects.filter(id=razorpay_account_id).first()
+    if razorpay_account:
+        sync_razorpay_account(razorpay_account)
+
+
+@shared_task
+def sync_razorpay_accounts_task():
+    return sync_all_razorpay_accounts()
@@ -0,0 +1,56 @@
+from celery import shared_task
+from django.core.cache import cache
+
+from care.emr.resources.account.sync_items import rebalance_account_task
+from care_razorpay.settings import plugin_settings
+
+REBALANCE_PENDING_KEY = "care_razorpay:rebalance:pending:{account_id}"
+REBALANCE_METRICS_KEY = "care_razorpay:rebalance:metrics:{metric}"
+REBALANCE_METRICS = ("requested", "merged", "dispatched")
+
+
+def _increment_metric(metric: str) -> None:
+    key = REBALANCE_METRICS_KEY.format(metric=metric)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr, the counter simply restarts
+        cache.add(key, 1, timeout=None)
+
+
+def get_rebalance_metrics() -> dict[str, int]:
+    values = cache.get_many(
+        [REBALANCE_METRICS_KEY.format(metric=metric) for metric in REBALANCE_METRICS]
+    )
+    return {
+        metric: values.get(REBALANCE_METRICS_KEY.format(metric=metric), 0)
+        for metric in REBALANCE_METRICS
+    }
+
+
+def schedule_account_rebalance(account_id: int) -> None:
+    """
+    Requests a rebalance of the account. Requests for the same account that
+    arrive within the coalescing window are merged into a single rebalance,
+    which runs once the window has elapsed.
+    """
+    _increment_metric("requested")
+
+    window = plugin_settings.RAZORPAY_REBALANCE_WINDOW
+    pending_key = REBALANCE_PENDING_KEY.format(account_id=account_id)
+    # The marker outlives the window so a lost task cannot block the account
+    # for longer than a few windows.
+    if cache.add(pending_key, 1, timeout=window * 10 + 60):
+        rebalance_account_coalesced_task.apply_async((account_id,), countdown=window)
+    else:
+        _increment_metric("merged")
+
+
+@shared_task
+def rebalance_account_coalesced_task(account_id: int):
+    # Cleared before rebalancing so that payments landing while the rebalance
+    # runs schedule a fresh one instead of being merged into this run.
+    cache.delete(REBALANCE_PENDING_KEY.format(account_id=account_id))
+    _increment_metric("dispatched")
+    rebalance_account_task(account_id)
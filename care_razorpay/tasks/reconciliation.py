@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from celery import shared_task
+from django.utils import timezone
+
+from care_razorpay.settings import plugin_settings
+from care_razorpay.utils.reconciliation import reconcile_missed_payments
+
+# Leaves payments that are still being delivered to the webhooks alone
+SWEEP_LAG = timedelta(minutes=5)
+
+
+@shared_task
+def reconcile_missed_payments_task():
+    end = timezone.now() - SWEEP_LAG
+    start = end - timedelta(seconds=plugin_settings.RAZORPAY_SWEEP_WINDOW)
+    return reconcile_missed_payments(start, end)
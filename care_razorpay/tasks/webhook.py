@@ -0,0 +1,81 @@
+from celery import shared_task
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from care_razorpay.models.webhook_event import WebhookEvent, WebhookEventStatus
+from care_razorpay.settings import plugin_settings
+from care_razorpay.utils.webhook import (
+    WEBHOOK_LANE_LOCK_TIMEOUT,
+    drain_webhook_lane,
+    get_due_webhook_lanes,
+)
+
+WEBHOOK_LANE_PENDING_KEY = "care_razorpay:webhook:lane:pending:{lane}"
+# Delay before retrying a lane that is being drained by another worker,
+# doubled on every consecutive retry up to the maximum
+WEBHOOK_LANE_BUSY_DELAY = 1
+WEBHOOK_LANE_BUSY_MAX_DELAY = 30
+
+
+def schedule_webhook_lane(lane: int, busy_retries: int = 0) -> None:
+    """
+    Dispatches a drain of the lane, unless one is already waiting to run.
+    Lanes are drained in parallel by however many workers there are.
+    """
+    pending_key = WEBHOOK_LANE_PENDING_KEY.format(lane=lane)
+    if cache.add(pending_key, 1, timeout=WEBHOOK_LANE_LOCK_TIMEOUT):
+        countdown = 0
+        if busy_retries:
+            countdown = min(
+                WEBHOOK_LANE_BUSY_DELAY * 2 ** (busy_retries - 1),
+                WEBHOOK_LANE_BUSY_MAX_DELAY,
+            )
+        process_webhook_lane_task.apply_async(
+            (lane,), {"busy_retries": busy_retries}, countdown=countdown
+        )
+
+
+@shared_task
+def process_webhook_lane_task(lane: int, busy_retries: int = 0):
+    # Cleared before draining so that events landing during the drain
+    # schedule another run instead of being missed by this one.
+    cache.delete(WEBHOOK_LANE_PENDING_KEY.format(lane=lane))
+
+    attempted = drain_webhook_lane(lane)
+    if attempted is None:
+        # The current drainer picks up new events of the lane as it goes
+        schedule_webhook_lane(lane, busy_retries=busy_retries + 1)
+    elif attempted >= plugin_settings.RAZORPAY_WEBHOOK_BATCH_SIZE:
+        schedule_webhook_lane(lane)
+
+
+@shared_task
+def process_webhook_events_task():
+    for lane in get_due_webhook_lanes():
+        schedule_webhook_lane(lane)
+
+
+def replay_dead_webhook_events(external_ids: list[str] | None = None) -> int:
+    """
+    Returns dead-lettered webhook events, all or the given ones, to the inbox
+    with a fresh attempt budget and drains their lanes.
+
+    Returns the number of events replayed.
+    """
+    queryset = WebhookEvent.objects.filter(status=WebhookEventStatus.DEAD.value)
+    if external_ids is not None:
+        queryset = queryset.filter(external_id__in=external_ids)
+
+    with transaction.atomic():
+        lanes = set(queryset.values_list("lane", flat=True))
+        now = timezone.now()
+        replayed = queryset.update(
+            status=WebhookEventStatus.PENDING.value,
+            attempts=0,
+            next_attempt_at=now,
+            modified_date=now,
+        )
+        for lane in lanes:
+            transaction.on_commit(lambda lane=lane: schedule_webhook_lane(lane))
+    return replayed
@@ -0,0 +1,477 @@
+"""
+Offline stand-in for the parts of the Razorpay API the plugin calls, for
+integration and load testing without network access or credentials.
+
+Point RAZORPAY_BASE_URL at a running FakeRazorpayServer. Besides the payment
+link, QR code, account and payment endpoints it serves control endpoints
+that pay a payment link or QR code and deliver the resulting webhook,
+signed with the configured secret, to WebhookViewSet:
+
+    POST /_fake/payment_links/<id>/pay  {"amount": <paise>}
+    POST /_fake/qr_codes/<id>/pay       {"amount": <paise>}
+
+Latency, server errors and rate limiting (HTTP 429) can be injected into the
+API endpoints through FakeRazorpayConfig.
+
+This module is a test double: nothing in the plugin imports it at runtime.
+It has no Django dependencies so that it can be started in-process by tests
+and benchmarks.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FakeRazorpayConfig:
+    # Seconds added to every API response, plus up to `latency_jitter` more
+    latency: float = 0
+    latency_jitter: float = 0
+    # Share of API requests answered with a 500
+    error_rate: float = 0
+    # API requests per second answered before responding with 429, 0 disables
+    rate_limit: float = 0
+    # Base URL of WebhookViewSet, e.g. http://localhost:9000/api/care_razorpay/webhook
+    webhook_url: str = ""
+    webhook_secret: str = ""
+
+
+class FakeRazorpayError(Exception):
+    def __init__(self, status: int, code: str, description: str) -> None:
+        super().__init__(description)
+        self.status = status
+        self.code = code
+        self.description = description
+
+
+def generate_id(prefix: str) -> str:
+    return f"{prefix}_{secrets.token_hex(7)}"
+
+
+def sign_webhook(body: bytes, secret: str) -> str:
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+class FakeRazorpay:
+    """
+    In-memory Razorpay state with the behaviour of the API endpoints.
+    """
+
+    def __init__(self, config: FakeRazorpayConfig | None = None) -> None:
+        self.config = config or FakeRazorpayConfig()
+        self.payment_links = {}
+        self.qr_codes = {}
+        self.accounts = {}
+        self.payments = {}
+        # QR code of each QR code payment, by payment id
+        self.qr_code_payments = {}
+        self.webhook_deliveries = []
+        self.requests = deque()
+        self.lock = threading.Lock()
+
+    def throttle(self) -> None:
+        """
+        Applies the configured latency, rate limit and error rate to an API
+        request.
+        """
+        config = self.config
+        if config.latency or config.latency_jitter:
+            time.sleep(config.latency + random.uniform(0, config.latency_jitter))
+
+        if config.rate_limit:
+            now = time.monotonic()
+            with self.lock:
+                while self.requests and self.requests[0] <= now - 1:
+                    self.requests.popleft()
+                if len(self.requests) >= config.rate_limit:
+                    raise FakeRazorpayError(
+                        429, "BAD_REQUEST_ERROR", "Too many requests"
+                    )
+                self.requests.append(now)
+
+        if config.error_rate and random.random() < config.error_rate:
+            raise FakeRazorpayError(
+                500, "SERVER_ERROR", "The server encountered an error"
+            )
+
+    def get_entity(self, entities: dict, entity_id: str) -> dict:
+        with self.lock:
+            entity = entities.get(entity_id)
+        if entity is None:
+            raise FakeRazorpayError(
+                400, "BAD_REQUEST_ERROR", "The id provided does not exist"
+            )
+        return entity
+
+    def create_payment_link(self, data: dict) -> dict:
+        if not data.get("amount"):
+            raise FakeRazorpayError(
+                400, "BAD_REQUEST_ERROR", "The amount field is required."
+            )
+        now = int(time.time())
+        payment_link_id = generate_id("plink")
+        payment_link = {
+            "id": payment_link_id,
+            "entity": "payment_link",
+            "amount": data["amount"],
+            "amount_paid": 0,
+            "currency": data.get("currency", "INR"),
+            "accept_partial": data.get("accept_partial", False),
+            "first_min_partial_amount": data.get("first_min_partial_amount", 0),
+            "description": data.get("description", ""),
+            "reference_id": data.get("reference_id", ""),
+            "customer": data.get("customer", {}),
+            "notify": data.get("notify", {}),
+            "reminder_enable": data.get("reminder_enable", False),
+            "notes": data.get("notes") or [],
+            "options": data.get("options"),
+            "callback_url": data.get("callback_url", ""),
+            "callback_method": data.get("callback_method", ""),
+            "short_url": f"https://rzp.io/i/{payment_link_id}",
+            "order_id": generate_id("order"),
+            "status": "created",
+            "expire_by": data.get("expire_by", 0),
+            "expired_at": 0,
+            "cancelled_at": 0,
+            "payments": None,
+            "upi_link": data.get("upi_link", False),
+            "user_id": "",
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self.lock:
+            self.payment_links[payment_link_id] = payment_link
+        return payment_link
+
+    def create_qr_code(self, data: dict) -> dict:
+        now = int(time.time())
+        qr_code_id = generate_id("qr")
+        qr_code = {
+            "id": qr_code_id,
+            "entity": "qr_code",
+            "name": data.get("name", ""),
+            "usage": data.get("usage", "single_use"),
+            "type": data.get("type", "upi_qr"),
+            "image_url": f"https://rzp.io/i/{qr_code_id}",
+            "payment_amount": data.get("payment_amount"),
+            "fixed_amount": data.get("fixed_amount", False),
+            "description": data.get("description", ""),
+            "customer_id": data.get("customer_id", ""),
+            "notes": data.get("notes") or [],
+            "status": "active",
+            "payments_amount_received": 0,
+            "payments_count_received": 0,
+            "close_by": data.get("close_by"),
+            "closed_at": None,
+            "close_reason": None,
+            "created_at": now,
+        }
+        with self.lock:
+            self.qr_codes[qr_code_id] = qr_code
+        return qr_code
+
+    def create_account(self, data: dict) -> dict:
+        account = {
+            **data,
+            "id": generate_id("acc"),
+            "type": data.get("type", "route"),
+            "status": "created",
+            "created_at": int(time.time()),
+        }
+        with self.lock:
+            self.accounts[account["id"]] = account
+        return account
+
+    def get_account(self, account_id: str) -> dict:
+        # Accounts are created on the Razorpay dashboard, so any id is known
+        with self.lock:
+            return self.accounts.setdefault(
+                account_id,
+                {
+                    "id": account_id,
+                    "type": "route",
+                    "status": "activated",
+                    "email": f"{account_id}@example.com",
+                    "legal_business_name": f"Facility {account_id}",
+                    "created_at": int(time.time()),
+                },
+            )
+
+    def list_payments(self, params: dict, qr_code_id: str | None = None) -> dict:
+        start = int(params.get("from", 0))
+        end = int(params.get("to", time.time()))
+        count = int(params.get("count", 10))
+        skip = int(params.get("skip", 0))
+        with self.lock:
+            payments = sorted(
+                (
+                    payment
+                    for payment in self.payments.values()
+                    if start <= payment["created_at"] <= end
+                    and (
+                        qr_code_id is None
+                        or self.qr_code_payments.get(payment["id"]) == qr_code_id
+                    )
+                ),
+                key=lambda payment: payment["created_at"],
+                reverse=True,
+            )[skip:][:count]
+        return {"entity": "collection", "count": len(payments), "items": payments}
+
+    def list_qr_code_payments(self, qr_code_id: str, params: dict) -> dict:
+        self.get_entity(self.qr_codes, qr_code_id)
+        return self.list_payments(params, qr_code_id=qr_code_id)
+
+    def create_payment(self, entity: dict, amount: int, **fields) -> dict:
+        payment = {
+            "id": generate_id("pay"),
+            "entity": "payment",
+            "amount": amount,
+            "currency": entity.get("currency", "INR"),
+            "status": "captured",
+            "method": "upi",
+            "captured": True,
+            "description": entity.get("description", ""),
+            "notes": entity.get("notes") or [],
+            "created_at": int(time.time()),
+            **fields,
+        }
+        self.payments[payment["id"]] = payment
+        return payment
+
+    def pay_payment_link(self, payment_link_id: str, amount: int | None = None):
+        """
+        Pays `amount` (the outstanding amount by default) on a payment link and
+        returns the webhook event it triggers.
+        """
+        payment_link = self.get_entity(self.payment_links, payment_link_id)
+        with self.lock:
+            outstanding = payment_link["amount"] - payment_link["amount_paid"]
+            if outstanding <= 0:
+                raise FakeRazorpayError(
+                    400, "BAD_REQUEST_ERROR", "The payment link is already paid"
+                )
+            amount = min(amount or outstanding, outstanding)
+            payment = self.create_payment(
+                payment_link, amount, order_id=payment_link["order_id"]
+            )
+            payment_link["amount_paid"] += amount
+            payment_link["status"] = (
+                "paid"
+                if payment_link["amount_paid"] >= payment_link["amount"]
+                else "partially_paid"
+            )
+            payment_link["updated_at"] = payment["created_at"]
+            payment_link = dict(payment_link)
+
+        return self.build_event(
+            f"payment_link.{payment_link['status']}",
+            {"payment_link": payment_link, "payment": payment},
+        )
+
+    def pay_qr_code(self, qr_code_id: str, amount: int | None = None) -> dict:
+        """
+        Pays `amount` (the fixed amount by default) on a QR code and returns
+        the webhook event it triggers.
+        """
+        qr_code = self.get_entity(self.qr_codes, qr_code_id)
+        with self.lock:
+            amount = amount or qr_code["payment_amount"] or 100
+            # Like on Razorpay, QR code payments carry no notes and no
+            # reference to their QR code
+            payment = self.create_payment(qr_code, amount, notes=[])
+            self.qr_code_payments[payment["id"]] = qr_code_id
+            qr_code["payments_amount_received"] += amount
+            qr_code["payments_count_received"] += 1
+            if qr_code["usage"] == "single_use":
+                qr_code["status"] = "closed"
+                qr_code["closed_at"] = payment["created_at"]
+                qr_code["close_reason"] = "paid"
+            qr_code = dict(qr_code)
+
+        return self.build_event(
+            "qr_code.credited", {"qr_code": qr_code, "payment": payment}
+        )
+
+    def build_event(self, event: str, entities: dict) -> dict:
+        return {
+            "entity": "event",
+            "event": event,
+            "contains": list(entities),
+            "payload": {name: {"entity": entity} for name, entity in entities.items()},
+            "created_at": int(time.time()),
+        }
+
+    def deliver_webhook(self, event: dict) -> int | None:
+        """
+        Delivers a signed webhook event to WebhookViewSet, returning the status
+        code of the delivery.
+        """
+        if not self.config.webhook_url:
+            return None
+
+        body = json.dumps(event).encode()
+        request = urllib.request.Request(
+            f"{self.config.webhook_url.rstrip('/')}/",
+            data=body,
+            headers={
+                "Content-Type": "application/json",
+                "X-Razorpay-Event-Id": generate_id("evt"),
+                "X-Razorpay-Signature": sign_webhook(body, self.config.webhook_secret),
+            },
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except urllib.error.URLError as e:
+            logger.warning("Failed to deliver %s webhook: %s", event["event"], e)
+            status = None
+
+        with self.lock:
+            self.webhook_deliveries.append((event["event"], status))
+        return status
+
+
+class FakeRazorpayRequestHandler(BaseHTTPRequestHandler):
+    server: "FakeRazorpayServer"
+
+    routes = (
+        ("POST", r"/v1/payment_links", "create_payment_link"),
+        ("GET", r"/v1/payment_links/(?P<id>[\w-]+)", "get_payment_link"),
+        ("POST", r"/v1/payments/qr_codes", "create_qr_code"),
+        ("GET", r"/v1/payments/qr_codes/(?P<id>[\w-]+)", "get_qr_code"),
+        (
+            "GET",
+            r"/v1/payments/qr_codes/(?P<id>[\w-]+)/payments",
+            "list_qr_code_payments",
+        ),
+        ("GET", r"/v1/payments", "list_payments"),
+        ("POST", r"/v2/accounts", "create_account"),
+        ("GET", r"/v2/accounts/(?P<id>[\w-]+)", "get_account"),
+        ("POST", r"/_fake/payment_links/(?P<id>[\w-]+)/pay", "pay_payment_link"),
+        ("POST", r"/_fake/qr_codes/(?P<id>[\w-]+)/pay", "pay_qr_code"),
+    )
+
+    def log_message(self, format, *args) -> None:
+        logger.debug(format, *args)
+
+    def send_json(self, status: int, data: dict) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/")
+        for route_method, pattern, name in self.routes:
+            match = re.fullmatch(pattern, path)
+            if route_method == method and match:
+                break
+        else:
+            self.send_json(
+                404,
+                {"error": {"code": "BAD_REQUEST_ERROR", "description": "Not found"}},
+            )
+            return
+
+        fake = self.server.fake
+        try:
+            if not path.startswith("/_fake/"):
+                fake.throttle()
+            data = self.read_json() if method == "POST" else {}
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            entity_id = match["id"] if match.groups() else None
+            self.send_json(200, self.call_route(name, entity_id, data, params))
+        except ValueError:
+            self.send_json(
+                400,
+                {"error": {"code": "BAD_REQUEST_ERROR", "description": "Invalid JSON"}},
+            )
+        except FakeRazorpayError as e:
+            self.send_json(
+                e.status, {"error": {"code": e.code, "description": e.description}}
+            )
+
+    def call_route(self, name: str, entity_id: str | None, data: dict, params: dict):
+        fake = self.server.fake
+        if name == "create_payment_link":
+            return fake.create_payment_link(data)
+        if name == "get_payment_link":
+            return fake.get_entity(fake.payment_links, entity_id)
+        if name == "create_qr_code":
+            return fake.create_qr_code(data)
+        if name == "get_qr_code":
+            return fake.get_entity(fake.qr_codes, entity_id)
+        if name == "list_payments":
+            return fake.list_payments(params)
+        if name == "list_qr_code_payments":
+            return fake.list_qr_code_payments(entity_id, params)
+        if name == "create_account":
+            return fake.create_account(data)
+        if name == "get_account":
+            return fake.get_account(entity_id)
+
+        if name == "pay_payment_link":
+            event = fake.pay_payment_link(entity_id, data.get("amount"))
+        else:
+            event = fake.pay_qr_code(entity_id, data.get("amount"))
+        # Delivered once the response is out, like Razorpay does
+        threading.Thread(target=fake.deliver_webhook, args=(event,)).start()
+        return event
+
+    def do_GET(self) -> None:
+        self.dispatch("GET")
+
+    def do_POST(self) -> None:
+        self.dispatch("POST")
+
+
+class FakeRazorpayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int] = ("127.0.0.1", 0),
+        config: FakeRazorpayConfig | None = None,
+    ) -> None:
+        super().__init__(address, FakeRazorpayRequestHandler)
+        self.fake = FakeRazorpay(config)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeRazorpayServer":
+        """
+        Serves on a daemon thread, for use from tests and benchmarks.
+        """
+        threading.Thread(
+            target=self.serve_forever, name="fake-razorpay", daemon=True
+        ).start()
+        return self
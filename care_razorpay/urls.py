@@ -1,6 +1,7 @@
 from rest_framework.routers import DefaultRouter
 
 from care_razorpay.api.viewsets.health_check import HealthCheckViewSet
+from care_razorpay.api.viewsets.metrics import MetricsViewSet
 from care_razorpay.api.viewsets.payment_link import PaymentLinkViewSet
 from care_razorpay.api.viewsets.qr_code import QRCodeViewSet
 from care_razorpay.api.viewsets.razorpay_account import RazorpayAccountViewSet
@@ -9,6 +10,7 @@ from care_razorpay.api.viewsets.webhook import WebhookViewSet
 router = DefaultRouter()
 
 router.register("health_check", HealthCheckViewSet, basename="razorpay__health_check")
+router.register("metrics", MetricsViewSet, basename="razorpay__metrics")
 router.register("payment_link", PaymentLinkViewSet, basename="razorpay__payment_link")
 router.register("qr_code", QRCodeViewSet, basename="razorpay__qr_code")
 router.register("webhook", WebhookViewSet, basename="razorpay__webhook")
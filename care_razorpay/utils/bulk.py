@@ -0,0 +1,147 @@
+import asyncio
+import os
+import threading
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpRequest
+
+from care_razorpay.settings import plugin_settings
+from care_razorpay.utils.rate_limit import TokenBucket
+from care_razorpay.utils.razorpay import razorpay_client
+from care_razorpay.utils.razorpay_async import get_async_razorpay_client, run_async
+
+_executor: ThreadPoolExecutor | None = None
+_executor_pid: int | None = None
+_executor_lock = threading.Lock()
+
+
+def get_bulk_executor() -> ThreadPoolExecutor:
+    """
+    Process-wide pool used to fan out Razorpay calls. The worker threads are
+    long lived, so their per-thread Razorpay clients keep their connections
+    alive across bulk requests.
+    """
+    global _executor, _executor_pid
+
+    pid = os.getpid()
+    if _executor_pid != pid:
+        with _executor_lock:
+            if _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=plugin_settings.RAZORPAY_BULK_MAX_WORKERS,
+                    thread_name_prefix="razorpay-bulk",
+                )
+                _executor_pid = pid
+    return _executor
+
+
+def run_concurrently(
+    func: Callable[[Any], Any], items: Iterable[Any]
+) -> Iterator[tuple[Any, Any, Exception | None]]:
+    """
+    Calls `func` for every item on the bulk executor and yields
+    `(item, result, error)` tuples in completion order.
+    """
+    executor = get_bulk_executor()
+    futures = {executor.submit(func, item): item for item in items}
+    for future in as_completed(futures):
+        item = futures[future]
+        try:
+            yield item, future.result(), None
+        except Exception as e:
+            yield item, None, e
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+async def iterate_in_thread(items: Iterator) -> AsyncIterator:
+    """
+    Serves a blocking iterator as an async one, advancing it in the sync
+    thread one item at a time, so that a StreamingHttpResponse under ASGI
+    sends every item as soon as it is produced instead of collecting them
+    all first.
+    """
+    sentinel = object()
+    get_next = sync_to_async(next)
+    try:
+        while (item := await get_next(items, sentinel)) is not sentinel:
+            yield item
+    finally:
+        # Runs the iterator's cleanup when the client goes away mid-stream
+        close = getattr(items, "close", None)
+        if close:
+            await sync_to_async(close)()
+
+
+def get_streaming_content(
+    request: HttpRequest, items: Iterator
+) -> Iterator | AsyncIterator:
+    """
+    Returns the content for a StreamingHttpResponse that sends every item as
+    soon as it is produced: the iterator itself under WSGI, and an async
+    iterator advancing it in the sync thread under ASGI. Either server
+    buffers the whole response when given the other kind.
+    """
+    if isinstance(request, ASGIRequest):
+        return iterate_in_thread(items)
+    return items
+
+
+async def gather_concurrently(
+    func: Callable[[Any], Awaitable[Any]], items: Iterable[Any]
+) -> list[tuple[Any, Any, Exception | None]]:
+    """
+    Awaits `func` for every item concurrently and returns the
+    `(item, result, error)` tuples in the order of the items.
+    """
+
+    async def run(item):
+        try:
+            return item, await func(item), None
+        except Exception as e:
+            return item, None, e
+
+    return await asyncio.gather(*(run(item) for item in items))
+
+
+def run_razorpay_concurrently(
+    call: Callable[[Any, Any], Any],
+    items: Iterable[Any],
+    rate_limiter: TokenBucket | None = None,
+) -> Iterator[tuple[Any, Any, Exception | None]]:
+    """
+    Makes the Razorpay call `call(client, item)` for every item, optionally
+    under `rate_limiter`, and yields `(item, result, error)` tuples.
+
+    With RAZORPAY_ASYNC_CLIENT the calls are coroutines on the process-wide
+    event loop, awaited in chunks of RAZORPAY_ASYNC_MAX_CONNECTIONS; otherwise
+    they are fanned out over the threads of the bulk executor.
+    """
+    timeout = plugin_settings.RAZORPAY_RATE_LIMIT_MAX_WAIT
+
+    if not plugin_settings.RAZORPAY_ASYNC_CLIENT:
+
+        def run(item):
+            if rate_limiter:
+                rate_limiter.acquire(timeout=timeout)
+            return call(razorpay_client, item)
+
+        yield from run_concurrently(run, items)
+        return
+
+    async def arun(item):
+        if rate_limiter:
+            await rate_limiter.aacquire(timeout=timeout)
+        return await call(get_async_razorpay_client(), item)
+
+    for chunk in chunked(items, plugin_settings.RAZORPAY_ASYNC_MAX_CONNECTIONS):
+        yield from run_async(gather_concurrently(arun, chunk))
@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from pydantic import ValidationError
+
+from care_razorpay.api.serializers.payment_link import PaymentLink
+from care_razorpay.api.serializers.qr_code import QRCode
+from care_razorpay.models.payment_link import RazorpayPaymentLink
+from care_razorpay.models.qr_code import RazorpayQRCode
+from care_razorpay.settings import plugin_settings
+from care_razorpay.utils.mirror import (
+    FINAL_PAYMENT_LINK_STATUSES,
+    FINAL_QR_CODE_STATUSES,
+    is_payment_link_mirror_fresh,
+    is_qr_code_mirror_fresh,
+    upsert_payment_link,
+    upsert_qr_code,
+)
+from care_razorpay.utils.razorpay import razorpay_client
+
+PAYMENT_LINK_CACHE_KEY = "care_razorpay:payment_link:{id}"
+QR_CODE_CACHE_KEY = "care_razorpay:qr_code:{id}"
+
+
+def get_cache_timeout(is_final: bool) -> int:
+    """
+    Entities in a final status no longer change on Razorpay and can be kept for
+    long; the rest are only cached briefly, webhooks refresh them in between.
+    """
+    if is_final:
+        return plugin_settings.RAZORPAY_CACHE_FINAL_TTL
+    return plugin_settings.RAZORPAY_CACHE_ACTIVE_TTL
+
+
+def cache_payment_link(entity: dict) -> dict:
+    payment_link = PaymentLink.model_validate(entity)
+    data = payment_link.model_dump()
+    cache.set(
+        PAYMENT_LINK_CACHE_KEY.format(id=payment_link.id),
+        data,
+        timeout=get_cache_timeout(
+            payment_link.status.value in FINAL_PAYMENT_LINK_STATUSES
+        ),
+    )
+    return data
+
+
+def get_payment_link(payment_link_id: str, refresh: bool = False) -> dict:
+    """
+    Resolves a payment link from the cache, then the local mirror, and only
+    then from Razorpay. `refresh` skips straight to Razorpay.
+    """
+    if not refresh:
+        data = cache.get(PAYMENT_LINK_CACHE_KEY.format(id=payment_link_id))
+        if data is not None:
+            return data
+
+        mirror = RazorpayPaymentLink.objects.filter(razorpay_id=payment_link_id).first()
+        if mirror and is_payment_link_mirror_fresh(mirror):
+            return cache_payment_link(mirror.metadata)
+
+    entity = razorpay_client.payment_link.fetch(payment_link_id)
+    upsert_payment_link(entity)
+    return cache_payment_link(entity)
+
+
+def update_cached_payment_link(entity: dict) -> None:
+    try:
+        cache_payment_link(entity)
+    except ValidationError:
+        cache.delete(PAYMENT_LINK_CACHE_KEY.format(id=entity.get("id")))
+
+
+def cache_qr_code(entity: dict) -> dict:
+    qr_code = QRCode.model_validate(entity)
+    data = qr_code.model_dump()
+    cache.set(
+        QR_CODE_CACHE_KEY.format(id=qr_code.id),
+        data,
+        timeout=get_cache_timeout(qr_code.status.value in FINAL_QR_CODE_STATUSES),
+    )
+    return data
+
+
+def get_qr_code(qr_code_id: str, refresh: bool = False) -> dict:
+    """
+    Resolves a QR code from the cache, then the local mirror, and only then
+    from Razorpay. `refresh` skips straight to Razorpay.
+    """
+    if not refresh:
+        data = cache.get(QR_CODE_CACHE_KEY.format(id=qr_code_id))
+        if data is not None:
+            return data
+
+        mirror = RazorpayQRCode.objects.filter(razorpay_id=qr_code_id).first()
+        if mirror and is_qr_code_mirror_fresh(mirror):
+            return cache_qr_code(mirror.metadata)
+
+    entity = razorpay_client.qrcode.fetch(qr_code_id)
+    upsert_qr_code(entity)
+    return cache_qr_code(entity)
+
+
+def update_cached_qr_code(entity: dict) -> None:
+    try:
+        cache_qr_code(entity)
+    except ValidationError:
+        cache.delete(QR_CODE_CACHE_KEY.format(id=entity.get("id")))
@@ -0,0 +1,179 @@
+import logging
+import threading
+import time
+from collections import deque
+from enum import Enum
+
+from care_razorpay.settings import plugin_settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling Razorpay while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    A thread-safe circuit breaker over the outcomes of the Razorpay calls made
+    within the last `window` seconds.
+
+    The breaker opens once at least `min_calls` were made in the window and
+    either the share of failed calls reaches `failure_rate` or the share of
+    calls slower than `slow_call_threshold` reaches `slow_call_rate`. While
+    open, calls are rejected immediately. After `open_duration` seconds a
+    single probe call is let through (half-open): the breaker closes again if
+    it succeeds and re-opens if it does not.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        min_calls: int,
+        failure_rate: float,
+        slow_call_threshold: float,
+        slow_call_rate: float,
+        open_duration: float,
+    ) -> None:
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_rate = slow_call_rate
+        self.open_duration = open_duration
+
+        # (finished_at, failed, slow) of every call in the window
+        self.calls = deque()
+        self.failures = 0
+        self.slow_calls = 0
+        self.state = CircuitState.CLOSED
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        while self.calls and self.calls[0][0] < now - self.window:
+            _, failed, slow = self.calls.popleft()
+            self.failures -= failed
+            self.slow_calls -= slow
+
+    def _reset(self) -> None:
+        self.calls.clear()
+        self.failures = 0
+        self.slow_calls = 0
+
+    def _open(self, now: float) -> None:
+        self.state = CircuitState.OPEN
+        self.opened_at = now
+        self._reset()
+
+    def before_call(self) -> None:
+        """
+        Raises CircuitOpen unless a call may be made right now.
+        """
+        with self.lock:
+            if self.state == CircuitState.CLOSED:
+                return
+
+            if self.state == CircuitState.OPEN:
+                if time.monotonic() - self.opened_at < self.open_duration:
+                    raise CircuitOpen("Razorpay is currently unavailable")
+                self.state = CircuitState.HALF_OPEN
+
+            if self.probing:
+                raise CircuitOpen("Razorpay is currently unavailable")
+            self.probing = True
+
+    def record(self, failed: bool, duration: float = 0) -> None:
+        slow = duration >= self.slow_call_threshold
+        now = time.monotonic()
+
+        with self.lock:
+            if self.state == CircuitState.HALF_OPEN:
+                self.probing = False
+                if failed or slow:
+                    self._open(now)
+                    logger.warning("Razorpay circuit breaker re-opened after probe")
+                else:
+                    self.state = CircuitState.CLOSED
+                    logger.info("Razorpay circuit breaker closed")
+                return
+
+            if self.state == CircuitState.OPEN:
+                # A call made before the breaker opened
+                return
+
+            self.calls.append((now, failed, slow))
+            self.failures += failed
+            self.slow_calls += slow
+            self._expire(now)
+
+            total = len(self.calls)
+            if total >= self.min_calls and (
+                self.failures / total >= self.failure_rate
+                or self.slow_calls / total >= self.slow_call_rate
+            ):
+                logger.warning(
+                    "Razorpay circuit breaker opened: %s failed and %s slow "
+                    "out of %s calls",
+                    self.failures,
+                    self.slow_calls,
+                    total,
+                )
+                self._open(now)
+
+    def release(self) -> None:
+        """
+        Gives up a call that never reached Razorpay without recording an
+        outcome for it.
+        """
+        with self.lock:
+            if self.state == CircuitState.HALF_OPEN:
+                self.probing = False
+
+    def get_status(self) -> dict:
+        with self.lock:
+            now = time.monotonic()
+            self._expire(now)
+            status = {
+                "state": self.state.value,
+                "calls": len(self.calls),
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+            }
+            if self.state == CircuitState.OPEN:
+                status["retry_in"] = max(
+                    0, round(self.opened_at + self.open_duration - now, 3)
+                )
+            return status
+
+
+_circuit_breaker: CircuitBreaker | None = None
+_circuit_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """
+    Returns the circuit breaker guarding the Razorpay calls of this process.
+    """
+    global _circuit_breaker
+
+    if _circuit_breaker is None:
+        with _circuit_breaker_lock:
+            if _circuit_breaker is None:
+                settings = plugin_settings
+                _circuit_breaker = CircuitBreaker(
+                    window=settings.RAZORPAY_CIRCUIT_WINDOW,
+                    min_calls=settings.RAZORPAY_CIRCUIT_MIN_CALLS,
+                    failure_rate=settings.RAZORPAY_CIRCUIT_FAILURE_RATE,
+                    slow_call_threshold=settings.RAZORPAY_CIRCUIT_SLOW_CALL_THRESHOLD,
+                    slow_call_rate=settings.RAZORPAY_CIRCUIT_SLOW_CALL_RATE,
+                    open_duration=settings.RAZORPAY_CIRCUIT_OPEN_DURATION,
+                )
+    return _circuit_breaker
@@ -0,0 +1,53 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from care_razorpay.settings import plugin_settings
+
+LOCAL_SEEN_MAX_SIZE = 10_000
+
+_local_seen: OrderedDict[str, float] = OrderedDict()
+_local_seen_lock = threading.Lock()
+
+
+def _cache_key(namespace: str, value: str) -> str:
+    return f"care_razorpay:seen:{namespace}:{value}"
+
+
+def is_recently_seen(namespace: str, value: str) -> bool:
+    """
+    Checks whether `value` was marked as seen within the dedup window. A
+    process-local table is consulted first so that retry storms hitting the
+    same worker do not even reach the shared cache.
+    """
+    key = _cache_key(namespace, value)
+    now = time.monotonic()
+
+    with _local_seen_lock:
+        expires_at = _local_seen.get(key)
+        if expires_at is not None:
+            if expires_at > now:
+                return True
+            del _local_seen[key]
+
+    if cache.get(key) is None:
+        return False
+
+    _remember_locally(key, now)
+    return True
+
+
+def mark_seen(namespace: str, value: str) -> None:
+    key = _cache_key(namespace, value)
+    cache.set(key, 1, timeout=plugin_settings.RAZORPAY_DEDUP_TTL)
+    _remember_locally(key, time.monotonic())
+
+
+def _remember_locally(key: str, now: float) -> None:
+    with _local_seen_lock:
+        _local_seen[key] = now + plugin_settings.RAZORPAY_DEDUP_TTL
+        _local_seen.move_to_end(key)
+        while len(_local_seen) > LOCAL_SEEN_MAX_SIZE:
+            _local_seen.popitem(last=False)
@@ -0,0 +1,79 @@
+import json
+from dataclasses import dataclass, field
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def loads(body: bytes):
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+@dataclass(frozen=True, slots=True)
+class RazorpayEvent:
+    """
+    A decoded Razorpay webhook event. `data` is the event as delivered, and
+    `entities` maps the entity names in its payload (payment, payment_link,
+    qr_code, refund, ...) to the entities themselves.
+    """
+
+    event: str
+    data: dict
+    account_id: str | None = None
+    created_at: int | None = None
+    entities: dict[str, dict] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data) -> "RazorpayEvent":
+        if not isinstance(data, dict) or not isinstance(data.get("event"), str):
+            raise ValueError("Not a Razorpay webhook event")
+
+        payload = data.get("payload")
+        entities = {}
+        if isinstance(payload, dict):
+            for name, item in payload.items():
+                if isinstance(item, dict) and isinstance(item.get("entity"), dict):
+                    entities[name] = item["entity"]
+
+        return cls(
+            event=data["event"],
+            data=data,
+            account_id=data.get("account_id"),
+            created_at=data.get("created_at"),
+            entities=entities,
+        )
+
+    @classmethod
+    def from_bytes(cls, body: bytes) -> "RazorpayEvent":
+        """
+        Decodes a raw webhook body, with orjson when it is installed.
+        Raises ValueError for anything that is not a webhook event.
+        """
+        return cls.from_dict(loads(body))
+
+    def get_entity(self, name: str) -> dict | None:
+        return self.entities.get(name)
+
+    @property
+    def payment(self) -> dict | None:
+        return self.entities.get("payment")
+
+    @property
+    def payment_link(self) -> dict | None:
+        return self.entities.get("payment_link")
+
+    @property
+    def qr_code(self) -> dict | None:
+        return self.entities.get("qr_code")
+
+    @property
+    def refund(self) -> dict | None:
+        return self.entities.get("refund")
+
+    @property
+    def transfer(self) -> dict | None:
+        return self.entities.get("transfer")
@@ -0,0 +1,100 @@
+import time
+from uuid import UUID
+
+from django.core.cache import cache
+from django.db.models import Q, QuerySet
+
+from care.emr.models.organization import FacilityOrganizationUser, OrganizationUser
+from care.facility.models import Facility
+from care_razorpay.settings import plugin_settings
+
+ACCESSIBLE_FACILITIES_KEY = "care_razorpay:accessible_facilities:{generation}:{user_id}"
+ACCESSIBLE_FACILITIES_GENERATION_KEY = "care_razorpay:accessible_facilities:generation"
+
+
+def get_accessible_facilities(user) -> QuerySet[Facility]:
+    """
+    Facilities the user has access to, either through a facility organization
+    or through a geo organization the facility belongs to.
+    """
+    qs = Facility.objects.all()
+    if user.is_superuser:
+        return qs
+
+    organization_ids = list(
+        OrganizationUser.objects.filter(user=user).values_list(
+            "organization_id", flat=True
+        )
+    )
+    return qs.filter(
+        Q(
+            id__in=FacilityOrganizationUser.objects.filter(user=user).values_list(
+                "organization__facility_id"
+            )
+        )
+        | Q(geo_organization_cache__overlap=organization_ids)
+    )
+
+
+def new_accessible_facilities_generation() -> int:
+    # Seeded from the clock, so that a generation evicted from the cache is
+    # never reused and cannot bring back entries cached before an invalidation
+    return time.time_ns()
+
+
+def get_accessible_facilities_generation() -> int:
+    return cache.get_or_set(
+        ACCESSIBLE_FACILITIES_GENERATION_KEY,
+        new_accessible_facilities_generation,
+        timeout=None,
+    )
+
+
+def get_accessible_facility_ids(user) -> list[UUID]:
+    """
+    External ids of the facilities the user has access to, cached per user.
+    Membership changes of the user invalidate their entry, facility changes
+    invalidate every entry.
+    """
+    key = ACCESSIBLE_FACILITIES_KEY.format(
+        generation=get_accessible_facilities_generation(), user_id=user.id
+    )
+    facility_ids = cache.get(key)
+    if facility_ids is None:
+        facility_ids = list(
+            get_accessible_facilities(user).values_list("external_id", flat=True)
+        )
+        cache.set(
+            key, facility_ids, timeout=plugin_settings.RAZORPAY_FACILITY_ACCESS_TTL
+        )
+    return facility_ids
+
+
+def filter_accessible_facilities(queryset: QuerySet, user) -> QuerySet:
+    """
+    Restricts a queryset of a model with a `facility` foreign key (to the
+    facility external id) to the facilities the user has access to.
+    """
+    if user.is_superuser:
+        return queryset
+    return queryset.filter(facility_id__in=get_accessible_facility_ids(user))
+
+
+def invalidate_accessible_facilities(user_id: int) -> None:
+    cache.delete(
+        ACCESSIBLE_FACILITIES_KEY.format(
+            generation=get_accessible_facilities_generation(), user_id=user_id
+        )
+    )
+
+
+def invalidate_all_accessible_facilities() -> None:
+    try:
+        cache.incr(ACCESSIBLE_FACILITIES_GENERATION_KEY)
+    except ValueError:
+        # Evicted, any new generation invalidates the old entries
+        cache.set(
+            ACCESSIBLE_FACILITIES_GENERATION_KEY,
+            new_accessible_facilities_generation(),
+            timeout=None,
+        )
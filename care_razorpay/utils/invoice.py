@@ -0,0 +1,30 @@
+from collections.abc import Iterable
+from uuid import UUID
+
+from django.db.models import QuerySet
+
+from care.emr.models.invoice import Invoice
+from care_razorpay.utils.tracing import span
+
+
+def get_invoice_queryset() -> QuerySet[Invoice]:
+    """
+    Invoices along with everything needed to build Razorpay payloads and
+    reconciliations, so that a single query serves the whole request.
+    """
+    return Invoice.objects.select_related(
+        "facility__razorpayaccount", "patient", "account"
+    )
+
+
+def get_invoice(external_id: UUID | str) -> Invoice | None:
+    with span("invoice_fetch"):
+        return get_invoice_queryset().filter(external_id=external_id).first()
+
+
+def get_invoices(external_ids: Iterable[UUID]) -> dict[UUID, Invoice]:
+    with span("invoice_fetch"):
+        return {
+            invoice.external_id: invoice
+            for invoice in get_invoice_queryset().filter(external_id__in=external_ids)
+        }
@@ -0,0 +1,60 @@
+import uuid
+
+from django.core.cache import cache
+
+from care_razorpay.utils.rate_limit import get_redis_client
+
+EXTEND_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("expire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class CacheLock:
+    """
+    A lock shared by every process, which expires `timeout` seconds after it
+    was acquired or last extended. The lock holds a token unique to its
+    owner, so an owner that outlived the timeout can neither extend nor
+    release the lock of the next one.
+
+    Kept in Redis with atomic checks when the default cache is Redis backed,
+    and in the default cache otherwise.
+    """
+
+    def __init__(self, key: str, timeout: int) -> None:
+        self.key = key
+        self.timeout = timeout
+        self.token = uuid.uuid4().hex
+        self.client = get_redis_client()
+
+    def acquire(self) -> bool:
+        if self.client is not None:
+            return bool(self.client.set(self.key, self.token, nx=True, ex=self.timeout))
+        return cache.add(self.key, self.token, timeout=self.timeout)
+
+    def extend(self) -> bool:
+        """
+        Restarts the timeout. Returns False when the lock is no longer held.
+        """
+        if self.client is not None:
+            return bool(
+                self.client.eval(EXTEND_SCRIPT, 1, self.key, self.token, self.timeout)
+            )
+        if cache.get(self.key) != self.token:
+            return False
+        return cache.touch(self.key, self.timeout)
+
+    def release(self) -> None:
+        if self.client is not None:
+            self.client.eval(RELEASE_SCRIPT, 1, self.key, self.token)
+        elif cache.get(self.key) == self.token:
+            cache.delete(self.key)
@@ -0,0 +1,108 @@
+import os
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+
+from care_razorpay.settings import plugin_settings
+from care_razorpay.utils.rate_limit import get_rate_limit_family
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:  # pragma: no cover
+    prometheus_client = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+OPERATION_VERBS = {"GET": "fetch", "POST": "create"}
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.registry = prometheus_client.CollectorRegistry()
+        self.razorpay_call_duration = prometheus_client.Histogram(
+            "care_razorpay_call_duration_seconds",
+            "Duration of Razorpay API calls, including time queued for the "
+            "rate limit",
+            ["operation", "outcome"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.webhook_event_duration = prometheus_client.Histogram(
+            "care_razorpay_webhook_event_duration_seconds",
+            "Duration of applying stored Razorpay webhook events",
+            ["event", "outcome"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.webhook_stage_duration = prometheus_client.Histogram(
+            "care_razorpay_webhook_stage_duration_seconds",
+            "Duration of the stages of recording a Razorpay payment",
+            ["stage"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+
+    def export(self) -> bytes:
+        registry = self.registry
+        if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+            # Aggregate the samples written by every worker process
+            registry = prometheus_client.CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        return prometheus_client.generate_latest(registry)
+
+
+_metrics: Metrics | None = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    global _metrics
+
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                if prometheus_client is None:
+                    raise ImproperlyConfigured(
+                        "RAZORPAY_METRICS_ENABLED requires prometheus_client, "
+                        "install care_razorpay with the metrics extra"
+                    )
+                _metrics = Metrics()
+    return _metrics
+
+
+def is_metrics_enabled() -> bool:
+    return plugin_settings.RAZORPAY_METRICS_ENABLED
+
+
+def get_razorpay_operation(method: str, url: str) -> str:
+    # e.g. POST /v1/payment_links -> payment_link.create
+    verb = OPERATION_VERBS.get(method.upper(), method.lower())
+    return f"{get_rate_limit_family(url)}.{verb}"
+
+
+def get_status_outcome(status_code: int) -> str:
+    if status_code < 400:
+        return "success"
+    if status_code == 429:
+        return "rate_limited"
+    if status_code < 500:
+        return "client_error"
+    return "server_error"
+
+
+def observe_razorpay_call(operation: str, outcome: str, duration: float) -> None:
+    if is_metrics_enabled():
+        get_metrics().razorpay_call_duration.labels(operation, outcome).observe(
+            duration
+        )
+
+
+def observe_webhook_event(event: str, outcome: str, duration: float) -> None:
+    if is_metrics_enabled():
+        get_metrics().webhook_event_duration.labels(event, outcome).observe(duration)
+
+
+def observe_webhook_stage(stage: str, duration: float) -> None:
+    if is_metrics_enabled():
+        get_metrics().webhook_stage_duration.labels(stage).observe(duration)
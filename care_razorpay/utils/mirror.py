@@ -0,0 +1,154 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from care_razorpay.api.serializers.payment_link import PaymentLink, PaymentLinkStatus
+from care_razorpay.api.serializers.qr_code import QRCode, QRCodeStatus
+from care_razorpay.models.payment_link import RazorpayPaymentLink
+from care_razorpay.models.qr_code import RazorpayQRCode
+from care_razorpay.settings import plugin_settings
+
+FINAL_PAYMENT_LINK_STATUSES = {
+    PaymentLinkStatus.PAID.value,
+    PaymentLinkStatus.EXPIRED.value,
+    PaymentLinkStatus.CANCELLED.value,
+}
+FINAL_QR_CODE_STATUSES = {QRCodeStatus.CLOSED.value}
+
+
+def get_entity_notes(entity: dict) -> dict:
+    # Razorpay sends an empty list instead of an object when there are no notes
+    return entity.get("notes") or {}
+
+
+def get_payment_link_fields(entity: dict) -> dict | None:
+    """
+    Maps a Razorpay payment link entity to the fields of its local mirror.
+    Links that were not created through the plugin are not mirrored.
+    """
+    notes = get_entity_notes(entity)
+    if not notes.get("invoice_id") or not notes.get("facility_id"):
+        return None
+
+    payment_link = PaymentLink.model_validate(entity)
+    return {
+        "razorpay_id": payment_link.id,
+        "invoice_external_id": notes["invoice_id"],
+        "facility_id": notes["facility_id"],
+        "status": payment_link.status.value,
+        "amount": payment_link.amount,
+        "amount_paid": payment_link.amount_paid,
+        "expire_by": payment_link.expire_by,
+        "metadata": entity,
+    }
+
+
+def get_qr_code_fields(entity: dict) -> dict | None:
+    """
+    Maps a Razorpay QR code entity to the fields of its local mirror.
+    QR codes that were not created through the plugin are not mirrored.
+    """
+    notes = get_entity_notes(entity)
+    if not notes.get("invoice_id") or not notes.get("facility_id"):
+        return None
+
+    qr_code = QRCode.model_validate(entity)
+    return {
+        "razorpay_id": qr_code.id,
+        "invoice_external_id": notes["invoice_id"],
+        "facility_id": notes["facility_id"],
+        "status": qr_code.status.value,
+        "payment_amount": qr_code.payment_amount,
+        "payments_amount_received": qr_code.payments_amount_received,
+        "close_by": qr_code.close_by,
+        "metadata": entity,
+    }
+
+
+def upsert_payment_link(entity: dict) -> RazorpayPaymentLink | None:
+    fields = get_payment_link_fields(entity)
+    if not fields:
+        return None
+
+    razorpay_id = fields.pop("razorpay_id")
+    mirror, _ = RazorpayPaymentLink.objects.update_or_create(
+        razorpay_id=razorpay_id, defaults=fields
+    )
+    return mirror
+
+
+def upsert_qr_code(entity: dict) -> RazorpayQRCode | None:
+    fields = get_qr_code_fields(entity)
+    if not fields:
+        return None
+
+    razorpay_id = fields.pop("razorpay_id")
+    mirror, _ = RazorpayQRCode.objects.update_or_create(
+        razorpay_id=razorpay_id, defaults=fields
+    )
+    return mirror
+
+
+def bulk_upsert(model, rows: list[dict]) -> None:
+    """
+    Inserts or updates many mirror rows of `model` in a single query.
+    """
+    if not rows:
+        return
+    # auto_now is not applied to the rows updated on conflict, which would
+    # then look stale to is_mirror_fresh
+    now = timezone.now()
+    model.objects.bulk_create(
+        [model(**row, modified_date=now) for row in rows],
+        update_conflicts=True,
+        unique_fields=["razorpay_id"],
+        update_fields=[
+            *(field for field in rows[0] if field != "razorpay_id"),
+            "modified_date",
+        ],
+    )
+
+
+def bulk_upsert_payment_links(entities: list[dict]) -> None:
+    bulk_upsert(
+        RazorpayPaymentLink,
+        [fields for fields in map(get_payment_link_fields, entities) if fields],
+    )
+
+
+def bulk_upsert_qr_codes(entities: list[dict]) -> None:
+    bulk_upsert(
+        RazorpayQRCode,
+        [fields for fields in map(get_qr_code_fields, entities) if fields],
+    )
+
+
+def is_mirror_fresh(is_final: bool, modified_date, expires_at=None) -> bool:
+    """
+    Mirrors in a final status are always served locally. The others are kept
+    current by webhooks and only go back to Razorpay to reconcile drift: once
+    they are older than RAZORPAY_MIRROR_MAX_AGE or past their expiry.
+    """
+    if is_final:
+        return True
+    now = timezone.now()
+    if expires_at and expires_at <= now:
+        return False
+    max_age = timedelta(seconds=plugin_settings.RAZORPAY_MIRROR_MAX_AGE)
+    return modified_date is not None and modified_date > now - max_age
+
+
+def is_payment_link_mirror_fresh(mirror: RazorpayPaymentLink) -> bool:
+    return is_mirror_fresh(
+        mirror.status in FINAL_PAYMENT_LINK_STATUSES,
+        mirror.modified_date,
+        mirror.expire_by,
+    )
+
+
+def is_qr_code_mirror_fresh(mirror: RazorpayQRCode) -> bool:
+    return is_mirror_fresh(
+        mirror.status in FINAL_QR_CODE_STATUSES,
+        mirror.modified_date,
+        mirror.close_by,
+    )
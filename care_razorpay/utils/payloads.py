@@ -0,0 +1,77 @@
+from care.emr.models.invoice import Invoice
+from care_razorpay.api.serializers.payment_link import PaymentLinkOptions
+from care_razorpay.api.serializers.qr_code import QRCodeOptions
+
+
+def get_invoice_notes(invoice: Invoice) -> dict:
+    return {
+        "invoice_id": str(invoice.external_id),
+        "account_id": str(invoice.account.external_id),
+        "patient_id": str(invoice.patient.external_id),
+        "facility_id": str(invoice.facility.external_id),
+    }
+
+
+def build_payment_link_payload(
+    invoice: Invoice,
+    options: PaymentLinkOptions,
+    email: str | None = None,
+    phone_number: str | None = None,
+) -> dict:
+    return {
+        "amount": float(invoice.total_gross) * 100,
+        "currency": "INR",
+        "accept_partial": options.is_partial_payment_allowed,
+        "first_min_partial_amount": options.minimum_down_payment,
+        "description": invoice.title,
+        "customer": {
+            "name": invoice.patient.name,
+            "email": email,
+            "contact": phone_number,
+        },
+        "notify": {
+            "sms": phone_number is not None,
+            "email": email is not None,
+        },
+        "reminder_enable": True,
+        "expire_by": (
+            int((options.expires_at).timestamp()) if options.expires_at else None
+        ),
+        "notes": get_invoice_notes(invoice),
+        "options": {
+            "checkout": {
+                "method": {
+                    "netbanking": True,
+                    "card": True,
+                }
+            },
+            "order": {
+                "transfers": [
+                    {
+                        "account": invoice.facility.razorpayaccount.account_id,
+                        "amount": float(invoice.total_gross) * 100,
+                        "currency": "INR",
+                        "notes": get_invoice_notes(invoice),
+                    }
+                ]
+            },
+        },
+    }
+
+
+def build_qr_code_payload(invoice: Invoice, options: QRCodeOptions) -> dict:
+    # TODO: handle account transfer for QR code
+    return {
+        "type": "upi_qr",
+        "name": invoice.title or f"Invoice {invoice.external_id}",
+        "usage": options.usage.value,
+        "fixed_amount": options.is_amount_fixed,
+        "payment_amount": (
+            float(invoice.total_gross) * 100 if options.is_amount_fixed else None
+        ),
+        "description": invoice.title,
+        "close_by": (
+            int((options.closes_at).timestamp()) if options.closes_at else None
+        ),
+        "notes": get_invoice_notes(invoice),
+    }
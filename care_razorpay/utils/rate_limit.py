@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.cache import caches
+
+from care_razorpay.settings import plugin_settings
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY = "care_razorpay:rate_limit:{family}"
+
+# Seconds to stay on the in-process bucket after Redis failed
+REDIS_RETRY_INTERVAL = 30
+
+# Endpoint families with their own budget, by path prefix after the version
+RATE_LIMIT_FAMILIES = {
+    "payment_links": "payment_link",
+    "payments/qr_codes": "qrcode",
+    "accounts": "account",
+}
+
+RATE_LIMIT_SETTINGS = {
+    "payment_link": "RAZORPAY_PAYMENT_LINK_RATE_LIMIT",
+    "qrcode": "RAZORPAY_QR_CODE_RATE_LIMIT",
+    "account": "RAZORPAY_ACCOUNT_RATE_LIMIT",
+    "default": "RAZORPAY_DEFAULT_RATE_LIMIT",
+}
+
+# Refills the bucket stored at KEYS[1] and takes a token when one is
+# available. Returns the seconds to wait for the next token, 0 on success.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated_at", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RateLimitExceeded(Exception):
+    """Raised when no Razorpay call budget became available in time."""
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket allowing `rate` calls per second with bursts
+    of up to `capacity` calls.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """
+        Takes a token if one is available. Returns 0 on success, otherwise the
+        number of seconds until the next token becomes available.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated_at) * self.rate
+            )
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    async def atry_acquire(self) -> float:
+        """
+        `try_acquire` for async callers. The local bucket only holds its lock
+        briefly, so it is called directly.
+        """
+        return self.try_acquire()
+
+    def acquire(self, timeout: float) -> None:
+        """
+        Blocks until a token is available, for at most `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while wait := self.try_acquire():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RateLimitExceeded("Razorpay rate limit exceeded")
+            time.sleep(min(wait, remaining))
+
+    async def aacquire(self, timeout: float) -> None:
+        """
+        Waits without blocking the event loop until a token is available, for
+        at most `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while wait := await self.atry_acquire():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RateLimitExceeded("Razorpay rate limit exceeded")
+            await asyncio.sleep(min(wait, remaining))
+
+
+def get_redis_client():
+    """
+    Returns a client for the Redis server behind the default cache, or None
+    when the cache is not Redis backed.
+    """
+    try:
+        from django_redis import get_redis_connection
+    except ImportError:
+        pass
+    else:
+        try:
+            return get_redis_connection("default")
+        except NotImplementedError:
+            return None
+
+    from django.core.cache.backends.redis import RedisCache
+
+    default_cache = caches["default"]
+    if isinstance(default_cache, RedisCache):
+        return default_cache._cache.get_client(write=True)
+    return None
+
+
+class RedisTokenBucket(TokenBucket):
+    """
+    A token bucket kept in Redis, so that the budget is shared by every web
+    and Celery process calling Razorpay. Falls back to an in-process bucket
+    with the same rate while Redis is unavailable.
+    """
+
+    def __init__(self, key: str, rate: float, capacity: float | None = None) -> None:
+        super().__init__(rate, capacity)
+        self.key = key
+        self.script = None
+        self.redis_retry_at = 0
+
+    def try_acquire_shared(self) -> float | None:
+        if self.script is None:
+            client = get_redis_client()
+            if client is None:
+                self.redis_retry_at = float("inf")
+                return None
+            self.script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        return float(self.script(keys=[self.key], args=[self.rate, self.capacity]))
+
+    def try_acquire(self) -> float:
+        if time.monotonic() >= self.redis_retry_at:
+            try:
+                wait = self.try_acquire_shared()
+            except Exception as e:
+                logger.warning(
+                    "Falling back to the local Razorpay rate limit for %s: %s",
+                    self.key,
+                    e,
+                )
+                self.script = None
+                self.redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+            else:
+                if wait is not None:
+                    return wait
+        return super().try_acquire()
+
+    async def atry_acquire(self) -> float:
+        """
+        Runs the Redis round trip in a worker thread, as the client is
+        synchronous and would otherwise block the event loop.
+        """
+        if time.monotonic() >= self.redis_retry_at:
+            return await asyncio.to_thread(self.try_acquire)
+        return await super().atry_acquire()
+
+
+def get_rate_limit_family(url: str) -> str:
+    # e.g. /v1/payments/qr_codes/qr_123 -> payments/qr_codes/qr_123
+    path = urlsplit(url).path.lstrip("/").partition("/")[2]
+    for prefix, family in RATE_LIMIT_FAMILIES.items():
+        if path.startswith(prefix):
+            return family
+    return "default"
+
+
+_rate_limiters: dict[str, TokenBucket] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(family: str) -> TokenBucket:
+    """
+    Returns the limiter guarding the Razorpay calls of an endpoint family.
+    """
+    if family not in _rate_limiters:
+        with _rate_limiters_lock:
+            if family not in _rate_limiters:
+                _rate_limiters[family] = RedisTokenBucket(
+                    RATE_LIMIT_KEY.format(family=family),
+                    getattr(plugin_settings, RATE_LIMIT_SETTINGS[family]),
+                )
+    return _rate_limiters[family]
+
+
+_bulk_rate_limiter: TokenBucket | None = None
+_bulk_rate_limiter_lock = threading.Lock()
+
+
+def get_bulk_rate_limiter() -> TokenBucket:
+    """
+    Returns the limiter shared by all bulk operations of this process.
+    """
+    global _bulk_rate_limiter
+
+    if _bulk_rate_limiter is None:
+        with _bulk_rate_limiter_lock:
+            if _bulk_rate_limiter is None:
+                _bulk_rate_limiter = TokenBucket(
+                    plugin_settings.RAZORPAY_BULK_RATE_LIMIT
+                )
+    return _bulk_rate_limiter
@@ -1,10 +1,183 @@
+import os
+import threading
+import time
+
 import razorpay
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from care_razorpay.settings import plugin_settings
+from care_razorpay.utils.circuit_breaker import CircuitOpen, get_circuit_breaker
+from care_razorpay.utils.metrics import (
+    get_razorpay_operation,
+    get_status_outcome,
+    observe_razorpay_call,
+)
+from care_razorpay.utils.rate_limit import (
+    RateLimitExceeded,
+    get_rate_limit_family,
+    get_rate_limiter,
+)
+from care_razorpay.utils.tracing import span
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class TimeoutSession(requests.Session):
+    """
+    A requests session that applies a default (connect, read) timeout to every
+    request that does not specify one. The Razorpay SDK never passes timeouts.
+    """
+
+    def __init__(self, timeout: tuple[float, float]) -> None:
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+class RateLimitedSession(TimeoutSession):
+    """
+    Waits for the budget of the endpoint family being called before every
+    request, so that bursts are queued briefly instead of being rejected by
+    Razorpay.
+    """
+
+    def request(self, method, url, **kwargs):
+        get_rate_limiter(get_rate_limit_family(url)).acquire(
+            timeout=plugin_settings.RAZORPAY_RATE_LIMIT_MAX_WAIT
+        )
+        return super().request(method, url, **kwargs)
+
+
+class CircuitBreakerSession(RateLimitedSession):
+    """
+    Fails fast with CircuitOpen while Razorpay is degraded instead of letting
+    every call wait for its timeout. Connection errors, timeouts and 5xx
+    responses count as failures; the latency is taken from the response, so
+    time spent queued for the rate limit does not count against Razorpay.
+    """
+
+    def request(self, method, url, **kwargs):
+        circuit_breaker = get_circuit_breaker()
+        circuit_breaker.before_call()
+        try:
+            response = super().request(method, url, **kwargs)
+        except RateLimitExceeded:
+            circuit_breaker.release()
+            raise
+        except requests.RequestException:
+            circuit_breaker.record(failed=True)
+            raise
+        except BaseException:
+            circuit_breaker.release()
+            raise
+
+        circuit_breaker.record(
+            failed=response.status_code >= 500,
+            duration=response.elapsed.total_seconds(),
+        )
+        return response
+
+
+class InstrumentedSession(CircuitBreakerSession):
+    """
+    Records the duration and outcome of every Razorpay call per operation,
+    e.g. payment_link.create, and traces it as a span of the request.
+    """
 
-razorpay_client = razorpay.Client(
-    auth=(
-        plugin_settings.RAZORPAY_KEY_ID,
-        plugin_settings.RAZORPAY_KEY_SECRET,
+    def request(self, method, url, **kwargs):
+        operation = get_razorpay_operation(method, url)
+        started_at = time.perf_counter()
+        outcome = "error"
+        try:
+            with span(f"razorpay.{operation}", **{"http.request.method": method}):
+                response = super().request(method, url, **kwargs)
+            outcome = get_status_outcome(response.status_code)
+            return response
+        except CircuitOpen:
+            outcome = "circuit_open"
+            raise
+        except RateLimitExceeded:
+            outcome = "rate_limited"
+            raise
+        finally:
+            observe_razorpay_call(operation, outcome, time.perf_counter() - started_at)
+
+
+def build_razorpay_session() -> requests.Session:
+    """
+    Builds an instrumented, rate limited keep-alive session with a bounded
+    connection pool, behind a circuit breaker. Only idempotent GETs are
+    retried on read errors and retryable status codes, with jittered
+    exponential backoff.
+    """
+    session = InstrumentedSession(
+        timeout=(
+            plugin_settings.RAZORPAY_HTTP_CONNECT_TIMEOUT,
+            plugin_settings.RAZORPAY_HTTP_READ_TIMEOUT,
+        )
     )
-)
+    retries = Retry(
+        total=plugin_settings.RAZORPAY_HTTP_MAX_RETRIES,
+        backoff_factor=plugin_settings.RAZORPAY_HTTP_BACKOFF_FACTOR,
+        backoff_jitter=plugin_settings.RAZORPAY_HTTP_BACKOFF_JITTER,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=plugin_settings.RAZORPAY_HTTP_POOL_SIZE,
+        pool_maxsize=plugin_settings.RAZORPAY_HTTP_POOL_SIZE,
+        max_retries=retries,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def build_razorpay_client() -> razorpay.Client:
+    """
+    Default RAZORPAY_CLIENT_FACTORY.
+    """
+    return razorpay.Client(
+        session=build_razorpay_session(),
+        auth=(
+            plugin_settings.RAZORPAY_KEY_ID,
+            plugin_settings.RAZORPAY_KEY_SECRET,
+        ),
+        base_url=plugin_settings.RAZORPAY_BASE_URL,
+    )
+
+
+_client_local = threading.local()
+
+
+def get_razorpay_client() -> razorpay.Client:
+    """
+    Returns the Razorpay client of the current thread, building one with the
+    configured factory on first use. Clients are never shared across forked
+    processes, since the pooled connections would be.
+    """
+    pid = os.getpid()
+    if getattr(_client_local, "pid", None) != pid:
+        _client_local.client = plugin_settings.RAZORPAY_CLIENT_FACTORY()
+        _client_local.pid = pid
+    return _client_local.client
+
+
+class RazorpayClientProxy:
+    """
+    Module level stand-in for the Razorpay client that resolves every attribute
+    against the client of the current thread.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_razorpay_client(), name)
+
+
+razorpay_client = RazorpayClientProxy()
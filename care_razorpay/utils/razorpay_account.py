@@ -0,0 +1,127 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.utils import timezone
+
+from care_razorpay.models.razorpay_account import RazorpayAccount
+from care_razorpay.settings import plugin_settings
+from care_razorpay.utils.bulk import run_razorpay_concurrently
+from care_razorpay.utils.rate_limit import get_bulk_rate_limiter
+from care_razorpay.utils.razorpay import razorpay_client
+
+logger = logging.getLogger(__name__)
+
+
+class RazorpayAccountNotFound(Exception):
+    pass
+
+
+def fetch_razorpay_account_details(razorpay_account: RazorpayAccount) -> dict:
+    razorpay_account_details = razorpay_client.account.fetch(
+        razorpay_account.account_id
+    )
+    if not razorpay_account_details:
+        raise RazorpayAccountNotFound("Razorpay account details not found on Razorpay")
+    return razorpay_account_details
+
+
+def sync_razorpay_account(razorpay_account: RazorpayAccount) -> RazorpayAccount:
+    """
+    Refreshes the stored metadata of the account from Razorpay. The metadata
+    is only written back when it changed.
+    """
+    razorpay_account_details = fetch_razorpay_account_details(razorpay_account)
+
+    update_fields = ["metadata_synced_at"]
+    if razorpay_account_details != razorpay_account.metadata:
+        razorpay_account.metadata = razorpay_account_details
+        # modified_date only moves when the metadata actually changed
+        update_fields += ["metadata", "modified_date"]
+
+    razorpay_account.metadata_synced_at = timezone.now()
+    razorpay_account.save(update_fields=update_fields)
+
+    return razorpay_account
+
+
+def is_razorpay_account_stale(razorpay_account: RazorpayAccount) -> bool:
+    if not razorpay_account.metadata_synced_at:
+        return True
+    freshness = timedelta(seconds=plugin_settings.RAZORPAY_ACCOUNT_FRESHNESS)
+    return razorpay_account.metadata_synced_at < timezone.now() - freshness
+
+
+def sync_all_razorpay_accounts(chunk_size: int | None = None) -> dict:
+    """
+    Refreshes the metadata of every Razorpay account. Accounts are walked in
+    primary key order chunk by chunk, their details fetched concurrently under
+    the bulk rate limit, and only the accounts whose metadata changed are
+    written back.
+
+    Returns the number of accounts synced, changed and failed along with the
+    throughput of the run.
+    """
+    chunk_size = chunk_size or plugin_settings.RAZORPAY_ACCOUNT_SYNC_CHUNK_SIZE
+    stats = {"synced": 0, "changed": 0, "errors": 0}
+    started_at = time.monotonic()
+
+    last_id = 0
+    while True:
+        chunk = list(
+            RazorpayAccount.objects.filter(id__gt=last_id)
+            .only("id", "account_id", "metadata")
+            .order_by("id")[:chunk_size]
+        )
+        if not chunk:
+            break
+        last_id = chunk[-1].id
+
+        now = timezone.now()
+        changed = []
+        unchanged_ids = []
+        for razorpay_account, details, error in run_razorpay_concurrently(
+            lambda client, razorpay_account: client.account.fetch(
+                razorpay_account.account_id
+            ),
+            chunk,
+            rate_limiter=get_bulk_rate_limiter(),
+        ):
+            if not error and not details:
+                error = RazorpayAccountNotFound(
+                    "Razorpay account details not found on Razorpay"
+                )
+            if error:
+                stats["errors"] += 1
+                logger.warning(
+                    "Failed to sync Razorpay account %s: %s",
+                    razorpay_account.account_id,
+                    error,
+                )
+                continue
+
+            if details == razorpay_account.metadata:
+                unchanged_ids.append(razorpay_account.id)
+                continue
+
+            razorpay_account.metadata = details
+            razorpay_account.metadata_synced_at = now
+            razorpay_account.modified_date = now
+            changed.append(razorpay_account)
+
+        RazorpayAccount.objects.bulk_update(
+            changed, ["metadata", "metadata_synced_at", "modified_date"]
+        )
+        RazorpayAccount.objects.filter(id__in=unchanged_ids).update(
+            metadata_synced_at=now
+        )
+        stats["synced"] += len(changed) + len(unchanged_ids)
+        stats["changed"] += len(changed)
+
+    duration = time.monotonic() - started_at
+    stats["duration"] = round(duration, 3)
+    stats["per_second"] = round(
+        (stats["synced"] + stats["errors"]) / duration if duration else 0, 2
+    )
+    logger.info("Synced Razorpay accounts: %s", stats)
+    return stats
@@ -0,0 +1,206 @@
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from collections.abc import Coroutine
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+from razorpay.constants import ERROR_CODE, URL
+from razorpay.errors import BadRequestError, GatewayError, ServerError
+
+from care_razorpay.settings import plugin_settings
+from care_razorpay.utils.circuit_breaker import CircuitOpen, get_circuit_breaker
+from care_razorpay.utils.metrics import get_razorpay_operation, observe_razorpay_call
+from care_razorpay.utils.rate_limit import (
+    RateLimitExceeded,
+    get_rate_limit_family,
+    get_rate_limiter,
+)
+from care_razorpay.utils.razorpay import RETRY_STATUS_CODES
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+RAZORPAY_ERRORS = {
+    ERROR_CODE.BAD_REQUEST_ERROR: BadRequestError,
+    ERROR_CODE.GATEWAY_ERROR: GatewayError,
+}
+
+
+class AsyncResource:
+    def __init__(self, client: "AsyncRazorpayClient", base_url: str) -> None:
+        self.client = client
+        self.base_url = base_url
+
+    async def fetch(self, entity_id: str) -> dict:
+        return await self.client.request("GET", f"{self.base_url}/{entity_id}")
+
+    async def create(self, data: dict) -> dict:
+        return await self.client.request("POST", self.base_url, json=data)
+
+
+class AsyncRazorpayClient:
+    """
+    Asyncio counterpart of the parts of `razorpay.Client` used by the plugin:
+    fetching and creating payment links, QR codes and accounts.
+
+    Calls go through the same rate limits and circuit breaker as the
+    synchronous client and raise the same `razorpay.errors`.
+    """
+
+    def __init__(self, http_client: "httpx.AsyncClient") -> None:
+        self.http_client = http_client
+        self.payment_link = AsyncResource(self, URL.V1 + URL.PAYMENT_LINK_URL)
+        self.qrcode = AsyncResource(self, URL.V1 + URL.QRCODE_URL)
+        self.account = AsyncResource(self, URL.V2 + URL.ACCOUNT)
+
+    async def send(self, method: str, path: str, **kwargs) -> "httpx.Response":
+        # Connection errors are retried by the transport, read errors and
+        # retryable responses only for idempotent GETs
+        retries = plugin_settings.RAZORPAY_HTTP_MAX_RETRIES if method == "GET" else 0
+        for attempt in range(retries + 1):
+            try:
+                response = await self.http_client.request(method, path, **kwargs)
+            except httpx.TransportError:
+                if attempt == retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt == retries:
+                    return response
+            await asyncio.sleep(
+                plugin_settings.RAZORPAY_HTTP_BACKOFF_FACTOR * 2**attempt
+                + random.uniform(0, plugin_settings.RAZORPAY_HTTP_BACKOFF_JITTER)
+            )
+
+    async def request(self, method: str, path: str, **kwargs) -> dict:
+        started_at = time.perf_counter()
+        outcome = "error"
+        try:
+            data = await self.call(method, path, **kwargs)
+            outcome = "success"
+            return data
+        except CircuitOpen:
+            outcome = "circuit_open"
+            raise
+        except RateLimitExceeded:
+            outcome = "rate_limited"
+            raise
+        except BadRequestError:
+            outcome = "client_error"
+            raise
+        except (GatewayError, ServerError):
+            outcome = "server_error"
+            raise
+        finally:
+            observe_razorpay_call(
+                get_razorpay_operation(method, path),
+                outcome,
+                time.perf_counter() - started_at,
+            )
+
+    async def call(self, method: str, path: str, **kwargs) -> dict:
+        circuit_breaker = get_circuit_breaker()
+        circuit_breaker.before_call()
+        try:
+            await get_rate_limiter(get_rate_limit_family(path)).aacquire(
+                timeout=plugin_settings.RAZORPAY_RATE_LIMIT_MAX_WAIT
+            )
+            started_at = time.monotonic()
+            response = await self.send(method, path, **kwargs)
+        except httpx.TransportError:
+            circuit_breaker.record(failed=True)
+            raise
+        except BaseException:
+            circuit_breaker.release()
+            raise
+
+        circuit_breaker.record(
+            failed=response.status_code >= 500,
+            duration=time.monotonic() - started_at,
+        )
+
+        if response.is_success:
+            return {} if response.status_code == 204 else response.json()
+
+        try:
+            error = response.json().get("error") or {}
+        except ValueError:
+            error = {}
+        raise RAZORPAY_ERRORS.get(str(error.get("code", "")).upper(), ServerError)(
+            error.get("description", "")
+        )
+
+
+def build_async_http_client() -> "httpx.AsyncClient":
+    if httpx is None:
+        raise ImproperlyConfigured(
+            "The async Razorpay client requires httpx, "
+            "install care_razorpay with the async extra"
+        )
+
+    limits = httpx.Limits(
+        max_connections=plugin_settings.RAZORPAY_ASYNC_MAX_CONNECTIONS,
+        max_keepalive_connections=plugin_settings.RAZORPAY_ASYNC_MAX_CONNECTIONS,
+    )
+    return httpx.AsyncClient(
+        base_url=plugin_settings.RAZORPAY_BASE_URL,
+        auth=(plugin_settings.RAZORPAY_KEY_ID, plugin_settings.RAZORPAY_KEY_SECRET),
+        timeout=httpx.Timeout(
+            plugin_settings.RAZORPAY_HTTP_READ_TIMEOUT,
+            connect=plugin_settings.RAZORPAY_HTTP_CONNECT_TIMEOUT,
+        ),
+        transport=httpx.AsyncHTTPTransport(
+            limits=limits, retries=plugin_settings.RAZORPAY_HTTP_MAX_RETRIES
+        ),
+    )
+
+
+_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_async_razorpay_client() -> AsyncRazorpayClient:
+    """
+    Returns the async Razorpay client of the running event loop. All
+    coroutines on a loop share the client's connection pool.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = AsyncRazorpayClient(build_async_http_client())
+    return client
+
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_pid: int | None = None
+_loop_lock = threading.Lock()
+
+
+def get_async_loop() -> asyncio.AbstractEventLoop:
+    """
+    Process-wide event loop, running on a daemon thread, that synchronous
+    code hands its concurrent Razorpay calls to.
+    """
+    global _loop, _loop_pid
+
+    pid = os.getpid()
+    if _loop_pid != pid:
+        with _loop_lock:
+            if _loop_pid != pid:
+                _loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=_loop.run_forever, name="razorpay-async", daemon=True
+                ).start()
+                _loop_pid = pid
+    return _loop
+
+
+def run_async(coroutine: Coroutine) -> Any:
+    """
+    Runs `coroutine` on the process-wide event loop and waits for its result.
+    """
+    return asyncio.run_coroutine_threadsafe(coroutine, get_async_loop()).result()
@@ -0,0 +1,220 @@
+import logging
+from collections.abc import Iterator
+from datetime import datetime
+from uuid import UUID
+
+from django.db import transaction
+from django.db.models import Q
+
+from care.emr.models.invoice import Invoice
+from care.emr.models.payment_reconciliation import PaymentReconciliation
+from care_razorpay.models.payment_link import RazorpayPaymentLink
+from care_razorpay.models.qr_code import RazorpayQRCode
+from care_razorpay.settings import plugin_settings
+from care_razorpay.tasks.rebalance import schedule_account_rebalance
+from care_razorpay.utils.bulk import chunked
+from care_razorpay.utils.dedup import mark_seen
+from care_razorpay.utils.invoice import get_invoices
+from care_razorpay.utils.mirror import get_entity_notes
+from care_razorpay.utils.razorpay import razorpay_client
+from care_razorpay.utils.webhook import build_payment_reconciliation
+
+logger = logging.getLogger(__name__)
+
+RAZORPAY_PAYMENTS_PAGE_SIZE = 100
+
+
+def iter_razorpay_pages(fetch, params: dict) -> Iterator[dict]:
+    """
+    Lazily pages through a Razorpay collection, holding a single page in
+    memory at a time.
+    """
+    skip = 0
+    while True:
+        page = fetch({**params, "count": RAZORPAY_PAYMENTS_PAGE_SIZE, "skip": skip})
+        items = page.get("items", [])
+        yield from items
+        if len(items) < RAZORPAY_PAYMENTS_PAGE_SIZE:
+            return
+        skip += RAZORPAY_PAYMENTS_PAGE_SIZE
+
+
+def get_window_params(start: datetime, end: datetime) -> dict:
+    return {"from": int(start.timestamp()), "to": int(end.timestamp())}
+
+
+def iter_razorpay_payments(start: datetime, end: datetime) -> Iterator[dict]:
+    """
+    Lazily pages through the payments created on Razorpay between `start` and
+    `end`.
+    """
+    return iter_razorpay_pages(
+        razorpay_client.payment.all, get_window_params(start, end)
+    )
+
+
+def get_payment_invoice_id(payment: dict) -> UUID | None:
+    try:
+        return UUID(get_entity_notes(payment).get("invoice_id"))
+    except (TypeError, ValueError):
+        return None
+
+
+class PaymentInvoiceResolver:
+    """
+    Resolves the invoice a missed Razorpay payment was made against.
+
+    Payments made on a payment link usually carry its notes, and otherwise
+    the order of the link. Payments made on a QR code carry neither, so the
+    payments of the mirrored QR codes that were open during the window are
+    fetched from Razorpay, once and only when a payment needs them.
+    """
+
+    def __init__(self, start: datetime, end: datetime) -> None:
+        self.start = start
+        self.end = end
+        self.qr_code_invoice_ids: dict[str, UUID] | None = None
+
+    def get_payment_link_invoice_ids(self, order_ids: set[str]) -> dict[str, UUID]:
+        if not order_ids:
+            return {}
+        return dict(
+            RazorpayPaymentLink.objects.filter(
+                metadata__order_id__in=order_ids
+            ).values_list("metadata__order_id", "invoice_external_id")
+        )
+
+    def get_qr_code_invoice_ids(self) -> dict[str, UUID]:
+        if self.qr_code_invoice_ids is not None:
+            return self.qr_code_invoice_ids
+
+        qr_codes = (
+            RazorpayQRCode.objects.filter(created_date__lte=self.end)
+            .filter(Q(close_by__isnull=True) | Q(close_by__gte=self.start))
+            .exclude(status="closed", modified_date__lt=self.start)
+        )
+        params = get_window_params(self.start, self.end)
+        self.qr_code_invoice_ids = {}
+        for razorpay_id, invoice_id in qr_codes.values_list(
+            "razorpay_id", "invoice_external_id"
+        ).iterator():
+            for payment in iter_razorpay_pages(
+                lambda data, razorpay_id=razorpay_id: (
+                    razorpay_client.qrcode.fetch_all_payments(razorpay_id, data)
+                ),
+                params,
+            ):
+                self.qr_code_invoice_ids[payment["id"]] = invoice_id
+        return self.qr_code_invoice_ids
+
+    def resolve(self, payments: list[dict]) -> dict[str, UUID]:
+        """
+        Returns the external ids of the invoices of the given payments, by
+        payment id. Payments whose invoice cannot be resolved are left out.
+        """
+        invoice_ids = {}
+        unresolved = []
+        for payment in payments:
+            invoice_id = get_payment_invoice_id(payment)
+            if invoice_id:
+                invoice_ids[payment["id"]] = invoice_id
+            else:
+                unresolved.append(payment)
+
+        payment_link_invoice_ids = self.get_payment_link_invoice_ids(
+            {payment["order_id"] for payment in unresolved if payment.get("order_id")}
+        )
+        for payment in unresolved:
+            invoice_id = payment_link_invoice_ids.get(payment.get("order_id"))
+            if not invoice_id:
+                invoice_id = self.get_qr_code_invoice_ids().get(payment["id"])
+            if invoice_id:
+                invoice_ids[payment["id"]] = invoice_id
+        return invoice_ids
+
+
+def get_recorded_payment_ids(payment_ids: set[str]) -> set[str]:
+    return set(
+        PaymentReconciliation.objects.filter(
+            reference_number__in=payment_ids
+        ).values_list("reference_number", flat=True)
+    )
+
+
+def reconcile_payments(
+    payments: list[dict], resolver: PaymentInvoiceResolver, stats: dict
+) -> None:
+    recorded = get_recorded_payment_ids({payment["id"] for payment in payments})
+    missing = [payment for payment in payments if payment["id"] not in recorded]
+    stats["skipped"] += len(payments) - len(missing)
+    if not missing:
+        return
+
+    invoice_ids = resolver.resolve(missing)
+    invoices = get_invoices(set(invoice_ids.values()))
+
+    with transaction.atomic():
+        # A webhook for the same payment may be applied concurrently, so lock
+        # the invoices the same way record_payment does and check again
+        list(
+            Invoice.objects.select_for_update()
+            .filter(id__in=[invoice.id for invoice in invoices.values()])
+            .order_by("id")
+            .values("id")
+        )
+        recorded = get_recorded_payment_ids({payment["id"] for payment in missing})
+        stats["skipped"] += len(recorded)
+
+        payment_reconciliations = []
+        for payment in missing:
+            if payment["id"] in recorded:
+                continue
+            invoice = invoices.get(invoice_ids.get(payment["id"]))
+            if not invoice:
+                stats["unmatched"] += 1
+                logger.warning(
+                    "No invoice found for missed Razorpay payment %s", payment["id"]
+                )
+                continue
+            payment_reconciliations.append(
+                build_payment_reconciliation(
+                    invoice, payment, "Payment reconciled from Razorpay."
+                )
+            )
+
+        PaymentReconciliation.objects.bulk_create(payment_reconciliations)
+        for account_id in {obj.account_id for obj in payment_reconciliations}:
+            transaction.on_commit(
+                lambda account_id=account_id: schedule_account_rebalance(account_id)
+            )
+
+    for obj in payment_reconciliations:
+        mark_seen("payment", obj.reference_number)
+    stats["recorded"] += len(payment_reconciliations)
+
+
+def reconcile_missed_payments(start: datetime, end: datetime) -> dict:
+    """
+    Records the captured Razorpay payments between `start` and `end` that
+    have no PaymentReconciliation yet, e.g. because the webhook endpoint was
+    unavailable when they were delivered.
+
+    Returns the number of payments seen, recorded, already recorded (skipped)
+    and without a matching invoice (unmatched).
+    """
+    stats = {"seen": 0, "recorded": 0, "skipped": 0, "unmatched": 0}
+    resolver = PaymentInvoiceResolver(start, end)
+
+    def iter_captured_payments():
+        for payment in iter_razorpay_payments(start, end):
+            stats["seen"] += 1
+            if payment.get("status") == "captured":
+                yield payment
+
+    for payments in chunked(
+        iter_captured_payments(), plugin_settings.RAZORPAY_SWEEP_BATCH_SIZE
+    ):
+        reconcile_payments(payments, resolver, stats)
+
+    logger.info("Reconciled missed Razorpay payments: %s", stats)
+    return stats
@@ -0,0 +1,46 @@
+import hashlib
+import hmac
+from collections.abc import Iterable
+
+# Shorter secrets are too easily guessed to authenticate anything
+MIN_SECRET_LENGTH = 8
+
+
+class WebhookSignatureVerifier:
+    """
+    Verifies the HMAC-SHA256 signature Razorpay sends with every webhook
+    delivery against the raw request body.
+
+    Several secrets can be active at once so that the webhook secret can be
+    rotated without dropping deliveries signed with the previous one. The
+    keyed HMAC state of every secret is computed once and copied per request.
+    """
+
+    def __init__(self, secrets: Iterable[str]) -> None:
+        # dict.fromkeys dedupes while keeping the order of preference
+        secrets = list(dict.fromkeys(secrets))
+        if not secrets:
+            raise ValueError("At least one webhook secret is required")
+        for secret in secrets:
+            if not isinstance(secret, str) or len(secret) < MIN_SECRET_LENGTH:
+                raise ValueError(
+                    "Webhook secrets must be strings of at least "
+                    f"{MIN_SECRET_LENGTH} characters"
+                )
+
+        self._macs = [
+            hmac.new(secret.encode(), digestmod=hashlib.sha256) for secret in secrets
+        ]
+
+    def verify(self, body: bytes, signature: str) -> bool:
+        try:
+            expected = bytes.fromhex(signature)
+        except (TypeError, ValueError):
+            return False
+
+        for mac in self._macs:
+            mac = mac.copy()
+            mac.update(body)
+            if hmac.compare_digest(mac.digest(), expected):
+                return True
+        return False
@@ -0,0 +1,156 @@
+import json
+import logging
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+from django.core.exceptions import ImproperlyConfigured
+
+from care_razorpay.settings import plugin_settings
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # pragma: no cover
+    otel_trace = None
+
+logger = logging.getLogger(__name__)
+
+NOOP_SPAN = nullcontext()
+
+
+class RequestTrace:
+    """
+    Collects the duration of every span within one request or task, for the
+    slow-call breakdown.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.stages = []
+        self.path = []
+        self.started_at = time.perf_counter()
+
+    def get_breakdown(self, duration: float) -> dict:
+        return {
+            "name": self.name,
+            "duration": round(duration, 4),
+            "stages": [
+                {"name": name, "duration": round(stage_duration, 4)}
+                for name, stage_duration in self.stages
+            ],
+        }
+
+
+_current_trace: ContextVar[RequestTrace | None] = ContextVar(
+    "care_razorpay_trace", default=None
+)
+
+
+def get_tracer():
+    """
+    Returns the OpenTelemetry tracer when tracing is enabled, else None.
+    """
+    if not plugin_settings.RAZORPAY_TRACING_ENABLED:
+        return None
+    if otel_trace is None:
+        raise ImproperlyConfigured(
+            "RAZORPAY_TRACING_ENABLED requires opentelemetry-api, "
+            "install care_razorpay with the tracing extra"
+        )
+    return otel_trace.get_tracer("care_razorpay")
+
+
+class Span:
+    __slots__ = ("name", "attributes", "trace", "tracer", "otel_span", "started_at")
+
+    def __init__(self, name, attributes, trace, tracer) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.trace = trace
+        self.tracer = tracer
+        self.otel_span = None
+
+    def __enter__(self):
+        if self.tracer is not None:
+            self.otel_span = self.tracer.start_as_current_span(
+                self.name, attributes=self.attributes
+            )
+            self.otel_span.__enter__()
+        if self.trace is not None:
+            self.trace.path.append(self.name)
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self.started_at
+        if self.trace is not None:
+            self.trace.stages.append((" > ".join(self.trace.path), duration))
+            self.trace.path.pop()
+        if self.otel_span is not None:
+            return self.otel_span.__exit__(*exc_info)
+
+
+def span(name: str, **attributes):
+    """
+    Times a stage of the current request: as an OpenTelemetry span when
+    tracing is enabled, and in the slow-call breakdown when that is enabled.
+    A shared no-op context manager otherwise.
+    """
+    trace = _current_trace.get()
+    tracer = get_tracer()
+    if trace is None and tracer is None:
+        return NOOP_SPAN
+    return Span(name, attributes, trace, tracer)
+
+
+class trace_request:
+    """
+    Root span of a request or task. Logs a breakdown of its stages when it
+    took longer than RAZORPAY_SLOW_CALL_LOG_THRESHOLD seconds.
+    """
+
+    def __init__(self, name: str, **attributes) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.trace = None
+        self.token = None
+        self.span = None
+
+    def __enter__(self):
+        tracer = get_tracer()
+        # The root span is the total of the breakdown, not one of its stages
+        self.span = (
+            Span(self.name, self.attributes, None, tracer) if tracer else NOOP_SPAN
+        )
+        self.span.__enter__()
+        if plugin_settings.RAZORPAY_SLOW_CALL_LOG_THRESHOLD:
+            self.trace = RequestTrace(self.name)
+            self.token = _current_trace.set(self.trace)
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            return self.span.__exit__(*exc_info)
+        finally:
+            if self.trace is not None:
+                _current_trace.reset(self.token)
+                duration = time.perf_counter() - self.trace.started_at
+                if duration >= plugin_settings.RAZORPAY_SLOW_CALL_LOG_THRESHOLD:
+                    logger.warning(
+                        "Slow Razorpay plugin call: %s",
+                        json.dumps(self.trace.get_breakdown(duration)),
+                    )
+
+
+class TracedViewSetMixin:
+    """
+    Traces every request of a viewset as `<basename>.<action>`. Must come
+    before the DRF viewset class in the bases.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        action = (getattr(self, "action_map", None) or {}).get(method, method)
+        name = f"{getattr(self, 'basename', None) or type(self).__name__}.{action}"
+        with trace_request(name, **{"http.request.method": request.method}):
+            return super().dispatch(request, *args, **kwargs)
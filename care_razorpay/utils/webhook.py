@@ -0,0 +1,421 @@
+import logging
+import time
+import zlib
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from care.emr.models.invoice import Invoice
+from care.emr.models.payment_reconciliation import PaymentReconciliation
+from care.emr.resources.payment_reconciliation.spec import (
+    PaymentReconciliationIssuerTypeOptions,
+    PaymentReconciliationKindOptions,
+    PaymentReconciliationOutcomeOptions,
+    PaymentReconciliationPaymentMethodOptions,
+    PaymentReconciliationStatusOptions,
+    PaymentReconciliationTypeOptions,
+)
+from care_razorpay.models.webhook_event import WebhookEvent, WebhookEventStatus
+from care_razorpay.settings import plugin_settings
+from care_razorpay.tasks.rebalance import schedule_account_rebalance
+from care_razorpay.utils.cache import update_cached_payment_link, update_cached_qr_code
+from care_razorpay.utils.dedup import is_recently_seen, mark_seen
+from care_razorpay.utils.events import RazorpayEvent
+from care_razorpay.utils.invoice import get_invoice
+from care_razorpay.utils.lock import CacheLock
+from care_razorpay.utils.metrics import observe_webhook_event, observe_webhook_stage
+from care_razorpay.utils.mirror import (
+    get_entity_notes,
+    upsert_payment_link,
+    upsert_qr_code,
+)
+from care_razorpay.utils.tracing import span, trace_request
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_LANE_LOCK_KEY = "care_razorpay:webhook:lane:{lane}"
+# A lane held by a lost worker is released after this many seconds; the
+# timeout restarts with every event applied
+WEBHOOK_LANE_LOCK_TIMEOUT = 5 * 60
+
+
+class WebhookProcessingError(Exception):
+    """Raised when a stored webhook event cannot be applied (yet)."""
+
+
+def build_payment_reconciliation(
+    invoice: Invoice, payment: dict, note: str
+) -> PaymentReconciliation:
+    """
+    Maps a Razorpay payment entity to an (unsaved) PaymentReconciliation
+    against the given invoice.
+    """
+    return PaymentReconciliation(
+        target_invoice=invoice,
+        facility=invoice.facility,
+        account=invoice.account,
+        reconciliation_type=PaymentReconciliationTypeOptions.payment.value,
+        status=PaymentReconciliationStatusOptions.active.value,
+        kind=PaymentReconciliationKindOptions.online.value,
+        issuer_type=PaymentReconciliationIssuerTypeOptions.patient.value,
+        outcome=PaymentReconciliationOutcomeOptions.complete.value,
+        method=PaymentReconciliationPaymentMethodOptions.debc.value,
+        payment_datetime=datetime.fromtimestamp(payment.get("created_at"), UTC),
+        amount=payment.get("amount") / 100,
+        tendered_amount=payment.get("amount") / 100,
+        returned_amount=0,
+        is_credit_note=False,
+        authorization="",
+        disposition="",
+        note=note,
+        reference_number=payment.get("id"),
+    )
+
+
+def is_payment_recorded(payment_id: str) -> bool:
+    if is_recently_seen("payment", payment_id):
+        return True
+    return PaymentReconciliation.objects.filter(reference_number=payment_id).exists()
+
+
+def save_payment_reconciliation(payment_reconciliation: PaymentReconciliation) -> None:
+    """
+    Saves a payment (or refund) reconciliation built from a Razorpay entity
+    and rebalances its account once committed.
+    """
+    started_at = time.perf_counter()
+    with span("reconciliation_insert"):
+        payment_reconciliation.save()
+    observe_webhook_stage("reconciliation_insert", time.perf_counter() - started_at)
+
+    reference_number = payment_reconciliation.reference_number
+    account_id = payment_reconciliation.account.id
+    transaction.on_commit(lambda: schedule_account_rebalance(account_id))
+    transaction.on_commit(lambda: mark_seen("payment", reference_number))
+
+
+def record_payment(payment: dict, entity: dict, note: str) -> None:
+    """
+    Records a Razorpay payment against the invoice referenced in the notes of
+    the payment link / QR code entity. Payments that were already recorded are
+    skipped before touching the invoice.
+    """
+    payment_id = payment.get("id")
+    if is_payment_recorded(payment_id):
+        logger.info("Skipping already recorded Razorpay payment %s", payment_id)
+        return
+
+    started_at = time.perf_counter()
+    with span("invoice_lookup"):
+        notes = get_entity_notes(entity)
+        invoice_id = notes.get("invoice_id")
+        invoice = get_invoice(invoice_id) if invoice_id else None
+    observe_webhook_stage("invoice_lookup", time.perf_counter() - started_at)
+
+    if not invoice:
+        raise WebhookProcessingError("Invoice not found")
+
+    # payment.captured and the payment link / QR code event of the same
+    # payment may be applied concurrently, so check again under a row lock
+    list(Invoice.objects.select_for_update().filter(id=invoice.id).values("id"))
+    if PaymentReconciliation.objects.filter(reference_number=payment_id).exists():
+        return
+
+    save_payment_reconciliation(build_payment_reconciliation(invoice, payment, note))
+
+
+WEBHOOK_HANDLERS: dict[str, Callable[[RazorpayEvent], None]] = {}
+
+
+def register_webhook_handler(*events: str):
+    """
+    Registers the decorated function as the handler of the given webhook
+    event types. Events without a handler are acknowledged without being
+    stored.
+    """
+
+    def decorator(handler: Callable[[RazorpayEvent], None]):
+        for event in events:
+            WEBHOOK_HANDLERS[event] = handler
+        return handler
+
+    return decorator
+
+
+def is_webhook_event_handled(event: str) -> bool:
+    return event in WEBHOOK_HANDLERS
+
+
+@register_webhook_handler("payment_link.paid", "payment_link.partially_paid")
+def handle_payment_link_event(event: RazorpayEvent) -> None:
+    payment = event.payment
+    payment_link = event.payment_link
+
+    if not payment or not payment_link:
+        raise WebhookProcessingError("Payment or payment link not found")
+
+    upsert_payment_link(payment_link)
+    update_cached_payment_link(payment_link)
+    record_payment(payment, payment_link, "Payment made via Razorpay's payment link.")
+
+
+@register_webhook_handler("qr_code.credited")
+def handle_qr_code_event(event: RazorpayEvent) -> None:
+    payment = event.payment
+    qr_code = event.qr_code
+
+    if not payment or not qr_code:
+        raise WebhookProcessingError("Payment or QR code not found")
+
+    upsert_qr_code(qr_code)
+    update_cached_qr_code(qr_code)
+    record_payment(payment, qr_code, "Payment made via Razorpay's QR code.")
+
+
+@register_webhook_handler("payment.captured")
+def handle_payment_captured_event(event: RazorpayEvent) -> None:
+    payment = event.payment
+    if not payment:
+        raise WebhookProcessingError("Payment not found")
+
+    # Payments inherit the notes of the payment link / QR code they were made
+    # on; payments made elsewhere on the account are not ours to record
+    if not get_entity_notes(payment).get("invoice_id"):
+        logger.info("Ignoring Razorpay payment %s without an invoice", payment["id"])
+        return
+
+    record_payment(payment, payment, "Payment captured via Razorpay.")
+
+
+@register_webhook_handler("payment.failed")
+def handle_payment_failed_event(event: RazorpayEvent) -> None:
+    payment = event.payment
+    if not payment:
+        raise WebhookProcessingError("Payment not found")
+
+    logger.info(
+        "Razorpay payment %s for invoice %s failed: %s",
+        payment.get("id"),
+        get_entity_notes(payment).get("invoice_id"),
+        payment.get("error_description"),
+    )
+
+
+@register_webhook_handler("refund.processed")
+def handle_refund_processed_event(event: RazorpayEvent) -> None:
+    """
+    Records a processed refund as a credit note against the invoice of the
+    refunded payment.
+    """
+    refund = event.refund
+    if not refund:
+        raise WebhookProcessingError("Refund not found")
+
+    refund_id = refund.get("id")
+    if is_payment_recorded(refund_id):
+        logger.info("Skipping already recorded Razorpay refund %s", refund_id)
+        return
+
+    payment_reconciliation = (
+        PaymentReconciliation.objects.select_related(
+            "target_invoice__facility", "target_invoice__account"
+        )
+        .filter(reference_number=refund.get("payment_id"))
+        .first()
+    )
+    if not payment_reconciliation:
+        # Retried until the payment itself has been recorded
+        raise WebhookProcessingError("Refunded payment not recorded")
+
+    refund_reconciliation = build_payment_reconciliation(
+        payment_reconciliation.target_invoice, refund, "Refund processed via Razorpay."
+    )
+    refund_reconciliation.is_credit_note = True
+    save_payment_reconciliation(refund_reconciliation)
+
+
+@register_webhook_handler("transfer.processed")
+def handle_transfer_processed_event(event: RazorpayEvent) -> None:
+    transfer = event.transfer
+    if not transfer:
+        raise WebhookProcessingError("Transfer not found")
+
+    logger.info(
+        "Razorpay transfer %s of payment %s to account %s processed",
+        transfer.get("id"),
+        transfer.get("source"),
+        transfer.get("recipient"),
+    )
+
+
+def process_webhook_event(webhook_event: WebhookEvent) -> None:
+    """
+    Applies a single stored webhook event. Failures are recorded on the event
+    and retried with exponential backoff until the attempt budget is spent,
+    after which the event is dead-lettered.
+    """
+    handler = WEBHOOK_HANDLERS.get(webhook_event.event)
+
+    webhook_event.attempts += 1
+    started_at = time.perf_counter()
+    try:
+        if handler:
+            with (
+                trace_request(f"webhook.{webhook_event.event}"),
+                transaction.atomic(),
+            ):
+                handler(RazorpayEvent.from_dict(webhook_event.payload))
+    except Exception as e:
+        webhook_event.last_error = str(e)
+        if webhook_event.attempts >= plugin_settings.RAZORPAY_WEBHOOK_MAX_ATTEMPTS:
+            webhook_event.status = WebhookEventStatus.DEAD.value
+            outcome = "dead"
+            logger.error(
+                "Dead-lettered Razorpay webhook event %s (%s): %s",
+                webhook_event.external_id,
+                webhook_event.event,
+                e,
+            )
+        else:
+            delay = plugin_settings.RAZORPAY_WEBHOOK_RETRY_DELAY * (
+                2 ** (webhook_event.attempts - 1)
+            )
+            webhook_event.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+            outcome = "retry"
+    else:
+        webhook_event.status = WebhookEventStatus.PROCESSED.value
+        webhook_event.processed_at = timezone.now()
+        webhook_event.last_error = ""
+        outcome = "processed" if handler else "ignored"
+
+    observe_webhook_event(
+        webhook_event.event, outcome, time.perf_counter() - started_at
+    )
+
+    webhook_event.save(
+        update_fields=[
+            "attempts",
+            "status",
+            "last_error",
+            "next_attempt_at",
+            "processed_at",
+            "modified_date",
+        ]
+    )
+
+
+def get_webhook_partition_key(event: RazorpayEvent) -> str:
+    """
+    Returns the key of the events that must be applied in order: those of
+    the same invoice (payments, partial payments and their refunds, which
+    all carry the invoice in their notes), else of the same account.
+    """
+    for name in ("payment_link", "qr_code", "payment"):
+        entity = event.get_entity(name)
+        if entity:
+            invoice_id = get_entity_notes(entity).get("invoice_id")
+            if invoice_id:
+                return f"invoice:{invoice_id}"
+
+    transfer = event.transfer
+    if transfer and transfer.get("recipient"):
+        return f"account:{transfer['recipient']}"
+    return f"account:{event.account_id or ''}"
+
+
+def get_webhook_lane(partition_key: str) -> int:
+    # crc32 rather than hash(), which differs between processes
+    return zlib.crc32(partition_key.encode()) % plugin_settings.RAZORPAY_WEBHOOK_LANES
+
+
+def get_due_webhook_lanes() -> list[int]:
+    return list(
+        WebhookEvent.objects.filter(
+            status=WebhookEventStatus.PENDING.value,
+            next_attempt_at__lte=timezone.now(),
+        )
+        .values_list("lane", flat=True)
+        .distinct()
+    )
+
+
+def drain_webhook_lane(lane: int, batch_size: int | None = None) -> int | None:
+    """
+    Applies up to `batch_size` due events of a lane, one at a time in the
+    order they were received. An event waiting for a retry holds back the
+    later events of its partition, but not those of the other partitions
+    sharing the lane.
+
+    Only one worker drains a lane at a time. Returns the number of events
+    that were attempted, or None when the lane is being drained elsewhere.
+    """
+    batch_size = batch_size or plugin_settings.RAZORPAY_WEBHOOK_BATCH_SIZE
+
+    lock = CacheLock(
+        WEBHOOK_LANE_LOCK_KEY.format(lane=lane), timeout=WEBHOOK_LANE_LOCK_TIMEOUT
+    )
+    if not lock.acquire():
+        return None
+
+    try:
+        now = timezone.now()
+        blocked = set()
+        attempted = 0
+        last_id = 0
+        while attempted < batch_size:
+            candidates = list(
+                WebhookEvent.objects.filter(
+                    lane=lane, status=WebhookEventStatus.PENDING.value, id__gt=last_id
+                )
+                .order_by("id")
+                .values_list("id", "partition_key", "next_attempt_at")[:batch_size]
+            )
+            if not candidates:
+                break
+
+            for event_id, partition_key, next_attempt_at in candidates:
+                last_id = event_id
+                if partition_key in blocked:
+                    continue
+                if next_attempt_at > now:
+                    blocked.add(partition_key)
+                    continue
+                if not lock.extend():
+                    # Lost the lane to another worker after a stall
+                    logger.warning("Lost the lock of Razorpay webhook lane %s", lane)
+                    return attempted
+
+                with transaction.atomic():
+                    webhook_event = (
+                        WebhookEvent.objects.select_for_update(skip_locked=True)
+                        .filter(id=event_id, status=WebhookEventStatus.PENDING.value)
+                        .first()
+                    )
+                    if webhook_event:
+                        process_webhook_event(webhook_event)
+                attempted += 1
+
+                if (
+                    not webhook_event
+                    or webhook_event.status == WebhookEventStatus.PENDING.value
+                ):
+                    blocked.add(partition_key)
+                if attempted >= batch_size:
+                    break
+    finally:
+        lock.release()
+
+    return attempted
+
+
+def drain_webhook_events(batch_size: int | None = None) -> int:
+    """
+    Drains every lane with due events in turn, in the current process.
+
+    Returns the number of events that were attempted.
+    """
+    return sum(
+        drain_webhook_lane(lane, batch_size) or 0 for lane in get_due_webhook_lanes()
+    )
@@ -12,6 +12,7 @@ with open("HISTORY.rst") as history_file:
 
 requirements = [
     "requests",
+    "urllib3>=2",
     "celery",
     "django",
     "djangorestframework",
@@ -39,6 +40,12 @@ setup(
     ],
     description="Nothing Much",
     install_requires=requirements,
+    extras_require={
+        "async": ["httpx"],
+        "metrics": ["prometheus_client"],
+        "tracing": ["opentelemetry-api"],
+        "speedups": ["orjson"],
+    },
     license="MIT license",
     long_description=readme + "\n\n" + history,
     include_package_data=True,
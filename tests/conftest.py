@@ -0,0 +1,42 @@
+import importlib.util
+import os
+
+import django
+from django.conf import settings
+
+# These modules need a care environment (its apps, a test database and
+# model_bakery) and run with care's own test suite
+CARE_TEST_MODULES = [
+    "test_facility.py",
+    "test_invoice_context.py",
+    "test_rebalance.py",
+    "test_reconciliation.py",
+    "test_webhook_dedup.py",
+    "test_webhook_handlers.py",
+    "test_webhook_inbox.py",
+    "test_webhook_lanes.py",
+]
+
+collect_ignore = []
+if not all(
+    importlib.util.find_spec(name) for name in ("care", "model_bakery", "pytest_django")
+):
+    collect_ignore += CARE_TEST_MODULES
+
+if "DJANGO_SETTINGS_MODULE" not in os.environ and not settings.configured:
+    # Enough for the modules that only read plugin settings and the cache,
+    # and for DRF views serving anonymous requests
+    settings.configure(
+        INSTALLED_APPS=["django.contrib.contenttypes", "django.contrib.auth"],
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        PLUGIN_CONFIGS={
+            "care_razorpay": {
+                "RAZORPAY_KEY_ID": "rzp_test",
+                "RAZORPAY_KEY_SECRET": "secret",
+                "RAZORPAY_WEBHOOK_SECRET": "whsec_test",
+            }
+        },
+    )
+    django.setup()
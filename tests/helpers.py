@@ -0,0 +1,50 @@
+"""Helpers shared by the test modules."""
+
+from unittest import mock
+
+from django.core.cache import cache
+
+from care_razorpay.utils import dedup
+
+
+def patch_clock(test_case, module: str) -> None:
+    """
+    Runs the monotonic clock of `module` on `test_case.now`, which the test
+    moves forward as it goes.
+    """
+    test_case.now = 1000.0
+    patcher = mock.patch(f"{module}.time.monotonic", side_effect=lambda: test_case.now)
+    patcher.start()
+    test_case.addCleanup(patcher.stop)
+
+
+def patch_webhook_handlers(test_case, handlers: dict) -> None:
+    """
+    Routes the given event types to test handlers for the duration of a test.
+    """
+    patcher = mock.patch.dict("care_razorpay.utils.webhook.WEBHOOK_HANDLERS", handlers)
+    patcher.start()
+    test_case.addCleanup(patcher.stop)
+
+
+def forget_seen() -> None:
+    """
+    Empties the recently seen filter, in this process and in the cache.
+    """
+    cache.clear()
+    with dedup._local_seen_lock:
+        dedup._local_seen.clear()
+
+
+def plugin_configs(**settings) -> dict:
+    """
+    PLUGIN_CONFIGS with the required credentials and the given settings.
+    """
+    return {
+        "care_razorpay": {
+            "RAZORPAY_KEY_ID": "rzp_test",
+            "RAZORPAY_KEY_SECRET": "secret",
+            "RAZORPAY_WEBHOOK_SECRET": "whsec_test",
+            **settings,
+        }
+    }
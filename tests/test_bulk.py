@@ -0,0 +1,51 @@
+"""Tests for streaming bulk operation results."""
+
+import warnings
+
+from asgiref.sync import async_to_sync
+from django.http import StreamingHttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase
+
+from care_razorpay.utils.bulk import get_streaming_content
+
+
+class TestGetStreamingContent(SimpleTestCase):
+    """Responses are sent line by line under both WSGI and ASGI."""
+
+    def setUp(self):
+        """Set up a generator recording how many lines it produced."""
+        self.produced = []
+
+        def lines():
+            for index in range(3):
+                self.produced.append(index)
+                yield f"{index}\n"
+
+        self.lines = lines()
+
+    def test_wsgi_streams_incrementally(self):
+        request = RequestFactory().post("/qr_code/bulk_create/")
+        response = StreamingHttpResponse(get_streaming_content(request, self.lines))
+
+        with warnings.catch_warnings():
+            # Django warns when it has to buffer the content
+            warnings.simplefilter("error")
+            chunks = iter(response)
+            self.assertEqual(next(chunks), b"0\n")
+            self.assertEqual(self.produced, [0])
+            self.assertEqual(list(chunks), [b"1\n", b"2\n"])
+
+    def test_asgi_streams_incrementally(self):
+        request = AsyncRequestFactory().post("/qr_code/bulk_create/")
+        response = StreamingHttpResponse(get_streaming_content(request, self.lines))
+
+        async def read():
+            chunks = []
+            async for chunk in response:
+                chunks.append((chunk, list(self.produced)))
+            return chunks
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            chunks = async_to_sync(read)()
+        self.assertEqual(chunks, [(b"0\n", [0]), (b"1\n", [0, 1]), (b"2\n", [0, 1, 2])])
@@ -0,0 +1,112 @@
+"""Tests for the Razorpay circuit breaker."""
+
+import unittest
+
+from care_razorpay.utils.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpen,
+    CircuitState,
+)
+from tests.helpers import patch_clock
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Tests for `CircuitBreaker`."""
+
+    def setUp(self):
+        """Set up a breaker on a clock the tests control."""
+        patch_clock(self, "care_razorpay.utils.circuit_breaker")
+        self.breaker = CircuitBreaker(
+            window=60,
+            min_calls=4,
+            failure_rate=0.5,
+            slow_call_threshold=5,
+            slow_call_rate=0.5,
+            open_duration=30,
+        )
+
+    def call(self, failed=False, duration=0.1):
+        self.breaker.before_call()
+        self.breaker.record(failed, duration)
+
+    def open_breaker(self):
+        for failed in (False, False, True, True):
+            self.call(failed=failed)
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+
+    def test_stays_closed_below_min_calls(self):
+        """Failures do not open the breaker before `min_calls` calls."""
+        for _ in range(3):
+            self.call(failed=True)
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+
+    def test_opens_at_failure_rate(self):
+        """The breaker opens once the failure rate reaches the threshold."""
+        for failed in (False, False, True):
+            self.call(failed=failed)
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+
+        self.call(failed=True)
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+
+    def test_opens_at_slow_call_rate(self):
+        """Slow calls count towards opening the breaker like failures."""
+        for duration in (0.1, 0.1, 5, 6):
+            self.call(duration=duration)
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+
+    def test_rejects_calls_while_open(self):
+        """Calls are rejected until the open duration elapsed."""
+        self.open_breaker()
+        self.now += 29
+        with self.assertRaises(CircuitOpen):
+            self.breaker.before_call()
+
+    def test_single_half_open_probe(self):
+        """After the open duration a single probe call is let through."""
+        self.open_breaker()
+        self.now += 30
+
+        self.breaker.before_call()
+        self.assertEqual(self.breaker.state, CircuitState.HALF_OPEN)
+        with self.assertRaises(CircuitOpen):
+            self.breaker.before_call()
+
+    def test_closes_on_successful_probe(self):
+        """A successful probe closes the breaker."""
+        self.open_breaker()
+        self.now += 30
+
+        self.call()
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+        self.breaker.before_call()
+
+    def test_reopens_on_failed_probe(self):
+        """A failed probe opens the breaker for another open duration."""
+        self.open_breaker()
+        self.now += 30
+
+        self.call(failed=True)
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+        self.now += 29
+        with self.assertRaises(CircuitOpen):
+            self.breaker.before_call()
+
+    def test_released_probe_lets_another_through(self):
+        """A probe that never reached Razorpay frees the half-open slot."""
+        self.open_breaker()
+        self.now += 30
+
+        self.breaker.before_call()
+        self.breaker.release()
+        self.breaker.before_call()
+
+    def test_failures_expire_with_the_window(self):
+        """Failures older than the window no longer count."""
+        for _ in range(3):
+            self.call(failed=True)
+        self.now += 61
+
+        self.call(failed=True)
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+        self.assertEqual(self.breaker.get_status()["failures"], 1)
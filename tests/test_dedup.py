@@ -0,0 +1,72 @@
+"""Tests for the "seen recently" filter in front of the webhook inbox."""
+
+import unittest
+from unittest import mock
+
+from django.core.cache import cache
+
+from care_razorpay.settings import plugin_settings
+from care_razorpay.utils import dedup
+from care_razorpay.utils.dedup import is_recently_seen, mark_seen
+from tests.helpers import forget_seen, patch_clock
+
+
+class TestDedup(unittest.TestCase):
+    """Tests for `is_recently_seen` and `mark_seen`."""
+
+    def setUp(self):
+        """Start from an empty local table and cache, on a controlled clock."""
+        forget_seen()
+        self.addCleanup(forget_seen)
+        patch_clock(self, "care_razorpay.utils.dedup")
+
+    def clear_local(self):
+        with dedup._local_seen_lock:
+            dedup._local_seen.clear()
+
+    def test_unseen(self):
+        """Values that were never marked are not seen."""
+        self.assertFalse(is_recently_seen("event", "evt_1"))
+
+    def test_mark_seen(self):
+        """Marked values are seen within their namespace only."""
+        mark_seen("event", "evt_1")
+        self.assertTrue(is_recently_seen("event", "evt_1"))
+        self.assertFalse(is_recently_seen("payment", "evt_1"))
+        self.assertFalse(is_recently_seen("event", "evt_2"))
+
+    def test_local_table_is_checked_first(self):
+        """A value seen by this process does not reach the cache."""
+        mark_seen("event", "evt_1")
+        with mock.patch.object(dedup.cache, "get") as cache_get:
+            self.assertTrue(is_recently_seen("event", "evt_1"))
+        cache_get.assert_not_called()
+
+    def test_seen_by_another_process(self):
+        """Values marked elsewhere are found in the cache and kept locally."""
+        mark_seen("event", "evt_1")
+        self.clear_local()
+
+        self.assertTrue(is_recently_seen("event", "evt_1"))
+        with mock.patch.object(dedup.cache, "get") as cache_get:
+            self.assertTrue(is_recently_seen("event", "evt_1"))
+        cache_get.assert_not_called()
+
+    def test_local_entries_expire(self):
+        """Local entries are dropped once the dedup window has passed."""
+        mark_seen("event", "evt_1")
+        cache.clear()
+
+        self.now += plugin_settings.RAZORPAY_DEDUP_TTL + 1
+        self.assertFalse(is_recently_seen("event", "evt_1"))
+        self.assertFalse(dedup._local_seen)
+
+    def test_local_table_is_bounded(self):
+        """The oldest local entries are evicted beyond the maximum size."""
+        with mock.patch.object(dedup, "LOCAL_SEEN_MAX_SIZE", 2):
+            for value in ("evt_1", "evt_2", "evt_3"):
+                mark_seen("event", value)
+        self.assertEqual(len(dedup._local_seen), 2)
+
+        # Still found through the cache
+        self.assertTrue(is_recently_seen("event", "evt_1"))
@@ -0,0 +1,43 @@
+"""Tests for the decoded Razorpay webhook event."""
+
+import unittest
+
+from care_razorpay.utils.events import RazorpayEvent
+
+BODY = (
+    b'{"event":"payment_link.paid","account_id":"acc_1","created_at":1700000000,'
+    b'"payload":{"payment":{"entity":{"id":"pay_1","amount":10000}},'
+    b'"payment_link":{"entity":{"id":"plink_1"}}}}'
+)
+
+
+class TestRazorpayEvent(unittest.TestCase):
+    """Tests for `RazorpayEvent`."""
+
+    def test_from_bytes(self):
+        """The raw body is decoded into the event and its entities."""
+        event = RazorpayEvent.from_bytes(BODY)
+        self.assertEqual(event.event, "payment_link.paid")
+        self.assertEqual(event.account_id, "acc_1")
+        self.assertEqual(event.created_at, 1700000000)
+        self.assertEqual(event.payment["id"], "pay_1")
+        self.assertEqual(event.payment_link["id"], "plink_1")
+        self.assertIsNone(event.qr_code)
+
+    def test_data_is_the_delivered_event(self):
+        """The decoded event is kept as delivered, for storing it."""
+        event = RazorpayEvent.from_bytes(BODY)
+        self.assertEqual(RazorpayEvent.from_dict(event.data), event)
+
+    def test_malformed_entities_are_skipped(self):
+        """Payload members without an entity object are not entities."""
+        event = RazorpayEvent.from_dict(
+            {"event": "qr_code.credited", "payload": {"qr_code": {"entity": None}}}
+        )
+        self.assertEqual(event.entities, {})
+
+    def test_invalid_bodies(self):
+        """Anything that is not a webhook event raises ValueError."""
+        for body in (b"not json", b"[]", b'{"payload":{}}', b'{"event":1}'):
+            with self.subTest(body=body), self.assertRaises(ValueError):
+                RazorpayEvent.from_bytes(body)
@@ -0,0 +1,38 @@
+"""Tests for the generation invalidating the cached facility access."""
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from care_razorpay.utils.facility import (
+    ACCESSIBLE_FACILITIES_GENERATION_KEY,
+    get_accessible_facilities_generation,
+    invalidate_all_accessible_facilities,
+)
+
+
+class TestAccessibleFacilitiesGeneration(SimpleTestCase):
+    """Tests for `get_accessible_facilities_generation`."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_invalidation_changes_generation(self):
+        """Invalidating all entries moves to a new generation."""
+        generation = get_accessible_facilities_generation()
+        invalidate_all_accessible_facilities()
+        self.assertNotEqual(get_accessible_facilities_generation(), generation)
+
+    def test_eviction_does_not_revive_a_generation(self):
+        """An evicted generation is never reseeded to one used before."""
+        seen = {get_accessible_facilities_generation()}
+        for _ in range(3):
+            invalidate_all_accessible_facilities()
+            seen.add(get_accessible_facilities_generation())
+            cache.delete(ACCESSIBLE_FACILITIES_GENERATION_KEY)
+            self.assertNotIn(get_accessible_facilities_generation(), seen)
+
+            cache.delete(ACCESSIBLE_FACILITIES_GENERATION_KEY)
+            invalidate_all_accessible_facilities()
+            self.assertNotIn(get_accessible_facilities_generation(), seen)
+            seen.add(get_accessible_facilities_generation())
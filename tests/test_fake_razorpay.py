@@ -0,0 +1,121 @@
+"""Tests for the offline fake Razorpay server."""
+
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import razorpay
+from razorpay.errors import BadRequestError, ServerError
+
+from care_razorpay.testing.fake_razorpay import FakeRazorpayConfig, FakeRazorpayServer
+from care_razorpay.utils.signature import WebhookSignatureVerifier
+
+
+class WebhookReceiver(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.deliveries.append(
+            (self.path, body, self.headers["X-Razorpay-Signature"])
+        )
+        self.send_response(200)
+        self.end_headers()
+        self.server.delivered.set()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestFakeRazorpay(unittest.TestCase):
+    """Tests for `FakeRazorpayServer`."""
+
+    def setUp(self):
+        """Start a fake Razorpay server and a webhook receiver."""
+        self.receiver = HTTPServer(("127.0.0.1", 0), WebhookReceiver)
+        self.receiver.deliveries = []
+        self.receiver.delivered = threading.Event()
+        threading.Thread(target=self.receiver.serve_forever, daemon=True).start()
+
+        host, port = self.receiver.server_address
+        self.config = FakeRazorpayConfig(
+            webhook_url=f"http://{host}:{port}/webhook", webhook_secret="whsec_test"
+        )
+        self.server = FakeRazorpayServer(config=self.config).start()
+        self.client = razorpay.Client(
+            auth=("key", "secret"), base_url=self.server.base_url
+        )
+
+    def tearDown(self):
+        """Stop both servers."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.receiver.shutdown()
+        self.receiver.server_close()
+
+    def test_payment_link_create_and_fetch(self):
+        """Created payment links can be fetched back."""
+        payment_link = self.client.payment_link.create(
+            {"amount": 1000, "notes": {"invoice_id": "inv"}}
+        )
+        self.assertEqual(payment_link["status"], "created")
+        self.assertEqual(
+            self.client.payment_link.fetch(payment_link["id"]), payment_link
+        )
+
+    def test_unknown_entity(self):
+        """Fetching an unknown QR code is a bad request."""
+        with self.assertRaises(BadRequestError):
+            self.client.qrcode.fetch("qr_unknown")
+
+    def test_account_fetch(self):
+        """Any account id can be fetched."""
+        account = self.client.account.fetch("acc_test")
+        self.assertEqual(account["id"], "acc_test")
+
+    def test_payment_emits_signed_webhook(self):
+        """Paying a QR code delivers a signed qr_code.credited webhook."""
+        qr_code = self.client.qrcode.create(
+            {"usage": "single_use", "payment_amount": 500, "notes": {"a": "b"}}
+        )
+        self.client.post(f"/_fake/qr_codes/{qr_code['id']}/pay", {})
+
+        self.assertTrue(self.receiver.delivered.wait(5))
+        path, body, signature = self.receiver.deliveries[0]
+        self.assertEqual(path, "/webhook/")
+        self.assertTrue(
+            WebhookSignatureVerifier(["whsec_test"]).verify(body, signature)
+        )
+
+        event = json.loads(body)
+        self.assertEqual(event["event"], "qr_code.credited")
+        payment = event["payload"]["payment"]["entity"]
+        self.assertEqual(payment["amount"], 500)
+        # Only the QR code carries the notes, as on Razorpay
+        self.assertEqual(payment["notes"], [])
+        self.assertEqual(event["payload"]["qr_code"]["entity"]["notes"], {"a": "b"})
+        self.assertEqual(self.client.qrcode.fetch(qr_code["id"])["status"], "closed")
+
+        payments = self.client.qrcode.fetch_all_payments(qr_code["id"])
+        self.assertEqual([item["id"] for item in payments["items"]], [payment["id"]])
+
+    def test_payment_link_payment_carries_order(self):
+        """Payment link payments reference the order of their link."""
+        payment_link = self.client.payment_link.create({"amount": 1000})
+        event = self.client.post(f"/_fake/payment_links/{payment_link['id']}/pay", {})
+
+        payment = event["payload"]["payment"]["entity"]
+        self.assertEqual(payment["order_id"], payment_link["order_id"])
+
+    def test_error_injection(self):
+        """Injected errors surface as Razorpay server errors."""
+        self.config.error_rate = 1
+        with self.assertRaises(ServerError):
+            self.client.payment_link.create({"amount": 1000})
+
+    def test_rate_limit_injection(self):
+        """Requests over the rate limit are answered with a 429."""
+        self.config.rate_limit = 2
+        self.client.account.fetch("acc_1")
+        self.client.account.fetch("acc_2")
+        with self.assertRaises(BadRequestError):
+            self.client.account.fetch("acc_3")
@@ -0,0 +1,59 @@
+"""Query count regression tests for the shared invoice context loader."""
+
+from django.test import TestCase
+from model_bakery import baker
+from pydantic import ValidationError
+
+from care_razorpay.api.serializers.payment_link import CreatePaymentLinkRequest
+from care_razorpay.api.serializers.qr_code import CreateQRCodeRequest
+from care_razorpay.models.razorpay_account import RazorpayAccount
+from care_razorpay.utils.payloads import (
+    build_payment_link_payload,
+    build_qr_code_payload,
+)
+
+
+class TestInvoiceContextQueryCount(TestCase):
+    """Building Razorpay payloads must cost a single invoice query."""
+
+    def setUp(self):
+        """Set up an invoice whose facility has a Razorpay account."""
+        self.invoice = baker.make("emr.Invoice", total_gross=100)
+        baker.make(
+            RazorpayAccount, facility=self.invoice.facility, account_id="acc_test"
+        )
+
+    def test_payment_link_create_loads_invoice_once(self):
+        """Validating and building a payment link payload runs one query."""
+        with self.assertNumQueries(1):
+            data = CreatePaymentLinkRequest.model_validate(
+                {"invoice_id": str(self.invoice.external_id)}
+            )
+            payload = build_payment_link_payload(data.invoice, data)
+
+        self.assertEqual(
+            payload["options"]["order"]["transfers"][0]["account"], "acc_test"
+        )
+
+    def test_qr_code_create_loads_invoice_once(self):
+        """Validating and building a QR code payload runs one query."""
+        with self.assertNumQueries(1):
+            data = CreateQRCodeRequest.model_validate(
+                {
+                    "invoice_id": str(self.invoice.external_id),
+                    "usage": "single_use",
+                    "is_amount_fixed": True,
+                }
+            )
+            payload = build_qr_code_payload(data.invoice, data)
+
+        self.assertEqual(payload["notes"]["invoice_id"], str(self.invoice.external_id))
+
+    def test_unknown_invoice_is_rejected(self):
+        """An unknown invoice fails validation after a single query."""
+        with self.assertNumQueries(1), self.assertRaises(ValidationError) as context:
+            CreatePaymentLinkRequest.model_validate(
+                {"invoice_id": "5b9b4d2e-4a7c-4b8e-9d3f-0c6a2f1e8b7d"}
+            )
+
+        self.assertEqual(context.exception.errors()[0]["loc"], ("invoice_id",))
@@ -0,0 +1,150 @@
+"""Tests for the Razorpay call and webhook metrics."""
+
+import unittest
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from care_razorpay.api.viewsets.metrics import MetricsViewSet
+from care_razorpay.utils.circuit_breaker import CircuitOpen
+from care_razorpay.utils.metrics import get_razorpay_operation, get_status_outcome
+from care_razorpay.utils.rate_limit import RateLimitExceeded
+from care_razorpay.utils.razorpay import InstrumentedSession
+from tests.helpers import plugin_configs
+
+TOKEN = "metrics-token"
+
+
+class TestOperations(unittest.TestCase):
+    """Tests for `get_razorpay_operation` and `get_status_outcome`."""
+
+    def test_razorpay_operation(self):
+        cases = {
+            (
+                "POST",
+                "https://api.razorpay.com/v1/payment_links",
+            ): "payment_link.create",
+            ("GET", "/v1/payment_links/plink_1"): "payment_link.fetch",
+            ("POST", "/v1/payments/qr_codes"): "qrcode.create",
+            ("GET", "/v2/accounts/acc_1"): "account.fetch",
+            ("get", "/v1/payments"): "default.fetch",
+            ("PATCH", "/v1/payment_links/plink_1"): "payment_link.patch",
+        }
+        for (method, url), operation in cases.items():
+            with self.subTest(method=method, url=url):
+                self.assertEqual(get_razorpay_operation(method, url), operation)
+
+    def test_status_outcome(self):
+        cases = {
+            200: "success",
+            204: "success",
+            302: "success",
+            400: "client_error",
+            404: "client_error",
+            429: "rate_limited",
+            500: "server_error",
+            503: "server_error",
+        }
+        for status_code, outcome in cases.items():
+            with self.subTest(status_code=status_code):
+                self.assertEqual(get_status_outcome(status_code), outcome)
+
+
+class TestInstrumentedSession(unittest.TestCase):
+    """Every call is observed with the outcome of the request."""
+
+    def setUp(self):
+        """Stub the layers below the instrumentation."""
+        patcher = mock.patch(
+            "care_razorpay.utils.razorpay.CircuitBreakerSession.request"
+        )
+        self.request = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch("care_razorpay.utils.razorpay.observe_razorpay_call")
+        self.observe = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.session = InstrumentedSession(timeout=(1, 1))
+
+    def call(self):
+        return self.session.request("GET", "https://api.razorpay.com/v2/accounts/acc_1")
+
+    def assert_observed(self, outcome):
+        self.observe.assert_called_once()
+        operation, observed_outcome, duration = self.observe.call_args[0]
+        self.assertEqual(operation, "account.fetch")
+        self.assertEqual(observed_outcome, outcome)
+        self.assertGreaterEqual(duration, 0)
+
+    def test_response_outcomes(self):
+        for status_code, outcome in ((200, "success"), (429, "rate_limited")):
+            with self.subTest(status_code=status_code):
+                self.observe.reset_mock()
+                self.request.return_value = mock.Mock(status_code=status_code)
+                self.assertIs(self.call(), self.request.return_value)
+                self.assert_observed(outcome)
+
+    def test_exception_outcomes(self):
+        cases = (
+            (RateLimitExceeded("Razorpay rate limit exceeded"), "rate_limited"),
+            (CircuitOpen(), "circuit_open"),
+            (requests.ConnectionError(), "error"),
+        )
+        for error, outcome in cases:
+            with self.subTest(outcome=outcome):
+                self.observe.reset_mock()
+                self.request.side_effect = error
+                with self.assertRaises(type(error)):
+                    self.call()
+                self.assert_observed(outcome)
+
+
+class TestMetricsViewSet(SimpleTestCase):
+    """Tests for `MetricsViewSet`."""
+
+    def get(self, token=TOKEN):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+        request = APIRequestFactory().get("/metrics/", **headers)
+        return MetricsViewSet.as_view({"get": "list"})(request)
+
+    @override_settings(
+        PLUGIN_CONFIGS=plugin_configs(
+            RAZORPAY_METRICS_TOKEN=TOKEN, RAZORPAY_METRICS_ENABLED=False
+        )
+    )
+    def test_disabled(self):
+        self.assertEqual(self.get().status_code, 404)
+
+    @override_settings(
+        PLUGIN_CONFIGS=plugin_configs(
+            RAZORPAY_METRICS_TOKEN=TOKEN, RAZORPAY_METRICS_ENABLED=True
+        )
+    )
+    def test_requires_token(self):
+        self.assertEqual(self.get(token=None).status_code, 403)
+        self.assertEqual(self.get(token="wrong").status_code, 403)
+
+    @override_settings(
+        PLUGIN_CONFIGS=plugin_configs(
+            RAZORPAY_METRICS_ENABLED=True, RAZORPAY_METRICS_TOKEN=""
+        )
+    )
+    def test_denied_without_configured_token(self):
+        self.assertEqual(self.get(token="").status_code, 403)
+        self.assertEqual(self.get(token=" ").status_code, 403)
+
+    @override_settings(
+        PLUGIN_CONFIGS=plugin_configs(
+            RAZORPAY_METRICS_TOKEN=TOKEN, RAZORPAY_METRICS_ENABLED=True
+        )
+    )
+    def test_export(self):
+        with mock.patch("care_razorpay.api.viewsets.metrics.get_metrics") as metrics:
+            metrics.return_value.export.return_value = b"# metrics\n"
+            response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"# metrics\n")
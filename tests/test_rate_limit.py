@@ -0,0 +1,164 @@
+"""Tests for the Razorpay rate limiters."""
+
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from care_razorpay.utils.rate_limit import (
+    REDIS_RETRY_INTERVAL,
+    TOKEN_BUCKET_SCRIPT,
+    RateLimitExceeded,
+    RedisTokenBucket,
+    TokenBucket,
+    get_rate_limit_family,
+)
+from tests.helpers import patch_clock
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Tests for `TokenBucket`."""
+
+    def setUp(self):
+        """Run the bucket on a clock the tests control."""
+        patch_clock(self, "care_razorpay.utils.rate_limit")
+
+    def test_burst_up_to_capacity(self):
+        """A full bucket allows `capacity` calls at once."""
+        bucket = TokenBucket(rate=2, capacity=3)
+        self.assertEqual([bucket.try_acquire() for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(bucket.try_acquire(), 0.5)
+
+    def test_refills_at_rate(self):
+        """Tokens come back at `rate` per second, up to `capacity`."""
+        bucket = TokenBucket(rate=2)
+        bucket.try_acquire()
+        bucket.try_acquire()
+
+        self.now += 0.5
+        self.assertEqual(bucket.try_acquire(), 0)
+        self.assertAlmostEqual(bucket.try_acquire(), 0.5)
+
+        self.now += 60
+        self.assertEqual([bucket.try_acquire() for _ in range(2)], [0, 0])
+        self.assertGreater(bucket.try_acquire(), 0)
+
+    def test_acquire_waits_for_a_token(self):
+        """`acquire` sleeps until the next token is available."""
+        bucket = TokenBucket(rate=1)
+        bucket.try_acquire()
+
+        def sleep(seconds):
+            self.now += seconds
+
+        with mock.patch("care_razorpay.utils.rate_limit.time.sleep", sleep):
+            bucket.acquire(timeout=5)
+        self.assertEqual(self.now, 1001.0)
+
+    def test_acquire_times_out(self):
+        """`acquire` gives up once `timeout` seconds have passed."""
+        bucket = TokenBucket(rate=0.1)
+        bucket.try_acquire()
+
+        def sleep(seconds):
+            self.now += seconds
+
+        with mock.patch("care_razorpay.utils.rate_limit.time.sleep", sleep):
+            with self.assertRaises(RateLimitExceeded):
+                bucket.acquire(timeout=2)
+        self.assertEqual(self.now, 1002.0)
+
+
+class TestRedisTokenBucket(unittest.TestCase):
+    """Tests for `RedisTokenBucket`."""
+
+    def setUp(self):
+        """Run the bucket on a clock the tests control."""
+        patch_clock(self, "care_razorpay.utils.rate_limit")
+
+    def patch_client(self, client):
+        patcher = mock.patch(
+            "care_razorpay.utils.rate_limit.get_redis_client", return_value=client
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_uses_shared_bucket(self):
+        """The budget is taken from the Lua token bucket in Redis."""
+        script = mock.Mock(side_effect=["0", "0.25"])
+        client = mock.Mock()
+        client.register_script.return_value = script
+        self.patch_client(client)
+
+        bucket = RedisTokenBucket("rate_limit:test", rate=4)
+        self.assertEqual(bucket.try_acquire(), 0)
+        self.assertEqual(bucket.try_acquire(), 0.25)
+
+        client.register_script.assert_called_once_with(TOKEN_BUCKET_SCRIPT)
+        script.assert_called_with(keys=["rate_limit:test"], args=[4, 4])
+        # The local bucket is left untouched
+        self.assertEqual(bucket.tokens, 4)
+
+    def test_falls_back_while_redis_fails(self):
+        """A Redis error switches to the local bucket until the retry interval."""
+        script = mock.Mock(side_effect=ConnectionError("Redis is down"))
+        client = mock.Mock()
+        client.register_script.return_value = script
+        self.patch_client(client)
+
+        bucket = RedisTokenBucket("rate_limit:test", rate=1)
+        with self.assertLogs("care_razorpay.utils.rate_limit", "WARNING"):
+            self.assertEqual(bucket.try_acquire(), 0)
+        self.assertAlmostEqual(bucket.try_acquire(), 1)
+        self.assertEqual(script.call_count, 1)
+
+        self.now += REDIS_RETRY_INTERVAL
+        script.side_effect = None
+        script.return_value = "0"
+        self.assertEqual(bucket.try_acquire(), 0)
+        self.assertEqual(script.call_count, 2)
+
+    def test_aacquire_calls_redis_off_the_event_loop(self):
+        """`aacquire` runs the synchronous Redis call in a worker thread."""
+        threads = []
+
+        def script(keys, args):
+            threads.append(threading.get_ident())
+            return "0"
+
+        client = mock.Mock()
+        client.register_script.return_value = script
+        self.patch_client(client)
+
+        async def acquire():
+            await RedisTokenBucket("rate_limit:test", rate=1).aacquire(timeout=1)
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(acquire())
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], loop_thread)
+
+    def test_local_bucket_without_redis(self):
+        """Without a Redis backed cache, only the local bucket is used."""
+        self.patch_client(None)
+
+        bucket = RedisTokenBucket("rate_limit:test", rate=1)
+        self.assertEqual(bucket.try_acquire(), 0)
+        self.assertAlmostEqual(bucket.try_acquire(), 1)
+
+
+class TestGetRateLimitFamily(unittest.TestCase):
+    """Tests for `get_rate_limit_family`."""
+
+    def test_families(self):
+        cases = {
+            "https://api.razorpay.com/v1/payment_links/plink_1": "payment_link",
+            "https://api.razorpay.com/v1/payment_links": "payment_link",
+            "/v1/payments/qr_codes/qr_1": "qrcode",
+            "/v2/accounts/acc_1": "account",
+            "/v1/payments/pay_1": "default",
+            "/v1/invoices": "default",
+        }
+        for url, family in cases.items():
+            with self.subTest(url=url):
+                self.assertEqual(get_rate_limit_family(url), family)
@@ -0,0 +1,64 @@
+"""Tests for the coalescing of account rebalances."""
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from care_razorpay.settings import plugin_settings
+from care_razorpay.tasks.rebalance import (
+    get_rebalance_metrics,
+    rebalance_account_coalesced_task,
+    schedule_account_rebalance,
+)
+
+
+class TestRebalanceCoalescing(SimpleTestCase):
+    """Tests for `schedule_account_rebalance`."""
+
+    def setUp(self):
+        """Start from an empty cache and capture dispatched tasks."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        patcher = mock.patch.object(rebalance_account_coalesced_task, "apply_async")
+        self.apply_async = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch("care_razorpay.tasks.rebalance.rebalance_account_task")
+        self.rebalance_account_task = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_triggers_within_window_are_merged(self):
+        """Several requests for an account within the window rebalance once."""
+        for _ in range(5):
+            schedule_account_rebalance(1)
+
+        self.apply_async.assert_called_once_with(
+            (1,), countdown=plugin_settings.RAZORPAY_REBALANCE_WINDOW
+        )
+        self.assertEqual(
+            get_rebalance_metrics(), {"requested": 5, "merged": 4, "dispatched": 0}
+        )
+
+        rebalance_account_coalesced_task(1)
+        self.rebalance_account_task.assert_called_once_with(1)
+        self.assertEqual(get_rebalance_metrics()["dispatched"], 1)
+
+    def test_accounts_are_coalesced_separately(self):
+        """Requests for different accounts are not merged."""
+        schedule_account_rebalance(1)
+        schedule_account_rebalance(2)
+        schedule_account_rebalance(1)
+
+        self.assertEqual(
+            [call.args[0] for call in self.apply_async.call_args_list], [(1,), (2,)]
+        )
+
+    def test_request_after_dispatch_schedules_again(self):
+        """A request arriving once the rebalance started is not merged into it."""
+        schedule_account_rebalance(1)
+        rebalance_account_coalesced_task(1)
+        schedule_account_rebalance(1)
+
+        self.assertEqual(self.apply_async.call_count, 2)
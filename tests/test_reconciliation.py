@@ -0,0 +1,108 @@
+"""Tests for the sweep recording Razorpay payments missed by the webhooks."""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from model_bakery import baker
+
+from care.emr.models.payment_reconciliation import PaymentReconciliation
+from care_razorpay.models.payment_link import RazorpayPaymentLink
+from care_razorpay.models.qr_code import RazorpayQRCode
+from care_razorpay.utils.reconciliation import reconcile_missed_payments
+
+
+def make_payment(payment_id, **fields):
+    return {
+        "id": payment_id,
+        "entity": "payment",
+        "amount": 10000,
+        "status": "captured",
+        "notes": [],
+        "created_at": int(timezone.now().timestamp()),
+        **fields,
+    }
+
+
+class TestReconcileMissedPayments(TestCase):
+    """Tests for `reconcile_missed_payments`."""
+
+    def setUp(self):
+        """Set up invoices paid through a payment link and a QR code."""
+        self.end = timezone.now() + timedelta(minutes=1)
+        self.start = self.end - timedelta(hours=1)
+
+        self.link_invoice = baker.make("emr.Invoice", total_gross=100)
+        baker.make(
+            RazorpayPaymentLink,
+            razorpay_id="plink_1",
+            invoice_external_id=self.link_invoice.external_id,
+            facility=self.link_invoice.facility,
+            status="created",
+            amount=100,
+            metadata={"id": "plink_1", "order_id": "order_1"},
+        )
+        self.qr_invoice = baker.make("emr.Invoice", total_gross=100)
+        baker.make(
+            RazorpayQRCode,
+            razorpay_id="qr_1",
+            invoice_external_id=self.qr_invoice.external_id,
+            facility=self.qr_invoice.facility,
+            status="active",
+        )
+
+        patcher = mock.patch("care_razorpay.utils.reconciliation.razorpay_client")
+        self.client = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client.qrcode.fetch_all_payments.return_value = {
+            "items": [make_payment("pay_qr")]
+        }
+
+    def sweep(self, *payments):
+        self.client.payment.all.return_value = {"items": list(payments)}
+        return reconcile_missed_payments(self.start, self.end)
+
+    def get_invoice_ids(self):
+        return dict(
+            PaymentReconciliation.objects.values_list(
+                "reference_number", "target_invoice_id"
+            )
+        )
+
+    def test_payments_without_notes_are_resolved(self):
+        """QR code payments and link payments without notes are recorded."""
+        stats = self.sweep(
+            make_payment("pay_qr"), make_payment("pay_link", order_id="order_1")
+        )
+
+        self.assertEqual(stats["recorded"], 2)
+        self.assertEqual(stats["unmatched"], 0)
+        self.assertEqual(
+            self.get_invoice_ids(),
+            {"pay_qr": self.qr_invoice.id, "pay_link": self.link_invoice.id},
+        )
+        self.client.qrcode.fetch_all_payments.assert_called_once()
+        self.assertEqual(self.client.qrcode.fetch_all_payments.call_args[0][0], "qr_1")
+
+    def test_payment_with_notes_skips_qr_code_lookup(self):
+        """Payments carrying the invoice in their notes need no lookup."""
+        stats = self.sweep(
+            make_payment(
+                "pay_notes", notes={"invoice_id": str(self.link_invoice.external_id)}
+            )
+        )
+
+        self.assertEqual(stats["recorded"], 1)
+        self.client.qrcode.fetch_all_payments.assert_not_called()
+
+    def test_unresolved_payment_is_unmatched(self):
+        """Captured payments without a resolvable invoice are counted."""
+        stats = self.sweep(
+            make_payment("pay_other"), make_payment("pay_failed", status="failed")
+        )
+
+        self.assertEqual(
+            stats, {"seen": 2, "recorded": 0, "skipped": 0, "unmatched": 1}
+        )
+        self.assertFalse(PaymentReconciliation.objects.exists())
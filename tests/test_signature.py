@@ -0,0 +1,109 @@
+"""Tests for the webhook signature verifier."""
+
+import hashlib
+import hmac
+import unittest
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.exceptions import AuthenticationFailed
+
+from care_razorpay.api.authentication import (
+    RazorpayWebhookAuthentication,
+    get_webhook_secrets,
+)
+from care_razorpay.utils.signature import WebhookSignatureVerifier
+from tests.helpers import plugin_configs
+
+BODY = b'{"event":"payment_link.paid","payload":{}}'
+
+SECRET = "whsec_current"
+PREVIOUS_SECRET = "whsec_previous"
+
+
+def sign(body, secret):
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+class TestWebhookSignatureVerifier(unittest.TestCase):
+    """Tests for `WebhookSignatureVerifier`."""
+
+    def test_valid_signature(self):
+        """A body signed with the secret is accepted."""
+        verifier = WebhookSignatureVerifier([SECRET])
+        self.assertTrue(verifier.verify(BODY, sign(BODY, SECRET)))
+
+    def test_verifier_is_reusable(self):
+        """The precomputed key state is not consumed by a verification."""
+        verifier = WebhookSignatureVerifier([SECRET])
+        other = b'{"event":"qr_code.credited"}'
+        self.assertTrue(verifier.verify(BODY, sign(BODY, SECRET)))
+        self.assertTrue(verifier.verify(other, sign(other, SECRET)))
+
+    def test_rotated_secrets(self):
+        """Bodies signed with any of the active secrets are accepted."""
+        verifier = WebhookSignatureVerifier([SECRET, PREVIOUS_SECRET])
+        self.assertTrue(verifier.verify(BODY, sign(BODY, SECRET)))
+        self.assertTrue(verifier.verify(BODY, sign(BODY, PREVIOUS_SECRET)))
+        self.assertFalse(verifier.verify(BODY, sign(BODY, "whsec_retired")))
+
+    def test_tampered_body(self):
+        """A signature does not verify a different body."""
+        verifier = WebhookSignatureVerifier([SECRET])
+        self.assertFalse(verifier.verify(BODY + b" ", sign(BODY, SECRET)))
+
+    def test_malformed_signature(self):
+        """Signatures that are not hex digests are rejected."""
+        verifier = WebhookSignatureVerifier([SECRET])
+        self.assertFalse(verifier.verify(BODY, "not-a-signature"))
+        self.assertFalse(verifier.verify(BODY, ""))
+
+    def test_requires_a_secret(self):
+        """At least one secret is required."""
+        with self.assertRaises(ValueError):
+            WebhookSignatureVerifier([])
+
+    def test_rejects_short_secrets(self):
+        """Empty or short secrets are rejected rather than used as keys."""
+        for secret in ("", "w", "short"):
+            with self.subTest(secret=secret), self.assertRaises(ValueError):
+                WebhookSignatureVerifier([SECRET, secret])
+
+
+class TestWebhookSecrets(SimpleTestCase):
+    """Tests for `get_webhook_secrets` and `RazorpayWebhookAuthentication`."""
+
+    def authenticate(self, secret):
+        request = SimpleNamespace(
+            body=BODY, META={"HTTP_X_RAZORPAY_SIGNATURE": sign(BODY, secret)}
+        )
+        return RazorpayWebhookAuthentication().authenticate(request)
+
+    @override_settings(PLUGIN_CONFIGS=plugin_configs(RAZORPAY_WEBHOOK_SECRET=SECRET))
+    def test_primary_secret_only(self):
+        self.assertEqual(get_webhook_secrets(), (SECRET,))
+
+    @override_settings(
+        PLUGIN_CONFIGS=plugin_configs(
+            RAZORPAY_WEBHOOK_SECRET=SECRET,
+            RAZORPAY_WEBHOOK_SECRETS=[PREVIOUS_SECRET, " ", ""],
+        )
+    )
+    def test_list_setting(self):
+        self.assertEqual(get_webhook_secrets(), (SECRET, PREVIOUS_SECRET))
+
+    @override_settings(
+        PLUGIN_CONFIGS=plugin_configs(
+            RAZORPAY_WEBHOOK_SECRET=SECRET,
+            RAZORPAY_WEBHOOK_SECRETS=f" {PREVIOUS_SECRET}, ,whsec_older,",
+        )
+    )
+    def test_string_setting_is_split_on_commas(self):
+        """A string is a comma separated list, not a sequence of characters."""
+        self.assertEqual(
+            get_webhook_secrets(), (SECRET, PREVIOUS_SECRET, "whsec_older")
+        )
+
+        self.assertIsNotNone(self.authenticate(PREVIOUS_SECRET))
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(PREVIOUS_SECRET[0])
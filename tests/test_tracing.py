@@ -0,0 +1,98 @@
+"""Tests for request tracing and the slow-call breakdown."""
+
+import json
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from care_razorpay.utils import tracing
+from care_razorpay.utils.tracing import NOOP_SPAN, span, trace_request
+
+LOG_PREFIX = "Slow Razorpay plugin call: "
+
+
+class TestTracing(unittest.TestCase):
+    """Tests for `span` and `trace_request`."""
+
+    def configure(self, tracing_enabled=False, threshold=0.0):
+        patcher = mock.patch.object(
+            tracing,
+            "plugin_settings",
+            SimpleNamespace(
+                RAZORPAY_TRACING_ENABLED=tracing_enabled,
+                RAZORPAY_SLOW_CALL_LOG_THRESHOLD=threshold,
+            ),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_breakdown(self, logs):
+        (message,) = logs.output
+        return json.loads(message.split(LOG_PREFIX, 1)[1])
+
+    def test_shared_noop_when_disabled(self):
+        """Without tracing or a threshold, spans cost a shared no-op."""
+        self.configure()
+        with trace_request("test.request") as request:
+            self.assertIs(request.span, NOOP_SPAN)
+            self.assertIs(span("validation"), NOOP_SPAN)
+            self.assertIsNone(tracing._current_trace.get())
+
+    def test_breakdown_of_nested_stages(self):
+        """Stages are logged with their path below the root span."""
+        self.configure(threshold=1e-9)
+        with self.assertLogs("care_razorpay.utils.tracing", "WARNING") as logs:
+            with trace_request("payment_link.create"):
+                with span("validation"):
+                    with span("invoice_fetch"):
+                        pass
+                with span("build_payload"):
+                    pass
+
+        breakdown = self.get_breakdown(logs)
+        self.assertEqual(breakdown["name"], "payment_link.create")
+        self.assertEqual(
+            [stage["name"] for stage in breakdown["stages"]],
+            ["validation > invoice_fetch", "validation", "build_payload"],
+        )
+        for stage in breakdown["stages"]:
+            self.assertLessEqual(stage["duration"], breakdown["duration"])
+
+    def test_fast_requests_are_not_logged(self):
+        """Requests under the threshold log nothing."""
+        self.configure(threshold=60)
+        with self.assertNoLogs("care_razorpay.utils.tracing"):
+            with trace_request("payment_link.create"):
+                with span("validation"):
+                    pass
+
+    def test_trace_is_reset(self):
+        """The current trace is reset on exit, also after an error."""
+        self.configure(threshold=60)
+        with trace_request("outer") as outer:
+            with self.assertRaises(ValueError):
+                with trace_request("inner") as inner:
+                    self.assertIs(tracing._current_trace.get(), inner.trace)
+                    raise ValueError
+            self.assertIs(tracing._current_trace.get(), outer.trace)
+        self.assertIsNone(tracing._current_trace.get())
+
+        # Spans outside of any request are no-ops again
+        self.assertIs(span("validation"), NOOP_SPAN)
+
+    def test_opentelemetry_spans(self):
+        """With tracing enabled, every span starts an OpenTelemetry span."""
+        self.configure(tracing_enabled=True)
+        tracer = mock.MagicMock()
+        with mock.patch.object(tracing, "get_tracer", return_value=tracer):
+            with trace_request("payment_link.create", method="POST"):
+                with span("validation"):
+                    pass
+
+        self.assertEqual(
+            tracer.start_as_current_span.call_args_list,
+            [
+                mock.call("payment_link.create", attributes={"method": "POST"}),
+                mock.call("validation", attributes={}),
+            ],
+        )
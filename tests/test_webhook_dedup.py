@@ -0,0 +1,94 @@
+"""Tests for the webhook events acknowledged without being stored."""
+
+import hashlib
+import hmac
+import json
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from care_razorpay.api.viewsets.webhook import WebhookViewSet
+from care_razorpay.models.webhook_event import WebhookEvent
+from care_razorpay.utils.signature import WebhookSignatureVerifier
+from tests.helpers import forget_seen
+
+SECRET = "whsec_test"
+
+EVENT = {
+    "event": "payment_link.paid",
+    "account_id": "acc_test",
+    "payload": {
+        "payment_link": {"entity": {"id": "plink_1", "notes": {"invoice_id": "inv"}}},
+        "payment": {"entity": {"id": "pay_1", "amount": 10000}},
+    },
+}
+
+
+class TestWebhookDedup(TestCase):
+    """Redelivered and unhandled events are acknowledged but not stored."""
+
+    def setUp(self):
+        """Verify signatures with a test secret and forget seen events."""
+        patcher = mock.patch(
+            "care_razorpay.api.authentication.get_webhook_signature_verifier",
+            return_value=WebhookSignatureVerifier([SECRET]),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch("care_razorpay.api.viewsets.webhook.schedule_webhook_lane")
+        self.schedule_webhook_lane = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        forget_seen()
+        self.addCleanup(forget_seen)
+
+    def deliver(self, event_id="evt_1", event=EVENT):
+        body = json.dumps(event).encode()
+        request = APIRequestFactory().post(
+            "/webhook/",
+            body,
+            content_type="application/json",
+            HTTP_X_RAZORPAY_EVENT_ID=event_id,
+            HTTP_X_RAZORPAY_SIGNATURE=hmac.new(
+                SECRET.encode(), body, hashlib.sha256
+            ).hexdigest(),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = WebhookViewSet.as_view({"post": "create"})(request)
+        self.assertEqual(response.status_code, 200)
+
+    def test_redelivery_is_dropped_by_seen_filter(self):
+        """A redelivery seen recently never reaches the inbox table."""
+        self.deliver()
+        with self.assertNumQueries(0):
+            self.deliver()
+
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+        self.schedule_webhook_lane.assert_called_once()
+
+    def test_redelivery_is_dropped_by_unique_event_id(self):
+        """Without the seen filter, the unique event id still drops it."""
+        self.deliver()
+        forget_seen()
+        self.deliver()
+
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+        self.schedule_webhook_lane.assert_called_once()
+
+    def test_distinct_events_are_stored(self):
+        """Events with different ids are both stored."""
+        self.deliver("evt_1")
+        self.deliver("evt_2")
+
+        self.assertEqual(WebhookEvent.objects.count(), 2)
+        self.assertEqual(self.schedule_webhook_lane.call_count, 2)
+
+    def test_unhandled_event_type_skips_the_database(self):
+        """Event types without a handler are dropped before any query."""
+        with self.assertNumQueries(0):
+            self.deliver(event={"event": "order.paid", "payload": {}})
+
+        self.assertFalse(WebhookEvent.objects.exists())
+        self.schedule_webhook_lane.assert_not_called()
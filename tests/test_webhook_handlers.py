@@ -0,0 +1,123 @@
+"""Tests for the webhook handlers recording payments and refunds."""
+
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from model_bakery import baker
+
+from care.emr.models.payment_reconciliation import PaymentReconciliation
+from care_razorpay.models.webhook_event import WebhookEvent, WebhookEventStatus
+from care_razorpay.utils.webhook import process_webhook_event
+from tests.helpers import forget_seen
+
+
+class TestWebhookHandlers(TestCase):
+    """Payments and refunds are recorded exactly once."""
+
+    def setUp(self):
+        """Set up an invoice and forget recently seen payments."""
+        self.invoice = baker.make("emr.Invoice", total_gross=100)
+        self.notes = {"invoice_id": str(self.invoice.external_id)}
+        self.created_at = int(timezone.now().timestamp())
+
+        forget_seen()
+        self.addCleanup(forget_seen)
+
+        patcher = mock.patch("care_razorpay.utils.webhook.schedule_account_rebalance")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def apply(self, event, **entities):
+        webhook_event = WebhookEvent.objects.create(
+            event_id=f"evt_{WebhookEvent.objects.count()}",
+            event=event,
+            payload={
+                "event": event,
+                "payload": {
+                    name: {"entity": entity} for name, entity in entities.items()
+                },
+            },
+        )
+        process_webhook_event(webhook_event)
+        webhook_event.refresh_from_db()
+        return webhook_event
+
+    def make_payment(self, **fields):
+        return {
+            "id": "pay_1",
+            "entity": "payment",
+            "amount": 10000,
+            "status": "captured",
+            "notes": self.notes,
+            "created_at": self.created_at,
+            **fields,
+        }
+
+    def make_refund(self):
+        return {
+            "id": "rfnd_1",
+            "entity": "refund",
+            "amount": 4000,
+            "payment_id": "pay_1",
+            "created_at": self.created_at,
+        }
+
+    def pay_payment_link(self):
+        return self.apply(
+            "payment_link.paid",
+            payment_link={"id": "plink_1", "status": "paid", "notes": self.notes},
+            payment=self.make_payment(),
+        )
+
+    def test_payment_captured_and_payment_link_paid_record_once(self):
+        """Both events of a payment result in a single reconciliation."""
+        captured = self.apply("payment.captured", payment=self.make_payment())
+        paid = self.pay_payment_link()
+
+        self.assertEqual(captured.status, WebhookEventStatus.PROCESSED)
+        self.assertEqual(paid.status, WebhookEventStatus.PROCESSED)
+        payment_reconciliation = PaymentReconciliation.objects.get()
+        self.assertEqual(payment_reconciliation.reference_number, "pay_1")
+        self.assertEqual(payment_reconciliation.target_invoice, self.invoice)
+        self.assertEqual(payment_reconciliation.amount, 100)
+
+    def test_payment_captured_without_invoice_is_ignored(self):
+        """Payments made outside the plugin are not recorded."""
+        webhook_event = self.apply(
+            "payment.captured", payment=self.make_payment(notes=[])
+        )
+
+        self.assertEqual(webhook_event.status, WebhookEventStatus.PROCESSED)
+        self.assertFalse(PaymentReconciliation.objects.exists())
+
+    def test_refund_is_recorded_once(self):
+        """A refund is a single credit note against the payment's invoice."""
+        self.pay_payment_link()
+        self.apply("refund.processed", refund=self.make_refund())
+        self.apply("refund.processed", refund=self.make_refund())
+
+        credit_note = PaymentReconciliation.objects.get(is_credit_note=True)
+        self.assertEqual(credit_note.reference_number, "rfnd_1")
+        self.assertEqual(credit_note.target_invoice, self.invoice)
+        self.assertEqual(credit_note.amount, 40)
+        self.assertEqual(PaymentReconciliation.objects.count(), 2)
+
+    def test_refund_waits_for_its_payment(self):
+        """A refund of an unrecorded payment is retried until it is recorded."""
+        refund = self.apply("refund.processed", refund=self.make_refund())
+
+        self.assertEqual(refund.status, WebhookEventStatus.PENDING)
+        self.assertEqual(refund.last_error, "Refunded payment not recorded")
+        self.assertFalse(PaymentReconciliation.objects.exists())
+
+        self.pay_payment_link()
+        process_webhook_event(refund)
+        refund.refresh_from_db()
+
+        self.assertEqual(refund.status, WebhookEventStatus.PROCESSED)
+        self.assertTrue(
+            PaymentReconciliation.objects.filter(
+                reference_number="rfnd_1", is_credit_note=True
+            ).exists()
+        )
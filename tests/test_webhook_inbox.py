@@ -0,0 +1,105 @@
+"""Tests for the retries and dead-lettering of the webhook inbox."""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from care_razorpay.models.webhook_event import WebhookEvent, WebhookEventStatus
+from care_razorpay.settings import plugin_settings
+from care_razorpay.tasks.webhook import replay_dead_webhook_events
+from care_razorpay.utils.webhook import process_webhook_event
+from tests.helpers import patch_webhook_handlers
+
+
+class TestWebhookInbox(TestCase):
+    """Tests for `process_webhook_event` and `replay_dead_webhook_events`."""
+
+    def setUp(self):
+        """Route a test event type to a handler that fails until told not to."""
+        self.failing = True
+        self.applied = 0
+
+        def handler(event):
+            if self.failing:
+                raise ValueError("Invoice not found")
+            self.applied += 1
+
+        patch_webhook_handlers(self, {"test.event": handler})
+
+        self.webhook_event = WebhookEvent.objects.create(
+            event_id="evt_1", event="test.event", payload={"event": "test.event"}
+        )
+
+    def process(self):
+        process_webhook_event(self.webhook_event)
+        self.webhook_event.refresh_from_db()
+
+    def test_failure_is_retried_with_backoff(self):
+        """A failed event stays pending with an exponentially later retry."""
+        delay = plugin_settings.RAZORPAY_WEBHOOK_RETRY_DELAY
+        for attempt in (1, 2):
+            started_at = timezone.now()
+            self.process()
+
+            self.assertEqual(self.webhook_event.status, WebhookEventStatus.PENDING)
+            self.assertEqual(self.webhook_event.attempts, attempt)
+            self.assertEqual(self.webhook_event.last_error, "Invoice not found")
+            self.assertGreaterEqual(
+                self.webhook_event.next_attempt_at,
+                started_at + timedelta(seconds=delay * 2 ** (attempt - 1)),
+            )
+
+        self.failing = False
+        self.process()
+        self.assertEqual(self.webhook_event.status, WebhookEventStatus.PROCESSED)
+        self.assertEqual(self.webhook_event.last_error, "")
+        self.assertIsNotNone(self.webhook_event.processed_at)
+        self.assertEqual(self.applied, 1)
+
+    def test_dead_lettered_after_max_attempts(self):
+        """An event failing every attempt is dead-lettered."""
+        max_attempts = plugin_settings.RAZORPAY_WEBHOOK_MAX_ATTEMPTS
+        for _ in range(max_attempts - 1):
+            self.process()
+            self.assertEqual(self.webhook_event.status, WebhookEventStatus.PENDING)
+
+        with self.assertLogs("care_razorpay.utils.webhook", "ERROR"):
+            self.process()
+        self.assertEqual(self.webhook_event.status, WebhookEventStatus.DEAD)
+        self.assertEqual(self.webhook_event.attempts, max_attempts)
+
+    def test_replay_dead_lettered_event(self):
+        """A replayed event gets a fresh attempt budget and is applied."""
+        self.webhook_event.status = WebhookEventStatus.DEAD.value
+        self.webhook_event.attempts = plugin_settings.RAZORPAY_WEBHOOK_MAX_ATTEMPTS
+        self.webhook_event.save()
+        other = WebhookEvent.objects.create(
+            event_id="evt_2",
+            event="test.event",
+            status=WebhookEventStatus.DEAD.value,
+            lane=self.webhook_event.lane + 1,
+        )
+
+        with (
+            mock.patch(
+                "care_razorpay.tasks.webhook.schedule_webhook_lane"
+            ) as schedule_webhook_lane,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            replayed = replay_dead_webhook_events([str(self.webhook_event.external_id)])
+
+        self.assertEqual(replayed, 1)
+        schedule_webhook_lane.assert_called_once_with(self.webhook_event.lane)
+        other.refresh_from_db()
+        self.assertEqual(other.status, WebhookEventStatus.DEAD)
+
+        self.webhook_event.refresh_from_db()
+        self.assertEqual(self.webhook_event.status, WebhookEventStatus.PENDING)
+        self.assertEqual(self.webhook_event.attempts, 0)
+
+        self.failing = False
+        self.process()
+        self.assertEqual(self.webhook_event.status, WebhookEventStatus.PROCESSED)
+        self.assertEqual(self.applied, 1)
@@ -0,0 +1,111 @@
+"""Tests for the ordered, partitioned processing of the webhook inbox."""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from care_razorpay.models.webhook_event import WebhookEvent, WebhookEventStatus
+from care_razorpay.utils.lock import CacheLock
+from care_razorpay.utils.webhook import (
+    WEBHOOK_LANE_LOCK_KEY,
+    WEBHOOK_LANE_LOCK_TIMEOUT,
+    drain_webhook_lane,
+)
+from tests.helpers import patch_webhook_handlers
+
+LANE = 3
+
+
+class TestWebhookLanes(TestCase):
+    """Tests for `drain_webhook_lane`."""
+
+    def setUp(self):
+        """Route a test event type to a handler recording what it applied."""
+        self.applied = []
+        self.failing = set()
+
+        def handler(event):
+            sequence = event.data["sequence"]
+            if sequence in self.failing:
+                raise ValueError("Not yet")
+            self.applied.append(sequence)
+
+        patch_webhook_handlers(self, {"test.event": handler})
+
+    def make_event(self, sequence, partition_key="invoice:a", lane=LANE):
+        return WebhookEvent.objects.create(
+            event_id=f"evt_{sequence}",
+            event="test.event",
+            payload={"event": "test.event", "sequence": sequence},
+            partition_key=partition_key,
+            lane=lane,
+        )
+
+    def test_partition_is_applied_in_order(self):
+        """Events of a partition are applied in the order they arrived."""
+        for sequence in range(5):
+            self.make_event(sequence)
+
+        self.assertEqual(drain_webhook_lane(LANE), 5)
+        self.assertEqual(self.applied, [0, 1, 2, 3, 4])
+        self.assertFalse(
+            WebhookEvent.objects.filter(status=WebhookEventStatus.PENDING.value)
+        )
+
+    def test_retry_holds_back_its_partition_only(self):
+        """A failed event blocks the later events of its own partition."""
+        self.make_event(0, partition_key="invoice:a")
+        self.make_event(1, partition_key="invoice:a")
+        self.make_event(2, partition_key="invoice:b")
+        self.failing = {0}
+
+        drain_webhook_lane(LANE)
+        self.assertEqual(self.applied, [2])
+
+        # Once the retry is due and succeeds, the partition resumes in order
+        self.failing = set()
+        WebhookEvent.objects.filter(event_id="evt_0").update(
+            next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+        drain_webhook_lane(LANE)
+        self.assertEqual(self.applied, [2, 0, 1])
+
+    def test_busy_lane_blocks_second_drainer(self):
+        """A lane held by another worker is left alone."""
+        self.make_event(0)
+        lock = CacheLock(
+            WEBHOOK_LANE_LOCK_KEY.format(lane=LANE), timeout=WEBHOOK_LANE_LOCK_TIMEOUT
+        )
+        self.assertTrue(lock.acquire())
+
+        self.assertIsNone(drain_webhook_lane(LANE))
+        self.assertEqual(self.applied, [])
+
+        lock.release()
+        self.assertEqual(drain_webhook_lane(LANE), 1)
+        self.assertEqual(self.applied, [0])
+
+    def test_other_lanes_are_not_drained(self):
+        """Draining a lane leaves the events of other lanes pending."""
+        self.make_event(0, lane=LANE + 1)
+        self.assertEqual(drain_webhook_lane(LANE), 0)
+        self.assertEqual(self.applied, [])
+
+    def test_expired_lock_is_not_released_by_its_former_owner(self):
+        """Only the current owner of a lane lock can release it."""
+        key = WEBHOOK_LANE_LOCK_KEY.format(lane=LANE)
+        former = CacheLock(key, timeout=WEBHOOK_LANE_LOCK_TIMEOUT)
+        self.assertTrue(former.acquire())
+        # Simulate the lock expiring under the former owner
+        cache.delete(key)
+        if former.client is not None:
+            former.client.delete(key)
+
+        current = CacheLock(key, timeout=WEBHOOK_LANE_LOCK_TIMEOUT)
+        self.assertTrue(current.acquire())
+        former.release()
+        self.assertFalse(former.extend())
+        self.assertFalse(CacheLock(key, timeout=WEBHOOK_LANE_LOCK_TIMEOUT).acquire())
+        current.release()